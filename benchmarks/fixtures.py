@@ -0,0 +1,331 @@
+"""Canned stats.nba.com responses, so the app, its tests and its benchmarks can run offline.
+
+The fixtures checked in are synthetic: responses shaped like the live ones, built
+from seeded random stats for a handful of real player ids. Rebuild them with:
+
+    python -m benchmarks.fixtures --synthetic
+
+Where stats.nba.com can be reached, real responses can be recorded in their place:
+
+    python -m benchmarks.fixtures --record
+"""
+import argparse
+import json
+import os
+import random
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# One season for six players, enough for the largest comparison we benchmark
+FIXTURE_SEASON = "2023"
+FIXTURE_PLAYERS = {
+    2544: "LAL",     # LeBron James
+    201939: "GSW",   # Stephen Curry
+    201142: "PHX",   # Kevin Durant
+    203507: "MIL",   # Giannis Antetokounmpo
+    203999: "DEN",   # Nikola Jokic
+    1628369: "BOS",  # Jayson Tatum
+}
+FIXTURE_PLAYER_IDS = list(FIXTURE_PLAYERS)
+
+# Box scores are kept for each player's first few games
+BOX_SCORES_PER_PLAYER = 3
+
+# Request parameters that identify a fixture response. Others, like DateFrom, are ignored.
+KEY_PARAMS = {
+    "playergamelog": ["PlayerID", "Season"],
+    "leaguegamelog": ["PlayerOrTeam", "Season"],
+    "boxscoretraditionalv2": ["GameID"],
+    "leaguedashteamstats": ["PerMode", "Season"],
+}
+
+def fixture_key(endpoint, parameters):
+    """Key a request by the parameters that pick its response"""
+    return "&".join(f"{name}={parameters.get(name, '')}" for name in KEY_PARAMS[endpoint])
+
+def _fixture_path(endpoint):
+    return os.path.join(FIXTURE_DIR, f"{endpoint}.json")
+
+def load_fixtures():
+    """Fixture responses by endpoint, as {"empty": response, "responses": {key: response}}"""
+    fixtures = {}
+    for endpoint in KEY_PARAMS:
+        path = _fixture_path(endpoint)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                fixtures[endpoint] = json.load(f)
+    return fixtures
+
+def _empty_response(response):
+    """The same response with every result set emptied"""
+    return {**response, "resultSets": [{**result, "rowSet": []} for result in response["resultSets"]]}
+
+def write_fixtures(endpoint, responses):
+    """Save the fixture responses for one endpoint"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    fixture = {"empty": _empty_response(next(iter(responses.values()))), "responses": responses}
+    with open(_fixture_path(endpoint), "w", encoding="utf-8") as f:
+        json.dump(fixture, f, separators=(",", ":"))
+
+class FixtureReplay:
+    """Answer nba_api requests from fixture responses, counting them as they come in.
+
+    Requests without a fixture get an empty result, like a season without games.
+    """
+
+    def __init__(self, fixtures):
+        # Serialize once up front, so replaying costs what reading a response body would
+        self._responses = {
+            endpoint: {key: json.dumps(response) for key, response in fixture["responses"].items()}
+            for endpoint, fixture in fixtures.items()
+        }
+        self._empty = {endpoint: json.dumps(fixture["empty"]) for endpoint, fixture in fixtures.items()}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.missing = 0
+
+    def response_text(self, endpoint, parameters):
+        """The fixture response body for a request, or an empty result if there is none"""
+        endpoint = endpoint.lower()
+        if endpoint not in self._empty:
+            raise KeyError(f"No fixtures for endpoint {endpoint}")
+
+        contents = self._responses[endpoint].get(fixture_key(endpoint, parameters))
+        with self._lock:
+            self.requests += 1
+            if contents is None:
+                self.missing += 1
+        return contents if contents is not None else self._empty[endpoint]
+
+    def send_api_request(self, endpoint, parameters, **kwargs):
+        from nba_api.stats.library.http import NBAStatsResponse
+
+        contents = self.response_text(endpoint, parameters)
+        return NBAStatsResponse(response=contents, status_code=200, url=f"fixture://{endpoint.lower()}")
+
+@contextmanager
+def replay_fixtures(fixtures=None):
+    """Route every nba_api stats request to the fixtures while the block runs"""
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    replay = FixtureReplay(fixtures if fixtures is not None else load_fixtures())
+    original = NBAStatsHTTP.send_api_request
+    NBAStatsHTTP.send_api_request = lambda http, **kwargs: replay.send_api_request(**kwargs)
+    try:
+        yield replay
+    finally:
+        NBAStatsHTTP.send_api_request = original
+
+def _first_game_ids(game_log_response):
+    """Game ids of the earliest games in a PlayerGameLog response"""
+    result = game_log_response["resultSets"][0]
+    game_id_col = result["headers"].index("Game_ID")
+    # The API lists the most recent game first
+    return [row[game_id_col] for row in reversed(result["rowSet"])][:BOX_SCORES_PER_PLAYER]
+
+def record_fixtures():
+    """Record the fixture players' game logs and box scores from stats.nba.com"""
+    from nba_api.stats.endpoints import boxscoretraditionalv2, leaguedashteamstats, leaguegamelog, playergamelog
+    from utils.rate_limiter import api_limiter
+
+    def fetch(endpoint_cls, **params):
+        api_limiter.wait()
+        return endpoint_cls(**params, timeout=60).nba_response.get_dict()
+
+    game_logs = {}
+    box_scores = {}
+    for player_id in FIXTURE_PLAYER_IDS:
+        response = fetch(playergamelog.PlayerGameLog, player_id=player_id, season=FIXTURE_SEASON)
+        game_logs[fixture_key("playergamelog", {"PlayerID": player_id, "Season": FIXTURE_SEASON})] = response
+        for game_id in _first_game_ids(response):
+            box_scores[fixture_key("boxscoretraditionalv2", {"GameID": game_id})] = fetch(
+                boxscoretraditionalv2.BoxScoreTraditionalV2, game_id=game_id)
+
+    # Only the fixture players' rows of the league-wide log are kept
+    league = fetch(leaguegamelog.LeagueGameLog, season=FIXTURE_SEASON, player_or_team_abbreviation='P')
+    result = league["resultSets"][0]
+    player_id_col = result["headers"].index("PLAYER_ID")
+    result["rowSet"] = [row for row in result["rowSet"] if row[player_id_col] in FIXTURE_PLAYERS]
+    league_logs = {fixture_key("leaguegamelog", {"PlayerOrTeam": "P", "Season": FIXTURE_SEASON}): league}
+
+    parameters = {"PerMode": "Totals", "Season": FIXTURE_SEASON}
+    team_stats = {fixture_key("leaguedashteamstats", parameters): fetch(
+        leaguedashteamstats.LeagueDashTeamStats, season=FIXTURE_SEASON, per_mode_detailed='Totals')}
+
+    write_fixtures("playergamelog", game_logs)
+    write_fixtures("boxscoretraditionalv2", box_scores)
+    write_fixtures("leaguegamelog", league_logs)
+    write_fixtures("leaguedashteamstats", team_stats)
+
+# Column layouts of the stats.nba.com result sets the synthetic fixtures imitate
+GAME_LOG_STATS = [
+    'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT',
+    'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS'
+]
+BOX_SCORE_STATS = [stat if stat != 'TOV' else 'TO' for stat in GAME_LOG_STATS]
+PLAYER_GAME_LOG_HEADERS = (['SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL']
+                           + GAME_LOG_STATS + ['VIDEO_AVAILABLE'])
+LEAGUE_GAME_LOG_HEADERS = (['SEASON_ID', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME',
+                            'GAME_ID', 'GAME_DATE', 'MATCHUP', 'WL'] + GAME_LOG_STATS
+                           + ['FANTASY_PTS', 'VIDEO_AVAILABLE'])
+BOX_PLAYER_HEADERS = (['GAME_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_CITY', 'PLAYER_ID', 'PLAYER_NAME',
+                       'NICKNAME', 'START_POSITION', 'COMMENT'] + BOX_SCORE_STATS)
+BOX_TEAM_HEADERS = ['GAME_ID', 'TEAM_ID', 'TEAM_NAME', 'TEAM_ABBREVIATION', 'TEAM_CITY'] + BOX_SCORE_STATS
+TEAM_STATS_HEADERS = ['TEAM_ID', 'TEAM_NAME', 'GP', 'W', 'L', 'W_PCT'] + GAME_LOG_STATS
+BOX_BENCH_HEADERS = (['GAME_ID', 'TEAM_ID', 'TEAM_NAME', 'TEAM_ABBREVIATION', 'TEAM_CITY', 'STARTERS_BENCH']
+                     + BOX_SCORE_STATS[:-1])
+
+SYNTHETIC_TEAMS = [
+    'ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND', 'LAC', 'LAL', 'MEM',
+    'MIA', 'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS'
+]
+GAMES_PER_PLAYER = 72
+PLAYERS_PER_TEAM = 13
+
+def _team_id(team):
+    return 1610612737 + SYNTHETIC_TEAMS.index(team)
+
+def _result_set(name, headers, rows):
+    return {"name": name, "headers": headers, "rowSet": rows}
+
+def _response(resource, parameters, result_sets):
+    return {"resource": resource, "parameters": parameters, "resultSets": result_sets}
+
+def _stat_line(rng, scoring, minutes):
+    """Random but internally consistent box score numbers, in GAME_LOG_STATS order"""
+    fga = max(1, round(rng.gauss(scoring * 0.75, 3)))
+    fgm = rng.randint(fga // 3, (fga * 2) // 3)
+    fg3a = rng.randint(0, fga // 2)
+    fg3m = rng.randint(0, min(fg3a, fgm))
+    fta = rng.randint(0, max(1, round(scoring / 3)))
+    ftm = rng.randint((fta * 6) // 10, fta)
+    oreb = rng.randint(0, 3)
+    dreb = rng.randint(1, 9)
+    return [
+        minutes, fgm, fga, round(fgm / fga, 3), fg3m, fg3a, round(fg3m / fg3a, 3) if fg3a else 0.0,
+        ftm, fta, round(ftm / fta, 3) if fta else 0.0, oreb, dreb, oreb + dreb, rng.randint(0, 10),
+        rng.randint(0, 3), rng.randint(0, 2), rng.randint(0, 5), rng.randint(0, 5),
+        2 * fgm + fg3m + ftm, rng.randint(-20, 20),
+    ]
+
+def _box_minutes(minutes):
+    """Minutes the way BoxScoreTraditionalV2 formats them, e.g. "34.000000:12" """
+    return f"{minutes:.6f}:{0:02d}"
+
+def _synthetic_box_score(rng, game_id, team, opponent, player_id, player_name, line):
+    """A finished game's box score with the fixture player's line and filler for everyone else"""
+    player_rows = []
+    team_rows = []
+    bench_rows = []
+    for side in (team, opponent):
+        rows = []
+        for slot in range(PLAYERS_PER_TEAM):
+            if side == team and slot == 0:
+                stats, row_id, row_name = line, player_id, player_name
+            else:
+                stats = _stat_line(rng, 8, rng.randint(8, 36))
+                row_id = 1900000 + _team_id(side) % 100 * 100 + slot
+                row_name = f"{side} Player {slot}"
+            rows.append(stats)
+            position = ['F', 'F', 'C', 'G', 'G'][slot] if slot < 5 else ''
+            player_rows.append([game_id, _team_id(side), side, side, row_id, row_name, row_name.split()[-1],
+                                position, ''] + [_box_minutes(stats[0])] + stats[1:])
+
+        totals = [sum(stats[i] for stats in rows) for i in range(len(GAME_LOG_STATS))]
+        for pct, made, attempted in ((3, 1, 2), (6, 4, 5), (9, 7, 8)):
+            totals[pct] = round(totals[made] / totals[attempted], 3) if totals[attempted] else 0.0
+        # Team minutes add up to five players for 48 minutes
+        totals[0] = 240
+        team_rows.append([game_id, _team_id(side), side, side, side, _box_minutes(240)] + totals[1:])
+        for label in ('Starters', 'Bench'):
+            bench_rows.append([game_id, _team_id(side), side, side, side, label, _box_minutes(120)] + totals[1:-1])
+
+    return _response("boxscore", {"GameID": game_id}, [
+        _result_set("PlayerStats", BOX_PLAYER_HEADERS, player_rows),
+        _result_set("TeamStats", BOX_TEAM_HEADERS, team_rows),
+        _result_set("TeamStarterBenchStats", BOX_BENCH_HEADERS, bench_rows),
+    ])
+
+def synthesize_fixtures(seed=2023):
+    """Build fixtures shaped like the live responses from seeded random stats"""
+    from utils.player_snapshot import load_player_snapshot
+
+    rng = random.Random(seed)
+    names = {player["id"]: player["full_name"] for player in load_player_snapshot() or []}
+    season_id = f"2{FIXTURE_SEASON}"
+    season_start = date(int(FIXTURE_SEASON), 10, 24)
+
+    game_logs = {}
+    box_scores = {}
+    league_rows = []
+    for player_number, (player_id, team) in enumerate(FIXTURE_PLAYERS.items()):
+        player_name = names.get(player_id, str(player_id))
+        scoring = rng.uniform(20, 32)
+        rows = []
+        game_day = season_start
+        for game_number in range(GAMES_PER_PLAYER):
+            game_day += timedelta(days=rng.choice([1, 2, 2, 3]))
+            game_id = f"002{FIXTURE_SEASON[2:]}{player_number:02d}{game_number:03d}"
+            opponent = rng.choice([other for other in SYNTHETIC_TEAMS if other != team])
+            matchup = f"{team} vs. {opponent}" if rng.random() < 0.5 else f"{team} @ {opponent}"
+            line = _stat_line(rng, scoring, rng.randint(28, 40))
+            wl = 'W' if line[-1] > 0 else 'L'
+
+            rows.append([season_id, player_id, game_id, game_day.strftime("%b %d, %Y").upper(), matchup, wl]
+                        + line + [1])
+            fantasy_points = round(line[18] + 1.2 * line[12] + 1.5 * line[13] + 3 * (line[14] + line[15]) - line[16], 1)
+            league_rows.append([season_id, player_id, player_name, _team_id(team), team, team, game_id,
+                                game_day.isoformat(), matchup, wl] + line + [fantasy_points, 1])
+            if game_number < BOX_SCORES_PER_PLAYER:
+                box_scores[fixture_key("boxscoretraditionalv2", {"GameID": game_id})] = _synthetic_box_score(
+                    rng, game_id, team, opponent, player_id, player_name, line)
+
+        parameters = {"PlayerID": player_id, "Season": FIXTURE_SEASON}
+        # The API lists the most recent game first
+        game_logs[fixture_key("playergamelog", parameters)] = _response(
+            "playergamelog", parameters, [_result_set("PlayerGameLog", PLAYER_GAME_LOG_HEADERS, rows[::-1])])
+
+    parameters = {"PlayerOrTeam": "P", "Season": FIXTURE_SEASON}
+    league_logs = {fixture_key("leaguegamelog", parameters): _response(
+        "leaguegamelog", parameters, [_result_set("LeagueGameLog", LEAGUE_GAME_LOG_HEADERS, league_rows)])}
+
+    write_fixtures("playergamelog", game_logs)
+    write_fixtures("boxscoretraditionalv2", box_scores)
+    write_fixtures("leaguegamelog", league_logs)
+    write_fixtures("leaguedashteamstats", _synthetic_team_stats(rng))
+
+def _synthetic_team_stats(rng):
+    """Season totals for every team, built from 82 random team box scores each"""
+    rows = []
+    for team in SYNTHETIC_TEAMS:
+        wins = rng.randint(15, 65)
+        games = [_stat_line(rng, 110, 240) for _ in range(82)]
+        totals = [sum(game[i] for game in games) for i in range(len(GAME_LOG_STATS))]
+        for pct, made, attempted in ((3, 1, 2), (6, 4, 5), (9, 7, 8)):
+            totals[pct] = round(totals[made] / totals[attempted], 3) if totals[attempted] else 0.0
+        rows.append([_team_id(team), team, 82, wins, 82 - wins, round(wins / 82, 3)] + totals)
+
+    parameters = {"PerMode": "Totals", "Season": FIXTURE_SEASON}
+    return {fixture_key("leaguedashteamstats", parameters): _response(
+        "leaguedashteamstats", parameters, [_result_set("LeagueDashTeamStats", TEAM_STATS_HEADERS, rows)])}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the stats.nba.com fixtures for offline tests and benchmarks.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", action="store_true", help="Record the fixtures from the live API")
+    mode.add_argument("--synthetic", action="store_true", help="Build fixtures from seeded random stats")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures()
+    else:
+        synthesize_fixtures()
+
+    for endpoint, fixture in load_fixtures().items():
+        print(f"{endpoint}: {len(fixture['responses'])} responses")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Load test: many concurrent sessions against one Streamlit server running nba_app.py.
+
+A stub stats server (benchmarks.stub_server) stands in for stats.nba.com, answering
+from the fixtures with configurable latency and throttling. The app runs
+under `streamlit run` pointed at it, and each simulated session talks to the app
+over Streamlit's websocket the way a browser tab does. Every session picks a
+player, changes the season, opens a box score and compares players.
+
+    python -m benchmarks.load --sessions 20 --latency-ms 150 --max-rps 10
+
+The report gives rerun latency percentiles per interaction, the requests that
+reached the stub server and the server's peak RSS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from benchmarks.fixtures import FIXTURE_PLAYER_IDS
+from benchmarks.stub_server import StubStatsServer
+from utils.player_snapshot import load_player_snapshot
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nba_app.py")
+
+# The order each session steps through; every step is one rerun
+INTERACTIONS = ["first_load", "select_player", "change_season", "open_box_scores", "box_score",
+                "open_comparison", "compare_players"]
+
+# Widget labels in nba_app.py the sessions interact with
+PLAYER_LABEL = "Select a player"
+SEASON_LABEL = "Select season"
+VIEW_LABEL = "View"
+BOX_SCORES_VIEW = "📋 Box Scores"
+COMPARISON_VIEW = "🆚 Player Comparison"
+GAME_LABEL = "Select a game for detailed box score:"
+COMPARE_LABEL = "Choose players to compare (up to 6):"
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _percentile(samples, q):
+    """The q-th percentile (0-100) of a list of samples"""
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+def _peak_rss_bytes(pid):
+    """Peak resident memory of a process, read from /proc, or None where that isn't available"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def start_stub_server(latency_ms, jitter_ms, max_rps, burst):
+    """Start the stub stats server on a background thread, returning it and its base URL"""
+    server = StubStatsServer(("127.0.0.1", _free_port()), latency_ms, jitter_ms, max_rps, burst)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/stats"
+
+def start_app_server(stats_url, data_dir, extra_env=None, timeout=60):
+    """Run nba_app.py under `streamlit run` against the stub server, waiting until it is healthy"""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "NBA_STATS_BASE_URL": stats_url,
+        "NBA_STATS_DATA_DIR": data_dir,
+        **(extra_env or {}),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH,
+         "--server.headless", "true",
+         "--server.port", str(port),
+         "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {timeout}s")
+
+class AppSession:
+    """One browser tab: reruns the app over the websocket with the widget values it has set"""
+
+    def __init__(self, port, timeout):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.timeout = timeout
+        self.widgets = {}
+        self.values = {}
+        self.app_exceptions = 0
+        self._connection = None
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+        self._connection = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    def options(self, label):
+        return self.widgets[label][2] if label in self.widgets else []
+
+    def fragment_of(self, label):
+        """The fragment a widget was drawn in, which a change to it reruns on its own"""
+        return self.widgets[label][3] if label in self.widgets else ""
+
+    def set(self, label, value):
+        self.values[label] = value
+
+    def _widget_states(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+
+        states = WidgetStates()
+        for label, value in self.values.items():
+            if label not in self.widgets:
+                continue
+            kind, widget_id, options, _ = self.widgets[label]
+            state = states.widgets.add()
+            state.id = widget_id
+            if kind == "multiselect":
+                state.string_array_value.data.extend(value)
+            elif kind == "checkbox":
+                state.bool_value = value
+            elif kind == "radio":
+                state.int_value = options.index(value)
+            else:
+                state.string_value = value
+        return states
+
+    def _read_element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.app_exceptions += 1
+        elif kind in ("selectbox", "multiselect", "checkbox", "radio"):
+            widget = getattr(element, kind)
+            self.widgets[widget.label] = (kind, widget.id, list(getattr(widget, "options", [])), fragment_id)
+
+    async def rerun(self, fragment_id=""):
+        """Rerun the script, or only one fragment of it, and return how long it took until the server said it finished"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.widget_states.CopyFrom(self._widget_states())
+        message.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await self._connection.write_message(message.SerializeToString(), binary=True)
+
+        # A fragment rerun only redraws the fragment's own widgets
+        self.widgets = {label: widget for label, widget in self.widgets.items() if fragment_id and widget[3] != fragment_id}
+        deadline = start + self.timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError(f"rerun took longer than {self.timeout}s")
+            data = await asyncio.wait_for(self._connection.read_message(), remaining)
+            if data is None:
+                raise ConnectionError("server closed the websocket")
+
+            forward = ForwardMsg.FromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._read_element(forward.delta.new_element, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                return time.perf_counter() - start
+
+async def run_session(index, port, player_names, think_s, timeout, results):
+    """Step one session through every interaction, recording each rerun's latency"""
+    session = AppSession(port, timeout)
+    player = player_names[index % len(player_names)]
+    others = [name for name in player_names if name != player]
+    try:
+        await session.connect()
+        for interaction in INTERACTIONS:
+            fragment_id = ""
+            if interaction == "select_player":
+                session.set(PLAYER_LABEL, player)
+            elif interaction == "change_season":
+                seasons = session.options(SEASON_LABEL)
+                current = session.values.get(SEASON_LABEL)
+                session.set(SEASON_LABEL, next((season for season in seasons if season != current), current or ""))
+            elif interaction == "open_box_scores":
+                session.set(VIEW_LABEL, BOX_SCORES_VIEW)
+            elif interaction == "box_score":
+                games = session.options(GAME_LABEL)
+                if games:
+                    session.set(GAME_LABEL, random.choice(games))
+                fragment_id = session.fragment_of(GAME_LABEL)
+            elif interaction == "open_comparison":
+                session.set(VIEW_LABEL, COMPARISON_VIEW)
+            elif interaction == "compare_players":
+                session.set(COMPARE_LABEL, [player] + random.sample(others, min(2, len(others))))
+                fragment_id = session.fragment_of(COMPARE_LABEL)
+
+            latency = await session.rerun(fragment_id)
+            results['latencies'].setdefault(interaction, []).append(latency)
+            if think_s:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * think_s)
+    except Exception as e:
+        results['failures'].append(f"session {index}: {type(e).__name__}: {e}")
+    finally:
+        results['app_exceptions'] += session.app_exceptions
+        session.close()
+
+async def run_sessions(port, sessions, ramp_s, think_s, timeout):
+    """Run every session concurrently, starting them evenly over ramp_s seconds"""
+    snapshot = load_player_snapshot() or []
+    names_by_id = {player["id"]: player["full_name"] for player in snapshot}
+    player_names = [names_by_id[player_id] for player_id in FIXTURE_PLAYER_IDS if player_id in names_by_id]
+    if not player_names:
+        raise RuntimeError("None of the fixture players are in the player snapshot")
+
+    results = {'latencies': {}, 'failures': [], 'app_exceptions': 0}
+
+    async def start(index):
+        await asyncio.sleep(ramp_s * index / max(sessions, 1))
+        await run_session(index, port, player_names, think_s, timeout, results)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(start(index) for index in range(sessions)))
+    results['wall_s'] = time.perf_counter() - start_time
+    return results
+
+def build_report(results, stub_report, peak_rss, sessions):
+    """Latency percentiles per interaction and overall, with upstream counts and peak RSS"""
+    rows = {}
+    all_latencies = []
+    for interaction in INTERACTIONS:
+        samples = results['latencies'].get(interaction, [])
+        all_latencies.extend(samples)
+        rows[interaction] = samples
+    rows['all'] = all_latencies
+
+    return {
+        'sessions': sessions,
+        'reruns': len(all_latencies),
+        'wall_s': results['wall_s'],
+        'latency_ms': {
+            name: {
+                'count': len(samples),
+                'p50': 1000 * _percentile(samples, 50),
+                'p95': 1000 * _percentile(samples, 95),
+                'p99': 1000 * _percentile(samples, 99),
+                'max': 1000 * max(samples, default=0.0),
+            }
+            for name, samples in rows.items()
+        },
+        'upstream': stub_report,
+        'peak_rss_bytes': peak_rss,
+        'failures': results['failures'],
+        'app_exceptions': results['app_exceptions'],
+    }
+
+def print_report(report):
+    print(f"{report['sessions']} sessions, {report['reruns']} reruns in {report['wall_s']:.1f}s")
+    print(f"{'interaction':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, row in report['latency_ms'].items():
+        print(f"{name:<18}{row['count']:>7}{row['p50']:>10.0f}{row['p95']:>10.0f}{row['p99']:>10.0f}{row['max']:>10.0f}")
+
+    upstream = report['upstream']
+    print(f"Upstream requests: {sum(upstream['requests'].values())} "
+          f"({upstream['throttled']} throttled, {upstream['missing']} without a fixture response)")
+    for endpoint, count in sorted(upstream['requests'].items()):
+        print(f"  {endpoint:<26}{count:>7}")
+
+    if report['peak_rss_bytes'] is not None:
+        print(f"Server peak RSS: {report['peak_rss_bytes'] / 1024 / 1024:.0f} MB")
+    if report['app_exceptions']:
+        print(f"App raised {report['app_exceptions']} exceptions")
+    for failure in report['failures']:
+        print(f"  failed: {failure}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test nba_app.py with simulated sessions against a stub stats server.")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent sessions")
+    parser.add_argument("--ramp-s", type=float, default=5.0, help="Spread session starts over this many seconds")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Average pause between a session's interactions")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub server response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Random extra stub latency of up to this much")
+    parser.add_argument("--max-rps", type=float, help="Stub server throttles requests over this rate with 429")
+    parser.add_argument("--burst", type=int, help="Requests the stub allows at once before --max-rps applies")
+    parser.add_argument("--client-rps", type=float, help="The app's own request rate limit (NBA_STATS_MAX_RPS)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Longest a single rerun may take")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    stub, stats_url = start_stub_server(args.latency_ms, args.jitter_ms, args.max_rps, args.burst)
+    data_dir = tempfile.mkdtemp(prefix="nba-stats-load-")
+    extra_env = {"NBA_STATS_MAX_RPS": str(args.client_rps)} if args.client_rps else {}
+    process = None
+    try:
+        process, port = start_app_server(stats_url, data_dir, extra_env)
+        results = asyncio.run(run_sessions(port, args.sessions, args.ramp_s, args.think_ms / 1000, args.timeout))
+        report = build_report(results, stub.report(), _peak_rss_bytes(process.pid), args.sessions)
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                # Worker threads still waiting on the stub can hold up a clean shutdown
+                process.kill()
+                process.wait()
+        stub.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report['failures']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
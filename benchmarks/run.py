@@ -0,0 +1,251 @@
+"""Offline benchmarks for the data layer and the Streamlit app.
+
+Every stats.nba.com request is answered from the fixtures in benchmarks/fixtures,
+so runs need no network and make no requests. Compare against the saved baseline,
+failing on speed or memory regressions:
+
+    python -m benchmarks.run
+
+Record a new baseline on this machine:
+
+    python -m benchmarks.run --save-baseline
+"""
+import os
+import tempfile
+
+# The benchmarks get their own store, no request throttling and no background refreshes; set before utils is imported
+os.environ["NBA_STATS_DATA_DIR"] = tempfile.mkdtemp(prefix="nba-stats-bench-")
+os.environ["NBA_STATS_MAX_RPS"] = "100000"
+os.environ["NBA_STATS_REFRESH_AHEAD"] = "0"
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from benchmarks.fixtures import FIXTURE_PLAYER_IDS, FIXTURE_SEASON, load_fixtures, replay_fixtures
+from utils import data_loader, storage
+from utils.cache import get_cache_backend
+from utils.charts import chart_cache
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nba_app.py")
+
+# A case regresses when it is this much slower or larger than the baseline...
+TIME_TOLERANCE = 0.30
+MEMORY_TOLERANCE = 0.20
+# ...and by more than this, so timer and allocator noise on tiny cases doesn't fail the run
+MIN_TIME_DELTA_S = 0.005
+MIN_MEMORY_DELTA_BYTES = 256 * 1024
+
+def _wait_for_prefetch():
+    """Let background box score prefetches and index builds finish so they don't spill into the next case"""
+    while data_loader._prefetch_pending:
+        time.sleep(0.01)
+    build = data_loader._player_seasons_build
+    if build is not None:
+        build.result()
+
+def reset_state():
+    """Start from an empty cache and store, like a freshly deployed app"""
+    _wait_for_prefetch()
+    data_loader.reset_caches()
+    chart_cache.clear()
+    shutil.rmtree(storage.DATA_DIR, ignore_errors=True)
+
+def _fixture_game_id():
+    """A game with a box score fixture"""
+    return next(iter(load_fixtures()["boxscoretraditionalv2"]["responses"])).split("=")[1]
+
+def _fixture_player_names(count):
+    index = data_loader.get_player_index()
+    return [index.id_to_name[player_id] for player_id in FIXTURE_PLAYER_IDS[:count]]
+
+def _new_app():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(APP_PATH, default_timeout=120)
+
+def _app_with_player():
+    """An app that has rendered the first fixture player"""
+    reset_state()
+    app = _new_app()
+    app.run()
+    app.sidebar.selectbox[0].set_value(_fixture_player_names(1)[0]).run()
+    _wait_for_prefetch()
+    return app
+
+def _app_on_comparison():
+    """An app showing the comparison view for the first fixture player"""
+    app = _app_with_player()
+    app.radio(key="view").set_value("🆚 Player Comparison").run()
+    return app
+
+def _select_player(app):
+    return app.sidebar.selectbox[0].set_value(_fixture_player_names(1)[0]).run()
+
+def _compare_players(app):
+    return app.multiselect[0].set_value(_fixture_player_names(4)).run()
+
+def _app_first_run():
+    reset_state()
+    return _new_app()
+
+def _check_app(app):
+    if app.exception:
+        raise RuntimeError(f"nba_app.py raised: {app.exception[0].value}")
+
+def _setup_and_warm_store():
+    """Empty cache, but the fixture player's logs already in the store"""
+    reset_state()
+    data_loader.get_player_game_logs(FIXTURE_PLAYER_IDS[0], FIXTURE_SEASON)
+    get_cache_backend().clear()
+
+# (name, setup returning the state passed to run, run)
+BENCHMARKS = [
+    ("game_logs_fetch", reset_state,
+     lambda _: data_loader.get_player_game_logs(FIXTURE_PLAYER_IDS[0], FIXTURE_SEASON)),
+    ("game_logs_stored", _setup_and_warm_store,
+     lambda _: data_loader.get_player_game_logs(FIXTURE_PLAYER_IDS[0], FIXTURE_SEASON)),
+    ("season_stats", reset_state,
+     lambda _: data_loader.get_player_season_stats(FIXTURE_PLAYER_IDS[0], FIXTURE_SEASON)),
+] + [
+    (f"compare_players_{count}", reset_state,
+     lambda _, count=count: data_loader.compare_players(FIXTURE_PLAYER_IDS[:count], FIXTURE_SEASON))
+    for count in range(2, 7)
+] + [
+    ("box_score", reset_state, lambda _: data_loader.get_box_score(_fixture_game_id(), final=True)),
+    ("app_first_run", _app_first_run, lambda app: app.run()),
+    ("app_select_player", lambda: _app_first_run().run(), _select_player),
+    ("app_rerun", _app_with_player, lambda app: app.run()),
+    ("app_compare_players", _app_on_comparison, _compare_players),
+]
+
+def run_case(setup, run, repeat):
+    """Median and best time over `repeat` runs, and the peak memory allocated by one more"""
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        result = run(state)
+        times.append(time.perf_counter() - start)
+        if hasattr(result, "exception"):
+            _check_app(result)
+
+    state = setup()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'peak_bytes': peak,
+    }
+
+def print_memory_report():
+    """How much the compact schema saves on the fixture season's league game logs"""
+    for row in data_loader.get_game_log_memory_report([FIXTURE_SEASON]).itertuples():
+        print(f"Game logs {row.frame}: {row.rows} rows, {row.raw_bytes / 1024 / 1024:.2f} MB as fetched, "
+              f"{row.compact_bytes / 1024 / 1024:.2f} MB compact ({row.saved_pct:.0f}% smaller)")
+
+def run_benchmarks(repeat=5, only=None):
+    """Run every benchmark (or those named in `only`) against the fixtures"""
+    results = {}
+    with replay_fixtures() as replay:
+        # One untimed pass so imports and first-use setup don't count against the first case
+        for name, setup, run in BENCHMARKS:
+            if only is None or name in only:
+                run(setup())
+
+        for name, setup, run in BENCHMARKS:
+            if only is not None and name not in only:
+                continue
+            results[name] = run_case(setup, run, repeat)
+            print(f"  {name:<24}{results[name]['median_s'] * 1000:10.1f} ms"
+                  f"{results[name]['peak_bytes'] / 1024 / 1024:10.1f} MB")
+        _wait_for_prefetch()
+        print_memory_report()
+
+    if replay.missing:
+        print(f"{replay.missing} of {replay.requests} requests had no fixture response and got an empty result")
+    return results
+
+def _environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'environment': _environment(), 'results': results}, f, indent=2)
+
+def load_baseline(path=BASELINE_PATH):
+    """The saved baseline, or None if there isn't one"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def find_regressions(results, baseline):
+    """Describe every case that got slower or larger than the baseline allows"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+
+        slower = result['median_s'] - base['median_s']
+        if slower > MIN_TIME_DELTA_S and result['median_s'] > base['median_s'] * (1 + TIME_TOLERANCE):
+            regressions.append(f"{name}: {result['median_s'] * 1000:.1f} ms vs {base['median_s'] * 1000:.1f} ms baseline")
+
+        larger = result['peak_bytes'] - base['peak_bytes']
+        if larger > MIN_MEMORY_DELTA_BYTES and result['peak_bytes'] > base['peak_bytes'] * (1 + MEMORY_TOLERANCE):
+            regressions.append(f"{name}: peak {result['peak_bytes'] / 1024 / 1024:.1f} MB "
+                               f"vs {base['peak_bytes'] / 1024 / 1024:.1f} MB baseline")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmarks and compare them to a baseline.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    print(f"{'benchmark':<26}{'median':>10}{'peak':>13}")
+    try:
+        results = run_benchmarks(args.repeat, args.only)
+    finally:
+        shutil.rmtree(storage.DATA_DIR, ignore_errors=True)
+
+    baseline = load_baseline(args.baseline)
+    if args.save_baseline or baseline is None:
+        # A partial run only replaces the benchmarks it ran
+        if baseline is not None and args.only:
+            results = {**baseline['results'], **results}
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if baseline['environment'] != _environment():
+        print(f"Baseline was recorded on {baseline['environment']['platform']}, timings may not be comparable")
+
+    regressions = find_regressions(results, baseline)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""A local stand-in for stats.nba.com that answers from the fixtures.
+
+Responses are delayed by a configurable latency, and requests over a rate limit
+are turned away with 429 the way stats.nba.com throttles clients. Point the app
+at it with NBA_STATS_BASE_URL:
+
+    python -m benchmarks.stub_server --port 8765 --latency-ms 150 --max-rps 10
+    NBA_STATS_BASE_URL=http://127.0.0.1:8765/stats streamlit run nba_app.py
+
+GET /_counts returns the requests served so far, per endpoint, as JSON.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from benchmarks.fixtures import FixtureReplay, load_fixtures
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take a token if one is left, returning whether the request may go ahead"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+class StubStatsServer(ThreadingHTTPServer):
+    """HTTP server answering /stats/<endpoint> requests from the fixtures"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0.0, jitter_ms=0.0, max_rps=None, burst=None, fixtures=None):
+        super().__init__(address, StubStatsHandler)
+        self.replay = FixtureReplay(fixtures if fixtures is not None else load_fixtures())
+        self.latency_s = latency_ms / 1000
+        self.jitter_s = jitter_ms / 1000
+        self.limiter = TokenBucket(max_rps, burst or max_rps) if max_rps else None
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.throttled = 0
+
+    def count(self, endpoint):
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def report(self):
+        with self._lock:
+            return {
+                'requests': dict(self.counts),
+                'throttled': self.throttled,
+                'missing': self.replay.missing,
+            }
+
+class StubStatsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # One line per request would drown out the load report
+
+    def _send(self, status, body, content_type="application/json"):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/_counts":
+            self._send(200, json.dumps(self.server.report()))
+            return
+
+        prefix = "/stats/"
+        if not url.path.startswith(prefix):
+            self._send(404, json.dumps({'error': f"Unknown path {url.path}"}))
+            return
+
+        endpoint = url.path[len(prefix):].strip("/").lower()
+        self.server.count(endpoint)
+        if self.server.limiter is not None and not self.server.limiter.take():
+            with self.server._lock:
+                self.server.throttled += 1
+            self._send(429, json.dumps({'error': "Too many requests"}))
+            return
+
+        try:
+            body = self.server.replay.response_text(endpoint, dict(parse_qsl(url.query, keep_blank_values=True)))
+        except KeyError as e:
+            self._send(404, json.dumps({'error': str(e)}))
+            return
+
+        delay = self.server.latency_s + random.uniform(0, self.server.jitter_s)
+        if delay > 0:
+            time.sleep(delay)
+        self._send(200, body)
+
+def serve(host="127.0.0.1", port=8765, latency_ms=0.0, jitter_ms=0.0, max_rps=None, burst=None):
+    """Run the stub server until interrupted"""
+    server = StubStatsServer((host, port), latency_ms, jitter_ms, max_rps, burst)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the stats.nba.com fixtures locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra delay of up to this much")
+    parser.add_argument("--max-rps", type=float, help="Answer requests over this rate with 429")
+    parser.add_argument("--burst", type=int, help="Requests allowed at once before --max-rps applies")
+    args = parser.parse_args(argv)
+
+    print(f"Serving fixtures at http://{args.host}:{args.port}/stats")
+    serve(args.host, args.port, args.latency_ms, args.jitter_ms, args.max_rps, args.burst)
+
+if __name__ == "__main__":
+    main()
@@ -1,484 +1,701 @@
+# Started before the other imports so a cold start includes their cost
+from utils.startup import StartupTimer, cold_start_report, record_run
+startup_timer = StartupTimer()
+
+import logging
+import os
+import pandas as pd
 import streamlit as st
+# Importing the cache turns on pandas copy-on-write for the whole app (see utils/cache.py)
+from utils.cache import cache_stats, refresh_stats
+from utils.metrics import (
+    RunProfiler,
+    error_report,
+    observe_span,
+    prometheus_text,
+    span,
+    span_report,
+    upstream_report
+)
 from utils.data_loader import (
-    get_player_list, 
+    get_player_index, 
     get_player_game_logs, 
     get_player_season_stats, 
     get_current_season,
     get_available_seasons,
+    get_player_available_seasons,
     get_box_score,
+    prefetch_box_scores,
+    finished_game_ids,
     compare_players,
+    find_similar_players,
     get_player_advanced_stats,
-    get_player_headshot_url
+    get_player_rolling_stats,
+    get_player_splits,
+    get_player_career,
+    get_player_headshot_url,
+    get_team_list,
+    get_team_season_frame,
+    get_team_usage,
+    get_league_leaders,
+    get_player_league_ranks,
+    get_game_log_memory_report
+)
+from utils.charts import (
+    points_chart,
+    minutes_chart,
+    recent_stats_chart,
+    shooting_chart,
+    game_breakdown_chart,
+    comparison_bar_chart,
+    comparison_shooting_chart,
+    line_chart_spec,
+    bar_chart_spec
 )
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+startup_timer.mark("imports")
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 st.set_page_config(page_title="NBA Stats Tracker", layout="wide")
+
+# Operator metrics tab, shown with ?ops=1 or NBA_STATS_OPERATOR=1
+operator_mode = st.query_params.get("ops") == "1" or os.environ.get("NBA_STATS_OPERATOR") == "1"
+
+# Profiling is switched on per session from the operator tab
+profiler = RunProfiler() if operator_mode and st.session_state.get("profile_runs") else None
+if profiler is not None:
+    profiler.start()
+
+# Widgets inside views are dropped from session state while their view is hidden, so carry their
+# values over every run to have them back when the user returns to the view
+for key in ("box_score_game", "comparison_players", "selected_team", "leader_stat",
+            "leader_min_games", "leader_min_minutes", "leader_count", "profile_runs"):
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
+
 st.title("🏀 NBA Stats Tracker")
 
 st.sidebar.header("Settings")
 
-players_df = get_player_list()
-player_names = sorted(players_df["full_name"].tolist())
+include_inactive = st.sidebar.checkbox("Include historical players", value=False)
+player_index = get_player_index(include_inactive)
+startup_timer.mark("player list")
+
+# Narrow the player list to name matches as the user types, with fuzzy matches for typos
+player_search = st.sidebar.text_input("Search players", placeholder="e.g. james")
+player_names = player_index.search(player_search, limit=50) if player_search.strip() else player_index.names
+if not player_names:
+    st.sidebar.caption(f"No players match \"{player_search}\".")
+    player_names = player_index.names
 
 selected_player = st.sidebar.selectbox("Select a player", player_names)
 
+player_id = player_index.name_to_id[selected_player]
+
 available_seasons = get_available_seasons()
 current_season = get_current_season()
 
-# Default to 2023 season if available, otherwise use current season
-default_season = "2023" if "2023" in available_seasons else current_season
-default_index = available_seasons.index(default_season) if default_season in available_seasons else 0
+# Only offer seasons the player actually played, unless we know of none
+player_seasons = get_player_available_seasons(player_id)
+season_options = [season for season in available_seasons if season in player_seasons] or available_seasons
+
+# Default to 2023 season if available, otherwise use the most recent season
+default_season = "2023" if "2023" in season_options else season_options[-1]
+default_index = season_options.index(default_season)
 
-selected_season = st.sidebar.selectbox("Select season", available_seasons, index=default_index)
+selected_season = st.sidebar.selectbox("Select season", season_options, index=default_index)
 
-player_id = players_df[players_df["full_name"] == selected_player]["id"].values[0]
 logs = get_player_game_logs(player_id, selected_season)
 
-# If no logs available, try to suggest a different season
+# Warm the box scores for this season's games while the user looks at the stats
+if not logs.empty and 'GAME_ID' in logs.columns:
+    prefetch_box_scores(player_id, selected_season, finished_game_ids(logs))
+
+# If no logs available, suggest a season the index says has data
 if logs.empty:
     st.sidebar.warning(f"No data for {selected_player} in {selected_season}.")
     
-    # Find the most recent season with data
-    for alt_season in sorted(available_seasons, reverse=True):
-        if alt_season != selected_season:
-            alt_logs = get_player_game_logs(player_id, alt_season)
-            if not alt_logs.empty:
-                st.sidebar.info(f"💡 Tip: Data for {selected_player} is available in the {alt_season} season. Please select it from the dropdown.")
-                break
-
-tab1, tab2, tab3 = st.tabs(["📊 Player Stats", "📋 Box Scores", "🆚 Player Comparison"])
-
-with tab1:
-    if not logs.empty:
-        col1, col2 = st.columns([1, 3])
-
-        with col1:
-            player_headshot_url = get_player_headshot_url(player_id)
-            if player_headshot_url:
-                st.markdown(
-                    f"""
-                    <div style="text-align: center; margin-top: 50px;">
-                        <img src="{player_headshot_url}" alt="{selected_player}" width="200">
-                        <p>{selected_player}</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+    alt_seasons = [season for season in player_seasons if season != selected_season]
+    if alt_seasons:
+        st.sidebar.info(f"💡 Tip: Data for {selected_player} is available in the {alt_seasons[0]} season. Please select it from the dropdown.")
 
-        with col2:
-            st.subheader(f"📊 {selected_season} NBA Season Summary")
-            season_stats = get_player_season_stats(player_id, selected_season)
-            
-            if season_stats:
-                sum_col1, sum_col2, sum_col3, sum_col4 = st.columns(4)
+# Loads every season of the player, so only when asked for
+career_mode = st.sidebar.toggle("Career trajectory", value=False, help="Load all of the player's seasons")
+
+startup_timer.mark("sidebar")
+
+def player_stats_view(player_id, selected_player, selected_season, logs):
+    with span("app.player_stats"):
+        if not logs.empty:
+            col1, col2 = st.columns([1, 3])
+
+            with col1:
+                player_headshot_url = get_player_headshot_url(player_id)
+                if player_headshot_url:
+                    st.markdown(
+                        f"""
+                        <div style="text-align: center; margin-top: 50px;">
+                            <img src="{player_headshot_url}" alt="{selected_player}" width="200">
+                            <p>{selected_player}</p>
+                        </div>
+                        """,
+                        unsafe_allow_html=True,
+                    )
+
+            with col2:
+                st.subheader(f"📊 {selected_season} NBA Season Summary")
+                season_stats = get_player_season_stats(player_id, selected_season)
                 
-                with sum_col1:
-                    st.metric("Games Played", f"{season_stats.get('games_played', 0)}")
-                    st.metric("PPG", f"{season_stats.get('ppg', 0.0):.1f}")
+                if season_stats:
+                    league_ranks = get_player_league_ranks(player_id, selected_season)
+
+                    def league_rank(stat):
+                        return f"#{league_ranks[stat]} in league" if stat in league_ranks else None
+
+                    sum_col1, sum_col2, sum_col3, sum_col4 = st.columns(4)
+                    
+                    with sum_col1:
+                        st.metric("Games Played", f"{season_stats.get('games_played', 0)}")
+                        st.metric("PPG", f"{season_stats.get('ppg', 0.0):.1f}", league_rank('ppg'), delta_color="off")
+                    
+                    with sum_col2:
+                        st.metric("RPG", f"{season_stats.get('rpg', 0.0):.1f}", league_rank('rpg'), delta_color="off")
+                        st.metric("APG", f"{season_stats.get('apg', 0.0):.1f}", league_rank('apg'), delta_color="off")
+                    
+                    with sum_col3:
+                        st.metric("SPG", f"{season_stats.get('spg', 0.0):.1f}", league_rank('spg'), delta_color="off")
+                        st.metric("BPG", f"{season_stats.get('bpg', 0.0):.1f}", league_rank('bpg'), delta_color="off")
+                    
+                    with sum_col4:
+                        st.metric("MPG", f"{season_stats.get('mpg', 0.0):.1f}", league_rank('mpg'), delta_color="off")
+                        st.metric("FG%", f"{season_stats.get('fg_pct', 0.0):.3f}", league_rank('fg_pct'), delta_color="off")
+
+                    if league_ranks:
+                        st.caption("League ranks count players with at least a quarter of the most games played this season.")
+
+            st.divider()
+
+            st.subheader("🔬 Advanced Statistics")
+            advanced_stats = get_player_advanced_stats(player_id, selected_season)
+            
+            if advanced_stats:
+                adv_col1, adv_col2, adv_col3 = st.columns(3)
                 
-                with sum_col2:
-                    st.metric("RPG", f"{season_stats.get('rpg', 0.0):.1f}")
-                    st.metric("APG", f"{season_stats.get('apg', 0.0):.1f}")
+                with adv_col1:
+                    if 'pts_std' in advanced_stats:
+                        st.metric("Points Std Dev", f"{advanced_stats['pts_std']:.1f}")
+                    if 'avg_minutes' in advanced_stats:
+                        st.metric("Avg Minutes", f"{advanced_stats['avg_minutes']:.1f}")
                 
-                with sum_col3:
-                    st.metric("SPG", f"{season_stats.get('spg', 0.0):.1f}")
-                    st.metric("BPG", f"{season_stats.get('bpg', 0.0):.1f}")
+                with adv_col2:
+                    if 'total_minutes' in advanced_stats:
+                        st.metric("Total Minutes", f"{advanced_stats['total_minutes']:.0f}")
+                    if 'pts_variance' in advanced_stats:
+                        st.metric("Points Variance", f"{advanced_stats['pts_variance']:.1f}")
                 
-                with sum_col4:
-                    st.metric("MPG", f"{season_stats.get('mpg', 0.0):.1f}")
-                    st.metric("FG%", f"{season_stats.get('fg_pct', 0.0):.3f}")
+                with adv_col3:
+                    if 'true_shooting_pct' in advanced_stats:
+                        st.metric("True Shooting %", f"{advanced_stats['true_shooting_pct']:.3f}")
+                    if 'effective_fg_pct' in advanced_stats:
+                        st.metric("Effective FG %", f"{advanced_stats['effective_fg_pct']:.3f}")
 
-        st.divider()
+                per36_col1, per36_col2, per36_col3 = st.columns(3)
 
-        st.subheader("🔬 Advanced Statistics")
-        advanced_stats = get_player_advanced_stats(player_id, selected_season)
-        
-        if advanced_stats:
-            adv_col1, adv_col2, adv_col3 = st.columns(3)
-            
-            with adv_col1:
-                if 'pts_std' in advanced_stats:
-                    st.metric("Points Std Dev", f"{advanced_stats['pts_std']:.1f}")
-                if 'avg_minutes' in advanced_stats:
-                    st.metric("Avg Minutes", f"{advanced_stats['avg_minutes']:.1f}")
-            
-            with adv_col2:
-                if 'total_minutes' in advanced_stats:
-                    st.metric("Total Minutes", f"{advanced_stats['total_minutes']:.0f}")
-                if 'pts_variance' in advanced_stats:
-                    st.metric("Points Variance", f"{advanced_stats['pts_variance']:.1f}")
+                with per36_col1:
+                    if 'pts_per_36' in advanced_stats:
+                        st.metric("Points per 36", f"{advanced_stats['pts_per_36']:.1f}")
+
+                with per36_col2:
+                    if 'reb_per_36' in advanced_stats:
+                        st.metric("Rebounds per 36", f"{advanced_stats['reb_per_36']:.1f}")
+
+                with per36_col3:
+                    if 'usage_per_36' in advanced_stats:
+                        st.metric("Possessions Used per 36", f"{advanced_stats['usage_per_36']:.1f}")
+
+            rolling_stats = get_player_rolling_stats(player_id, selected_season)
+            if not rolling_stats.empty:
+                st.subheader("📉 Rolling Scoring Averages")
+                rolling_cols = [col for col in ['PTS_avg5', 'PTS_avg10', 'PTS_avg20', 'PTS_ewm10'] if col in rolling_stats.columns]
+                rolling_long = rolling_stats.melt('GAME_DATE', rolling_cols, var_name='average', value_name='points')
+                st.vega_lite_chart(rolling_long, line_chart_spec('GAME_DATE', 'temporal', 'points', 'average'), use_container_width=True)
+
+            splits = get_player_splits(player_id, selected_season)
+            if not splits.empty:
+                st.subheader("🔀 Splits")
+                st.caption("Per-game averages at home and away, in wins and losses, and by days of rest")
+                by_split = splits.index.get_level_values('split')
+                st.dataframe(splits[by_split.isin(['Venue', 'Result', 'Rest'])])
+                with st.expander("By opponent"):
+                    st.dataframe(splits[by_split == 'Opponent'].droplevel('split'))
+
+            with st.expander(f"📋 {selected_player} - {selected_season} Game Logs", expanded=False):
+                available_columns = logs.columns.tolist()
+                default_columns = ["GAME_DATE", "MATCHUP", "PTS", "REB", "AST", "STL", "BLK", "MIN", "FG_PCT", "FG3_PCT", "FT_PCT"]
+                display_columns = [col for col in default_columns if col in available_columns]
+                
+                st.dataframe(logs[display_columns])
+
+            st.subheader("📈 Performance Charts")
             
-            with adv_col3:
-                if 'true_shooting_pct' in advanced_stats:
-                    st.metric("True Shooting %", f"{advanced_stats['true_shooting_pct']:.3f}")
-
-        with st.expander(f"📋 {selected_player} - {selected_season} Game Logs", expanded=False):
-            available_columns = logs.columns.tolist()
-            default_columns = ["GAME_DATE", "MATCHUP", "PTS", "REB", "AST", "STL", "BLK", "MIN", "FG_PCT", "FG3_PCT", "FT_PCT"]
-            display_columns = [col for col in default_columns if col in available_columns]
+            chart_col1, chart_col2 = st.columns(2)
             
-            st.dataframe(logs[display_columns])
+            with chart_col1:
+                st.subheader("📈 Points Over Time")
+                if 'PTS' in logs.columns and 'GAME_DATE' in logs.columns and not logs['PTS'].isnull().all():
+                    if logs['PTS'].sum() > 0:
+                        st.image(points_chart(logs, selected_player, player_id, selected_season), use_container_width=True)
+                    else:
+                        st.info("Player has not scored any points this season.")
+                else:
+                    st.warning("Points data is not available to display this chart.")
 
-        st.subheader("📈 Performance Charts")
-        
-        chart_col1, chart_col2 = st.columns(2)
-        
-        with chart_col1:
-            st.subheader("📈 Points Over Time")
-            if 'PTS' in logs.columns and 'GAME_DATE' in logs.columns and not logs['PTS'].isnull().all():
-                if logs['PTS'].sum() > 0:
-                    fig, ax = plt.subplots(figsize=(8, 5))
-                    ax.plot(logs["GAME_DATE"], logs["PTS"], marker='o', color='blue', linewidth=2, markersize=4)
-                    ax.set_title(f"{selected_player} - Points Per Game ({selected_season})")
-                    ax.set_xlabel("Game Date")
-                    ax.set_ylabel("Points")
-                    ax.grid(True, alpha=0.3)
-                    plt.xticks(rotation=45)
-                    plt.tight_layout()
-                    st.pyplot(fig)
+                st.subheader("⏱️ Minutes Played Over Time")
+                if 'MIN' in logs.columns and 'GAME_DATE' in logs.columns and not logs['MIN'].isnull().all():
+                    if logs['MIN'].sum() > 0:
+                        st.image(minutes_chart(logs, selected_player, player_id, selected_season), use_container_width=True)
+                    else:
+                        st.info("Player has not played any minutes this season.")
                 else:
-                    st.info("Player has not scored any points this season.")
-            else:
-                st.warning("Points data is not available to display this chart.")
-
-            st.subheader("⏱️ Minutes Played Over Time")
-            if 'MIN' in logs.columns and 'GAME_DATE' in logs.columns and not logs['MIN'].isnull().all():
-                if logs['MIN'].sum() > 0:
-                    fig3, ax3 = plt.subplots(figsize=(8, 5))
-                    ax3.plot(logs["GAME_DATE"], logs["MIN"], marker='o', color='green', linewidth=2, markersize=4)
-                    ax3.set_title(f"{selected_player} - Minutes Per Game ({selected_season})")
-                    ax3.set_xlabel("Game Date")
-                    ax3.set_ylabel("Minutes")
-                    ax3.grid(True, alpha=0.3)
-                    plt.xticks(rotation=45)
-                    plt.tight_layout()
-                    st.pyplot(fig3)
+                    st.warning("Minutes data is not available to display this chart.")
+            
+            with chart_col2:
+                st.subheader("📊 Other Stats (Last 10 Games)")
+                other_stats_cols = ["REB", "AST", "STL", "BLK"]
+                if all(col in logs.columns for col in other_stats_cols) and 'GAME_DATE' in logs.columns:
+                    st.image(recent_stats_chart(logs, selected_player, player_id, selected_season, other_stats_cols), use_container_width=True)
                 else:
-                    st.info("Player has not played any minutes this season.")
-            else:
-                st.warning("Minutes data is not available to display this chart.")
-        
-        with chart_col2:
-            st.subheader("📊 Other Stats (Last 10 Games)")
-            other_stats_cols = ["REB", "AST", "STL", "BLK"]
-            if all(col in logs.columns for col in other_stats_cols) and 'GAME_DATE' in logs.columns:
-                logs_to_plot = logs.tail(10).copy()
-                logs_to_plot['display_date'] = logs_to_plot['GAME_DATE'].dt.strftime('%m-%d')
-                
-                fig2, ax2 = plt.subplots(figsize=(8, 5))
-                logs_to_plot.plot(x="display_date", y=other_stats_cols, kind="bar", ax=ax2)
-                ax2.set_title(f"{selected_player} - Recent Performance ({selected_season})")
-                ax2.set_xlabel("Game Date")
-                ax2.set_ylabel("Count")
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                st.pyplot(fig2)
-            else:
-                st.warning("REB, AST, STL, or BLK data is not available to display this chart.")
+                    st.warning("REB, AST, STL, or BLK data is not available to display this chart.")
 
-            st.subheader("🎯 Shooting Percentages Over Time")
-            shooting_cols = ['FG_PCT', 'FG3_PCT', 'FT_PCT']
-            available_shooting_cols = [col for col in shooting_cols if col in logs.columns]
+                st.subheader("🎯 Shooting Percentages Over Time")
+                shooting_cols = ['FG_PCT', 'FG3_PCT', 'FT_PCT']
+                available_shooting_cols = [col for col in shooting_cols if col in logs.columns]
 
-            if available_shooting_cols and 'GAME_DATE' in logs.columns and logs[available_shooting_cols].sum().sum() > 0:
-                fig4, ax4 = plt.subplots(figsize=(8, 5))
-                
-                for col in available_shooting_cols:
-                    if logs[col].sum() > 0: # Only plot if there is data
-                        marker = 'o' if col == 'FG_PCT' else 's' if col == 'FG3_PCT' else '^'
-                        color = 'orange' if col == 'FG_PCT' else 'red' if col == 'FG3_PCT' else 'purple'
-                        label = 'FG%' if col == 'FG_PCT' else '3P%' if col == 'FG3_PCT' else 'FT%'
-                        ax4.plot(logs["GAME_DATE"], logs[col], marker=marker, color=color, linewidth=2, markersize=4, label=label)
-                
-                ax4.set_title(f"{selected_player} - Shooting Percentages ({selected_season})")
-                ax4.set_xlabel("Game Date")
-                ax4.set_ylabel("Percentage")
-                ax4.grid(True, alpha=0.3)
-                if ax4.has_data():
-                    ax4.legend()
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                st.pyplot(fig4)
-            else:
-                st.warning("Shooting percentage data is not available or is all zero.")
+                if available_shooting_cols and 'GAME_DATE' in logs.columns and logs[available_shooting_cols].sum().sum() > 0:
+                    st.image(shooting_chart(logs, selected_player, player_id, selected_season, available_shooting_cols), use_container_width=True)
+                else:
+                    st.warning("Shooting percentage data is not available or is all zero.")
 
-    else:
-        st.error(f"No data available for {selected_player} in the {selected_season} NBA season.")
-        st.info("Try selecting a different season or player.")
+        else:
+            st.error(f"No data available for {selected_player} in the {selected_season} NBA season.")
+            st.info("Try selecting a different season or player.")
 
-with tab2:
-    st.subheader("📋 Box Score Analysis")
-    
-    if not logs.empty:
-        required_columns = ['GAME_ID', 'GAME_DATE', 'MATCHUP']
-        available_columns = [col for col in required_columns if col in logs.columns]
+@st.fragment
+def box_scores_view(player_id, selected_player, selected_season, logs):
+    """Reruns on its own when another game is picked"""
+    with span("app.box_scores"):
+        st.subheader("📋 Box Score Analysis")
         
-        if len(available_columns) >= 2:  # Need at least GAME_DATE and MATCHUP
-            if 'GAME_ID' in logs.columns:
-                game_options = logs[['GAME_ID', 'GAME_DATE', 'MATCHUP']].drop_duplicates()
-            else:
-                game_options = logs[['GAME_DATE', 'MATCHUP']].drop_duplicates()
-                game_options['GAME_ID'] = game_options.index  # Create a dummy ID
-            
-            game_options['display'] = game_options['GAME_DATE'].dt.strftime('%Y-%m-%d') + ' - ' + game_options['MATCHUP']
-            
-            selected_game = st.selectbox(
-                "Select a game for detailed box score:",
-                options=game_options['display'].tolist()
-            )
+        if not logs.empty:
+            required_columns = ['GAME_ID', 'GAME_DATE', 'MATCHUP']
+            available_columns = [col for col in required_columns if col in logs.columns]
             
-            if selected_game:
-                game_matches = game_options[game_options['display'] == selected_game]
-                if game_matches.empty:
-                    st.error("Selected game not found in data.")
+            if len(available_columns) >= 2:  # Need at least GAME_DATE and MATCHUP
+                if 'GAME_ID' in logs.columns:
+                    game_options = logs[['GAME_ID', 'GAME_DATE', 'MATCHUP']].drop_duplicates()
                 else:
-                    game_info = game_matches.iloc[0]
-                    
-                    if 'GAME_ID' in game_info and game_info['GAME_ID'] != game_info.name:
-                        game_id = game_info['GAME_ID']
+                    game_options = logs[['GAME_DATE', 'MATCHUP']].drop_duplicates()
+                    game_options['GAME_ID'] = game_options.index  # Create a dummy ID
+                
+                game_options['display'] = game_options['GAME_DATE'].dt.strftime('%Y-%m-%d') + ' - ' + game_options['MATCHUP'].astype(str)
+                
+                selected_game = st.selectbox(
+                    "Select a game for detailed box score:",
+                    options=game_options['display'].tolist(),
+                    key="box_score_game"
+                )
+                
+                if selected_game:
+                    game_matches = game_options[game_options['display'] == selected_game]
+                    if game_matches.empty:
+                        st.error("Selected game not found in data.")
+                    else:
+                        game_info = game_matches.iloc[0]
                         
-                        player_box, team_box = get_box_score(game_id)
+                        if 'GAME_ID' in game_info and game_info['GAME_ID'] != game_info.name:
+                            game_id = game_info['GAME_ID']
+                            
+                            player_box, team_box = get_box_score(game_id, final=game_id in finished_game_ids(logs))
+                            
+                            if not player_box.empty:
+                                st.subheader(f"📊 Player Box Score - {selected_game}")
+                                
+                                player_game_stats = player_box[player_box['PLAYER_ID'] == player_id]
+                                
+                                if not player_game_stats.empty:
+                                    player_stats = player_game_stats.iloc[0]
+                                    
+                                    box_col1, box_col2, box_col3, box_col4 = st.columns(4)
+                                    
+                                    with box_col1:
+                                        st.metric("Points", int(player_stats.get('PTS', 0)))
+                                        st.metric("Rebounds", int(player_stats.get('REB', 0)))
+                                    
+                                    with box_col2:
+                                        st.metric("Assists", int(player_stats.get('AST', 0)))
+                                        st.metric("Steals", int(player_stats.get('STL', 0)))
+                                    
+                                    with box_col3:
+                                        st.metric("Blocks", int(player_stats.get('BLK', 0)))
+                                        st.metric("Minutes", f"{player_stats.get('MIN', 0):.1f}")
+                                    
+                                    with box_col4:
+                                        st.metric("FG%", f"{player_stats.get('FG_PCT', 0):.3f}")
+                                        st.metric("3P%", f"{player_stats.get('FG3_PCT', 0):.3f}")
+                                    
+                                    st.subheader("🎯 Game Performance Breakdown")
+                                    
+                                    categories = ['PTS', 'REB', 'AST', 'STL', 'BLK']
+                                    values = [player_stats.get(cat, 0) for cat in categories]
+                                    
+                                    st.image(
+                                        game_breakdown_chart(categories, values, f"{selected_player} Performance - {selected_game}", player_id, selected_game),
+                                        use_container_width=True
+                                    )
+                                
+                                st.subheader("📋 Complete Game Box Score")
+                                st.dataframe(player_box)
+                            
+                            else:
+                                st.error("No box score data available for this game.")
                         
-                        if not player_box.empty:
-                            st.subheader(f"📊 Player Box Score - {selected_game}")
+                        else:
+                            st.subheader(f"📊 Game Data - {selected_game}")
                             
-                            player_game_stats = player_box[player_box['PLAYER_ID'] == player_id]
+                            game_date = game_info['GAME_DATE']
+                            matchup = game_info['MATCHUP']
                             
-                            if not player_game_stats.empty:
-                                player_stats = player_game_stats.iloc[0]
+                            game_data = logs[(logs['GAME_DATE'] == game_date) & (logs['MATCHUP'] == matchup)]
+                            
+                            if not game_data.empty:
+                                player_game_data = game_data.iloc[0]
                                 
                                 box_col1, box_col2, box_col3, box_col4 = st.columns(4)
                                 
                                 with box_col1:
-                                    st.metric("Points", int(player_stats.get('PTS', 0)))
-                                    st.metric("Rebounds", int(player_stats.get('REB', 0)))
+                                    st.metric("Points", int(player_game_data.get('PTS', 0)))
+                                    st.metric("Rebounds", int(player_game_data.get('REB', 0)))
                                 
                                 with box_col2:
-                                    st.metric("Assists", int(player_stats.get('AST', 0)))
-                                    st.metric("Steals", int(player_stats.get('STL', 0)))
+                                    st.metric("Assists", int(player_game_data.get('AST', 0)))
+                                    st.metric("Steals", int(player_game_data.get('STL', 0)))
                                 
                                 with box_col3:
-                                    st.metric("Blocks", int(player_stats.get('BLK', 0)))
-                                    st.metric("Minutes", player_stats.get('MIN', '0'))
+                                    st.metric("Blocks", int(player_game_data.get('BLK', 0)))
+                                    st.metric("Minutes", f"{player_game_data.get('MIN', 0):.1f}")
                                 
                                 with box_col4:
-                                    st.metric("FG%", f"{player_stats.get('FG_PCT', 0):.3f}")
-                                    st.metric("3P%", f"{player_stats.get('FG3_PCT', 0):.3f}")
+                                    st.metric("FG%", f"{player_game_data.get('FG_PCT', 0):.3f}")
+                                    st.metric("3P%", f"{player_game_data.get('FG3_PCT', 0):.3f}")
                                 
                                 st.subheader("🎯 Game Performance Breakdown")
                                 
                                 categories = ['PTS', 'REB', 'AST', 'STL', 'BLK']
-                                values = [player_stats.get(cat, 0) for cat in categories]
-                                
-                                fig_radar, ax_radar = plt.subplots(figsize=(10, 6))
-                                bars = ax_radar.bar(categories, values, color=['blue', 'green', 'purple', 'orange', 'red'])
-                                ax_radar.set_title(f"{selected_player} Performance - {selected_game}")
-                                ax_radar.set_ylabel('Count')
+                                values = [player_game_data.get(cat, 0) for cat in categories]
                                 
-                                for bar, value in zip(bars, values):
-                                    height = bar.get_height()
-                                    ax_radar.text(bar.get_x() + bar.get_width()/2., height,
-                                                f'{value}', ha='center', va='bottom')
+                                st.image(
+                                    game_breakdown_chart(categories, values, f"{selected_player} Performance - {selected_game}", player_id, selected_game),
+                                    use_container_width=True
+                                )
                                 
-                                plt.tight_layout()
-                                st.pyplot(fig_radar)
+                                st.subheader("📋 Game Data")
+                                st.dataframe(game_data)
                             
-                            st.subheader("📋 Complete Game Box Score")
-                            st.dataframe(player_box)
-                        
-                        else:
-                            st.error("No box score data available for this game.")
-                    
-                    else:
-                        st.subheader(f"📊 Game Data - {selected_game}")
-                        
-                        game_date = game_info['GAME_DATE']
-                        matchup = game_info['MATCHUP']
-                        
-                        game_data = logs[(logs['GAME_DATE'] == game_date) & (logs['MATCHUP'] == matchup)]
-                        
-                        if not game_data.empty:
-                            player_game_data = game_data.iloc[0]
-                            
-                            box_col1, box_col2, box_col3, box_col4 = st.columns(4)
-                            
-                            with box_col1:
-                                st.metric("Points", int(player_game_data.get('PTS', 0)))
-                                st.metric("Rebounds", int(player_game_data.get('REB', 0)))
-                            
-                            with box_col2:
-                                st.metric("Assists", int(player_game_data.get('AST', 0)))
-                                st.metric("Steals", int(player_game_data.get('STL', 0)))
-                            
-                            with box_col3:
-                                st.metric("Blocks", int(player_game_data.get('BLK', 0)))
-                                st.metric("Minutes", player_game_data.get('MIN', '0'))
-                            
-                            with box_col4:
-                                st.metric("FG%", f"{player_game_data.get('FG_PCT', 0):.3f}")
-                                st.metric("3P%", f"{player_game_data.get('FG3_PCT', 0):.3f}")
-                            
-                            st.subheader("🎯 Game Performance Breakdown")
-                            
-                            categories = ['PTS', 'REB', 'AST', 'STL', 'BLK']
-                            values = [player_game_data.get(cat, 0) for cat in categories]
-                            
-                            fig_radar, ax_radar = plt.subplots(figsize=(10, 6))
-                            bars = ax_radar.bar(categories, values, color=['blue', 'green', 'purple', 'orange', 'red'])
-                            ax_radar.set_title(f"{selected_player} Performance - {selected_game}")
-                            ax_radar.set_ylabel('Count')
-                            
-                            for bar, value in zip(bars, values):
-                                height = bar.get_height()
-                                ax_radar.text(bar.get_x() + bar.get_width()/2., height,
-                                            f'{value}', ha='center', va='bottom')
-                            
-                            plt.tight_layout()
-                            st.pyplot(fig_radar)
-                            
-                            st.subheader("📋 Game Data")
-                            st.dataframe(game_data)
-                        
-                        else:
-                            st.error("No game data found for the selected game.")
+                            else:
+                                st.error("No game data found for the selected game.")
+            
+            else:
+                st.error("Required columns (GAME_DATE, MATCHUP) not found in game logs.")
+                st.write("Available columns:", list(logs.columns))
         
         else:
-            st.error("Required columns (GAME_DATE, MATCHUP) not found in game logs.")
-            st.write("Available columns:", list(logs.columns))
-    
-    else:
-        st.info("No game data available. Please select a player with game logs first.")
+            st.info("No game data available. Please select a player with game logs first.")
 
-with tab3:
-    st.subheader("🆚 Player Comparison")
-    
-    st.write("Select players to compare their season statistics:")
-    
-    comparison_players = st.multiselect(
-        "Choose players to compare (up to 6):",
-        player_names,
-        max_selections=6,
-        help="Select 2-6 players to compare their season statistics"
-    )
-    
-    if len(comparison_players) >= 2:
-        st.write(f"Loading statistics for {len(comparison_players)} players...")
+def comparison_view(player_id, selected_player, selected_season, player_index):
+    with span("app.comparison"):
+        st.subheader(f"🔎 Players Similar to {selected_player}")
+        similar_players = find_similar_players(player_id, selected_season)
+        if not similar_players.empty:
+            st.caption(f"Closest {selected_season} per-game averages and shooting percentages")
+            similar_names = similar_players['player_id'].map(player_index.id_to_name)
+            similar_players.insert(0, 'player_name', similar_names.fillna(similar_players['player_id'].astype(str)))
+            st.dataframe(similar_players.drop(columns=['player_id', 'distance']), hide_index=True)
+        else:
+            st.info(f"Not enough {selected_season} games to find players similar to {selected_player}.")
+
+        player_comparison(selected_season, player_index)
+
+@st.fragment
+def player_comparison(selected_season, player_index):
+    """Reruns on its own when the compared players change"""
+    with span("app.player_comparison"):
+        st.subheader("🆚 Player Comparison")
         
-        comparison_player_ids = []
-        for player_name in comparison_players:
-            player_id = players_df[players_df["full_name"] == player_name]["id"].values[0]
-            comparison_player_ids.append(player_id)
+        st.write("Select players to compare their season statistics:")
         
-        comparison_data = compare_players(comparison_player_ids, selected_season)
+        comparison_players = st.multiselect(
+            "Choose players to compare (up to 6):",
+            player_index.names,
+            max_selections=6,
+            help="Select 2-6 players to compare their season statistics",
+            key="comparison_players"
+        )
         
-        if not comparison_data.empty:
-            player_id_to_name = {players_df[players_df["full_name"] == name]["id"].values[0]: name for name in comparison_players}
-            comparison_data['player_name'] = comparison_data['player_id'].map(player_id_to_name)
+        if len(comparison_players) >= 2:
+            st.write(f"Loading statistics for {len(comparison_players)} players...")
             
-            st.success(f"✅ Successfully loaded data for {len(comparison_data)} players")
+            comparison_player_ids = [player_index.name_to_id[name] for name in comparison_players]
             
-            comp_col1, comp_col2 = st.columns(2)
+            comparison_data = compare_players(comparison_player_ids, selected_season, bulk=True)
             
-            with comp_col1:
-                fig_ppg, ax_ppg = plt.subplots(figsize=(10, 6))
-                bars = ax_ppg.bar(comparison_data['player_name'], comparison_data['ppg'], color='skyblue')
-                ax_ppg.set_title('Points Per Game Comparison')
-                ax_ppg.set_ylabel('PPG')
-                plt.xticks(rotation=45)
-                
-                for bar, value in zip(bars, comparison_data['ppg']):
-                    height = bar.get_height()
-                    ax_ppg.text(bar.get_x() + bar.get_width()/2., height,
-                              f'{value}', ha='center', va='bottom')
-                
-                plt.tight_layout()
-                st.pyplot(fig_ppg)
-                
-                fig_rpg, ax_rpg = plt.subplots(figsize=(10, 6))
-                bars = ax_rpg.bar(comparison_data['player_name'], comparison_data['rpg'], color='lightgreen')
-                ax_rpg.set_title('Rebounds Per Game Comparison')
-                ax_rpg.set_ylabel('RPG')
-                plt.xticks(rotation=45)
+            if not comparison_data.empty:
+                comparison_data['player_name'] = comparison_data['player_id'].map(player_index.id_to_name)
                 
-                for bar, value in zip(bars, comparison_data['rpg']):
-                    height = bar.get_height()
-                    ax_rpg.text(bar.get_x() + bar.get_width()/2., height,
-                              f'{value}', ha='center', va='bottom')
+                st.success(f"✅ Successfully loaded data for {len(comparison_data)} players")
                 
-                plt.tight_layout()
-                st.pyplot(fig_rpg)
-            
-            with comp_col2:
-                fig_apg, ax_apg = plt.subplots(figsize=(10, 6))
-                bars = ax_apg.bar(comparison_data['player_name'], comparison_data['apg'], color='plum')
-                ax_apg.set_title('Assists Per Game Comparison')
-                ax_apg.set_ylabel('APG')
-                plt.xticks(rotation=45)
+                comp_col1, comp_col2 = st.columns(2)
                 
-                for bar, value in zip(bars, comparison_data['apg']):
-                    height = bar.get_height()
-                    ax_apg.text(bar.get_x() + bar.get_width()/2., height,
-                              f'{value}', ha='center', va='bottom')
+                with comp_col1:
+                    st.image(comparison_bar_chart(comparison_data, 'ppg', 'Points Per Game Comparison', 'PPG', 'skyblue', selected_season), use_container_width=True)
+                    st.image(comparison_bar_chart(comparison_data, 'rpg', 'Rebounds Per Game Comparison', 'RPG', 'lightgreen', selected_season), use_container_width=True)
                 
-                plt.tight_layout()
-                st.pyplot(fig_apg)
+                with comp_col2:
+                    st.image(comparison_bar_chart(comparison_data, 'apg', 'Assists Per Game Comparison', 'APG', 'plum', selected_season), use_container_width=True)
+                    st.image(comparison_shooting_chart(comparison_data, selected_season), use_container_width=True)
                 
-                fig_shooting, ax_shooting = plt.subplots(figsize=(10, 6))
-                x = range(len(comparison_data))
-                width = 0.25
+                st.subheader("📋 Detailed Comparison Table")
+                display_cols = ['player_name', 'games_played', 'ppg', 'rpg', 'apg', 'spg', 'bpg', 'mpg', 'fg_pct', 'fg3_pct', 'ft_pct']
+                available_display_cols = [col for col in display_cols if col in comparison_data.columns]
+                st.dataframe(comparison_data[available_display_cols])
                 
-                ax_shooting.bar([i - width for i in x], comparison_data['fg_pct'], width, label='FG%', color='orange')
-                ax_shooting.bar(x, comparison_data['fg3_pct'], width, label='3P%', color='red')
-                ax_shooting.bar([i + width for i in x], comparison_data['ft_pct'], width, label='FT%', color='purple')
-                
-                ax_shooting.set_title('Shooting Percentages Comparison')
-                ax_shooting.set_ylabel('Percentage')
-                ax_shooting.set_xticks(x)
-                ax_shooting.set_xticklabels(comparison_data['player_name'], rotation=45)
-                ax_shooting.legend()
-                plt.tight_layout()
-                st.pyplot(fig_shooting)
-            
-            st.subheader("📋 Detailed Comparison Table")
-            display_cols = ['player_name', 'games_played', 'ppg', 'rpg', 'apg', 'spg', 'bpg', 'mpg', 'fg_pct', 'fg3_pct', 'ft_pct']
-            available_display_cols = [col for col in display_cols if col in comparison_data.columns]
-            st.dataframe(comparison_data[available_display_cols])
-            
-            st.subheader("🏆 Season Summary")
-            if not comparison_data.empty:
-                summary_col1, summary_col2, summary_col3 = st.columns(3)
+                st.subheader("🏆 Season Summary")
+                if not comparison_data.empty:
+                    summary_col1, summary_col2, summary_col3 = st.columns(3)
 
-                with summary_col1:
-                    top_scorer = comparison_data.loc[comparison_data['ppg'].idxmax()]
-                    st.metric("Top Scorer", f"{top_scorer['ppg']:.1f} PPG", top_scorer['player_name'])
-                    
-                    top_rebounder = comparison_data.loc[comparison_data['rpg'].idxmax()]
-                    st.metric("Top Rebounder", f"{top_rebounder['rpg']:.1f} RPG", top_rebounder['player_name'])
-                
-                with summary_col2:
-                    top_assister = comparison_data.loc[comparison_data['apg'].idxmax()]
-                    st.metric("Top Assister", f"{top_assister['apg']:.1f} APG", top_assister['player_name'])
+                    with summary_col1:
+                        top_scorer = comparison_data.loc[comparison_data['ppg'].idxmax()]
+                        st.metric("Top Scorer", f"{top_scorer['ppg']:.1f} PPG", top_scorer['player_name'])
+                        
+                        top_rebounder = comparison_data.loc[comparison_data['rpg'].idxmax()]
+                        st.metric("Top Rebounder", f"{top_rebounder['rpg']:.1f} RPG", top_rebounder['player_name'])
                     
-                    top_shooter = comparison_data.loc[comparison_data['fg_pct'].idxmax()]
-                    st.metric("Best FG%", f"{top_shooter['fg_pct']:.3f}", top_shooter['player_name'])
-                
-                with summary_col3:
-                    most_games = comparison_data.loc[comparison_data['games_played'].idxmax()]
-                    st.metric("Most Games", f"{most_games['games_played']}", most_games['player_name'])
+                    with summary_col2:
+                        top_assister = comparison_data.loc[comparison_data['apg'].idxmax()]
+                        st.metric("Top Assister", f"{top_assister['apg']:.1f} APG", top_assister['player_name'])
+                        
+                        top_shooter = comparison_data.loc[comparison_data['fg_pct'].idxmax()]
+                        st.metric("Best FG%", f"{top_shooter['fg_pct']:.3f}", top_shooter['player_name'])
                     
-                    top_3pt = comparison_data.loc[comparison_data['fg3_pct'].idxmax()]
-                    st.metric("Best 3P%", f"{top_3pt['fg3_pct']:.3f}", top_3pt['player_name'])
+                    with summary_col3:
+                        most_games = comparison_data.loc[comparison_data['games_played'].idxmax()]
+                        st.metric("Most Games", f"{most_games['games_played']}", most_games['player_name'])
+                        
+                        top_3pt = comparison_data.loc[comparison_data['fg3_pct'].idxmax()]
+                        st.metric("Best 3P%", f"{top_3pt['fg3_pct']:.3f}", top_3pt['player_name'])
+                else:
+                    st.write("No data to summarize.")
+            
             else:
-                st.write("No data to summarize.")
+                st.error("No comparison data available for the selected players.")
+                st.write("This might be due to:")
+                st.write("- Players not having data for the selected season")
+                st.write("- API connection issues")
+                st.write("- Players being inactive in the selected season")
+                st.write("Try selecting different players or a different season.")
         
         else:
-            st.error("No comparison data available for the selected players.")
-            st.write("This might be due to:")
-            st.write("- Players not having data for the selected season")
-            st.write("- API connection issues")
-            st.write("- Players being inactive in the selected season")
-            st.write("Try selecting different players or a different season.")
-    
-    else:
-        st.info("Please select at least 2 players to compare.")
\ No newline at end of file
+            st.info("Please select at least 2 players to compare.")
+
+def teams_view(selected_season):
+    with span("app.teams"):
+        st.subheader(f"🏟️ {selected_season} Team Analytics")
+
+        team_list = get_team_list()
+        team_names = dict(zip(team_list['id'], team_list['full_name']))
+        team_frame = get_team_season_frame(selected_season)
+
+        if not team_frame.empty:
+            team_detail(selected_season, team_list, team_names, team_frame)
+
+            st.subheader("📋 League Table")
+            league_table = team_frame.assign(team=team_frame.index.map(team_names)).sort_values('net_rating', ascending=False)
+            display_cols = ['team', 'W', 'L', 'pace', 'off_rating', 'def_rating', 'net_rating']
+            st.dataframe(league_table[[col for col in display_cols if col in league_table.columns]], hide_index=True)
+        else:
+            st.info("No team data available for this season.")
+
+@st.fragment
+def team_detail(selected_season, team_list, team_names, team_frame):
+    """Reruns on its own when another team is picked"""
+    with span("app.team_detail"):
+        selected_team = st.selectbox("Select a team", sorted(team_names.values()), key="selected_team")
+        team_id = team_list.loc[team_list['full_name'] == selected_team, 'id'].iloc[0]
+
+        if team_id in team_frame.index:
+            team_row = team_frame.loc[team_id]
+            team_col1, team_col2, team_col3, team_col4 = st.columns(4)
+
+            def rank_label(col):
+                rank = team_row.get(f'{col}_rank')
+                return f"#{int(rank)} in league" if pd.notna(rank) else None
+
+            with team_col1:
+                if pd.notna(team_row.get('W')):
+                    st.metric("Record", f"{int(team_row['W'])}-{int(team_row['L'])}")
+            # Ratings need both teams of a game in the logs
+            if pd.notna(team_row.get('pace')):
+                with team_col1:
+                    st.metric("Pace", f"{team_row['pace']:.1f}", rank_label('pace'), delta_color="off")
+                with team_col2:
+                    st.metric("Offensive Rating", f"{team_row['off_rating']:.1f}", rank_label('off_rating'), delta_color="off")
+                with team_col3:
+                    st.metric("Defensive Rating", f"{team_row['def_rating']:.1f}", rank_label('def_rating'), delta_color="off")
+                with team_col4:
+                    st.metric("Net Rating", f"{team_row['net_rating']:+.1f}", rank_label('net_rating'), delta_color="off")
+
+            st.subheader("📈 Share of Team Plays")
+            team_usage = get_team_usage(team_id, selected_season)
+            if not team_usage.empty:
+                st.vega_lite_chart(team_usage.head(10), bar_chart_spec('PLAYER_NAME', 'usage_share'), use_container_width=True)
+                st.dataframe(team_usage[['PLAYER_NAME', 'games_played', 'minutes', 'usg_pct', 'usage_share']], hide_index=True)
+        else:
+            st.info(f"No games found for the {selected_team} in {selected_season}.")
+
+@st.fragment
+def leaders_view(selected_season, player_index):
+    """Reruns on its own when the stat or filters change"""
+    with span("app.leaders"):
+        st.subheader(f"🏆 {selected_season} League Leaders")
+
+        leader_stats = {
+            'PPG': 'ppg', 'RPG': 'rpg', 'APG': 'apg', 'SPG': 'spg', 'BPG': 'bpg', 'MPG': 'mpg',
+            'FG%': 'fg_pct', '3P%': 'fg3_pct', 'FT%': 'ft_pct', 'Games Played': 'games_played',
+        }
+        leader_col1, leader_col2, leader_col3, leader_col4 = st.columns(4)
+        with leader_col1:
+            leader_stat = st.selectbox("Stat", list(leader_stats), key="leader_stat")
+        with leader_col2:
+            min_games = st.number_input("Minimum games", min_value=0, value=0, step=5, key="leader_min_games")
+        with leader_col3:
+            min_minutes = st.number_input("Minimum minutes", min_value=0, value=0, step=100, key="leader_min_minutes")
+        with leader_col4:
+            leader_count = st.number_input("Players shown", min_value=5, max_value=100, value=25, step=5, key="leader_count")
+
+        leaders = get_league_leaders(leader_stats[leader_stat], selected_season, leader_count, min_games, min_minutes)
+        if not leaders.empty:
+            leader_names = leaders['player_id'].map(player_index.id_to_name)
+            leaders.insert(1, 'player_name', leader_names.fillna(leaders['player_id'].astype(str)))
+            st.dataframe(leaders.drop(columns=['player_id']), hide_index=True)
+        else:
+            st.info("No players match these filters.")
+
+def career_view(player_id, selected_player):
+    with span("app.career"):
+        st.subheader(f"📈 {selected_player} Career Trajectory")
+        career_summary, splits = get_player_career(player_id)
+
+        if not career_summary.empty:
+            latest = career_summary.iloc[-1]
+            latest_season = career_summary.index[-1]
+            st.caption(f"{latest_season} season, change from the season before")
+            career_col1, career_col2, career_col3, career_col4 = st.columns(4)
+
+            def change_label(stat, digits=1):
+                change = latest[f'{stat}_change']
+                return f"{change:+.{digits}f}" if pd.notna(change) else None
+
+            with career_col1:
+                st.metric("PPG", f"{latest['ppg']:.1f}", change_label('ppg'))
+            with career_col2:
+                st.metric("RPG", f"{latest['rpg']:.1f}", change_label('rpg'))
+            with career_col3:
+                st.metric("APG", f"{latest['apg']:.1f}", change_label('apg'))
+            with career_col4:
+                st.metric("FG%", f"{latest['fg_pct']:.3f}", change_label('fg_pct', 3))
+
+            st.subheader("📈 Averages by Season")
+            career_long = career_summary[['ppg', 'rpg', 'apg', 'mpg']].set_axis(career_summary.index.astype(str)).rename_axis('season')
+            career_long = career_long.reset_index().melt('season', var_name='stat', value_name='average')
+            st.vega_lite_chart(career_long, line_chart_spec('season', 'ordinal', 'average', 'stat'), use_container_width=True)
+
+            st.subheader("📋 Season by Season")
+            st.dataframe(career_summary)
+
+            st.subheader("🔀 Career Splits")
+            st.dataframe(splits)
+        else:
+            st.info(f"No game logs found for {selected_player} in the available seasons.")
+
+def operator_view():
+    st.subheader("🛠️ Operator Metrics")
+    st.caption("Process-wide, shared by every session since the server started.")
+
+    st.write("Timing spans")
+    st.dataframe(span_report(), hide_index=True)
+    st.write("stats.nba.com requests")
+    st.dataframe(upstream_report(), hide_index=True)
+    st.write("Cache hit ratios")
+    st.dataframe(cache_stats(), hide_index=True)
+    st.write("Refresh-ahead")
+    st.dataframe(pd.DataFrame([refresh_stats()]), hide_index=True)
+    st.write("Logged warnings and errors")
+    st.dataframe(error_report(), hide_index=True)
+
+    with st.expander("Game log memory"):
+        st.caption("League game logs as stats.nba.com returns them and with the compact schema. Measuring refetches every season.")
+        if st.button("Measure"):
+            st.session_state["memory_report"] = get_game_log_memory_report()
+        if "memory_report" in st.session_state:
+            st.dataframe(st.session_state["memory_report"], hide_index=True)
+
+    with st.expander("Prometheus text"):
+        metrics_text = prometheus_text()
+        st.download_button("Download metrics", metrics_text, file_name="nba_stats_metrics.txt", mime="text/plain")
+        st.code(metrics_text, language=None)
+
+    st.checkbox("Profile this session's script runs", key="profile_runs",
+                help="Uses pyinstrument if installed, otherwise cProfile. Applies from the next run.")
+    if "last_profile" in st.session_state:
+        with st.expander("Last profiled run"):
+            st.code(st.session_state["last_profile"], language=None)
+
+view_names = ["📊 Player Stats", "📋 Box Scores", "🆚 Player Comparison", "🏟️ Teams", "🏆 Leaders"]
+if career_mode:
+    view_names.append("📈 Career")
+if operator_mode:
+    view_names.append("🛠️ Operator")
+
+# Only the selected view is computed, where tabs would run every one of them on each rerun
+view = st.radio("View", view_names, horizontal=True, key="view", label_visibility="collapsed")
+
+if view == "📊 Player Stats":
+    player_stats_view(player_id, selected_player, selected_season, logs)
+elif view == "📋 Box Scores":
+    box_scores_view(player_id, selected_player, selected_season, logs)
+elif view == "🆚 Player Comparison":
+    comparison_view(player_id, selected_player, selected_season, player_index)
+elif view == "🏟️ Teams":
+    teams_view(selected_season)
+elif view == "🏆 Leaders":
+    leaders_view(selected_season, player_index)
+elif view == "📈 Career":
+    career_view(player_id, selected_player)
+
+startup_timer.mark("view")
+record_run(startup_timer)
+observe_span("app.script_run", startup_timer.total)
+
+# Timing report for operators, shown with ?timings=1 or NBA_STATS_SHOW_TIMINGS=1
+if st.query_params.get("timings") == "1" or os.environ.get("NBA_STATS_SHOW_TIMINGS") == "1":
+    with st.sidebar.expander("⏱️ Startup Timing"):
+        st.write("Cold start")
+        st.dataframe(cold_start_report())
+        st.write("This run")
+        st.dataframe(startup_timer.report())
+
+if operator_mode:
+    if profiler is not None:
+        st.session_state["last_profile"] = profiler.stop()
+    if view == "🛠️ Operator":
+        operator_view()
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# A store of our own, no rate limit on replayed requests and no background refreshes; set before utils is imported
+os.environ["NBA_STATS_DATA_DIR"] = tempfile.mkdtemp(prefix="nba-stats-test-")
+os.environ["NBA_STATS_MAX_RPS"] = "100000"
+os.environ["NBA_STATS_REFRESH_AHEAD"] = "0"
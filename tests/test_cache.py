@@ -0,0 +1,49 @@
+"""Cache tier behaviour: single computation per key and memory accounting."""
+import threading
+import time
+import pandas as pd
+import pytest
+from utils import cache
+from utils.cache import NoCacheBackend, _sizeof, cached, set_cache_backend
+from utils.player_index import PlayerIndex
+
+@pytest.fixture
+def no_cache():
+    # Nothing is kept, so every caller that gets the key's lock computes it
+    backend = cache.get_cache_backend()
+    set_cache_backend(NoCacheBackend())
+    yield
+    set_cache_backend(backend)
+
+def test_key_is_computed_by_one_thread_at_a_time(no_cache):
+    running = []
+    overlaps = []
+
+    @cached(ttl=60)
+    def slow_load(key):
+        running.append(key)
+        overlaps.append(len(running))
+        time.sleep(0.2)
+        running.remove(key)
+        return key
+
+    threads = []
+    start = time.monotonic()
+    # The third caller arrives after the first has finished, while the second is computing
+    for delay in (0, 0.05, 0.25):
+        time.sleep(max(0, start + delay - time.monotonic()))
+        thread = threading.Thread(target=slow_load, args=("key",))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    assert len(overlaps) == 3
+    assert max(overlaps) == 1
+    assert not cache._key_locks
+
+def test_sizeof_counts_the_data_an_object_holds():
+    players = pd.DataFrame({'id': range(500), 'full_name': [f"Player Number {i}" for i in range(500)]})
+    index = PlayerIndex(players)
+    # The names, lookups and search keys, not just the outer object
+    assert _sizeof(index) > 100 * len(index)
@@ -0,0 +1,144 @@
+"""Data loader checks against the synthetic stats.nba.com fixtures in benchmarks/fixtures."""
+import shutil
+import time
+import pandas as pd
+import pytest
+from benchmarks.fixtures import FIXTURE_PLAYER_IDS, FIXTURE_SEASON, load_fixtures, replay_fixtures
+from utils import data_loader, storage
+from utils.advanced_stats import compute_rolling_stats
+from utils.aggregation import SEASON_STAT_COLUMNS
+from utils.splits import split_cells, split_summary, tag_splits
+
+def _fixture_league_logs():
+    """The LeagueGameLog fixture rows for the fixture season, as a frame"""
+    response = load_fixtures()["leaguegamelog"]["responses"][f"PlayerOrTeam=P&Season={FIXTURE_SEASON}"]
+    result = response["resultSets"][0]
+    return pd.DataFrame(result["rowSet"], columns=result["headers"])
+
+@pytest.fixture
+def replay():
+    data_loader.reset_caches()
+    shutil.rmtree(storage.DATA_DIR, ignore_errors=True)
+    with replay_fixtures() as replay:
+        yield replay
+
+def test_league_game_logs_match_fixture(replay):
+    fixture = _fixture_league_logs()
+    logs = data_loader.get_league_game_logs(FIXTURE_SEASON)
+
+    assert logs.shape == fixture.shape
+    assert set(logs.columns) == set(fixture.columns)
+    assert pd.api.types.is_datetime64_any_dtype(logs['GAME_DATE'])
+    assert logs['GAME_DATE'].is_monotonic_increasing
+    assert logs['PTS'].sum() == fixture['PTS'].sum()
+    assert replay.missing == 0
+
+def test_season_stats_frame_has_one_row_per_player(replay):
+    fixture = _fixture_league_logs()
+    season_stats = data_loader.get_season_stats_frame(FIXTURE_SEASON)
+
+    assert season_stats.index.name == 'PLAYER_ID'
+    assert set(season_stats.index) == set(fixture['PLAYER_ID'])
+    assert list(season_stats.columns[:len(SEASON_STAT_COLUMNS)]) == SEASON_STAT_COLUMNS
+    assert season_stats['games_played'].sum() == len(fixture)
+    assert season_stats.attrs['fingerprint']
+
+def test_season_without_fixture_is_empty(replay):
+    assert data_loader.get_league_game_logs("1999").empty
+    assert data_loader.get_season_stats_frame("1999").empty
+
+def test_player_seasons_are_indexed_in_the_background(replay):
+    player_id = _fixture_league_logs()['PLAYER_ID'].iloc[0]
+
+    # Nothing is built or persisted yet, so the first render gets no seasons rather than waiting
+    assert data_loader.get_player_available_seasons(player_id) == []
+    data_loader._player_seasons_build.result()
+    assert data_loader.get_player_available_seasons(player_id) == [FIXTURE_SEASON]
+
+def test_reset_caches_forgets_in_process_indexes(replay):
+    leaderboards = data_loader.get_leaderboards(FIXTURE_SEASON)
+    assert data_loader.get_leaderboards(FIXTURE_SEASON) is leaderboards
+
+    data_loader.reset_caches()
+    assert data_loader.get_leaderboards(FIXTURE_SEASON) is not leaderboards
+
+def test_box_score_prefetch_is_not_repeated_on_rerun(replay):
+    player_id = FIXTURE_PLAYER_IDS[0]
+    game_ids = data_loader.get_player_game_logs(player_id, FIXTURE_SEASON)['GAME_ID'].tolist()
+
+    def prefetch():
+        data_loader.prefetch_box_scores(player_id, FIXTURE_SEASON, game_ids)
+        while data_loader._prefetch_pending:
+            time.sleep(0.01)
+        return replay.requests
+
+    requests = prefetch()
+    # Games without a fixture come back empty like a game in progress, and aren't asked for again either
+    assert prefetch() == requests
+    data_loader._prefetched_logs.clear()
+    assert prefetch() == requests
+
+def test_incremental_stats_pick_up_corrected_games(replay, monkeypatch):
+    player_id = FIXTURE_PLAYER_IDS[0]
+    logs = data_loader.get_player_game_logs(player_id, FIXTURE_SEASON)
+    served = {'logs': logs.iloc[:-1]}
+    monkeypatch.setattr(data_loader, 'get_player_game_logs', lambda player_id, season=None: served['logs'])
+    monkeypatch.setattr(data_loader, 'get_player_available_seasons', lambda player_id: [FIXTURE_SEASON])
+
+    def load():
+        return (data_loader.get_player_rolling_stats(player_id, FIXTURE_SEASON),
+                data_loader.get_player_splits(player_id, FIXTURE_SEASON),
+                data_loader.get_player_career_logs(player_id))
+
+    def check(expected):
+        rolling, splits, career_logs = load()
+        pd.testing.assert_frame_equal(rolling, compute_rolling_stats(expected))
+        pd.testing.assert_frame_equal(splits, split_summary(split_cells(tag_splits(expected))))
+        assert career_logs['PTS'].sum() == expected['PTS'].sum()
+
+    load()
+    # A new game is added on to what was computed before
+    served['logs'] = logs
+    check(logs)
+
+    # A stat correction to an earlier game means starting over
+    corrected = logs.copy()
+    corrected.loc[0, 'PTS'] += 10
+    served['logs'] = corrected
+    check(corrected)
+
+def _tied_after_regulation(endpoint, **params):
+    """A box score fetched as regulation ends in a tie: 240 team minutes each, no winner yet"""
+    players = pd.DataFrame({'GAME_ID': [params['game_id']] * 2, 'PLAYER_ID': [1, 2], 'MIN': ['48:00', '48:00'], 'PTS': [30, 30]})
+    teams = pd.DataFrame({'GAME_ID': [params['game_id']] * 2, 'TEAM_ID': [10, 20], 'MIN': ['240:00', '240:00'], 'PTS': [101, 101]})
+    return [players, teams]
+
+def test_box_score_of_a_game_not_known_to_be_over_is_not_stored(replay, monkeypatch):
+    monkeypatch.setattr(data_loader.nba_client, 'fetch_data_frames', _tied_after_regulation)
+    logs = pd.DataFrame({'GAME_ID': ['0022300901', '0022300902'], 'WL': ['W', None]})
+    assert data_loader.finished_game_ids(logs) == ['0022300901']
+
+    # The game is listed without a result, so its full-length box score is only cached
+    player_box, team_box = data_loader.get_box_score('0022300902')
+    assert len(team_box) == 2
+    assert storage.stored_at("box_scores", "0022300902_teams") is None
+
+    data_loader.get_box_score('0022300901', final=True)
+    assert storage.stored_at("box_scores", "0022300901_teams") is not None
+
+def test_modifying_returned_splits_leaves_the_cache_alone(replay):
+    player_id = FIXTURE_PLAYER_IDS[0]
+    splits = data_loader.get_player_splits(player_id, FIXTURE_SEASON)
+    expected = splits.copy()
+
+    splits.iloc[0, 0] = -1
+    pd.testing.assert_frame_equal(data_loader.get_player_splits(player_id, FIXTURE_SEASON), expected)
+
+def test_modifying_returned_career_logs_leaves_the_cache_alone(replay, monkeypatch):
+    player_id = FIXTURE_PLAYER_IDS[0]
+    monkeypatch.setattr(data_loader, 'get_player_available_seasons', lambda player_id: [FIXTURE_SEASON])
+    career_logs = data_loader.get_player_career_logs(player_id)
+    points = career_logs['PTS'].sum()
+
+    career_logs.loc[0, 'PTS'] += 100
+    assert data_loader.get_player_career_logs(player_id)['PTS'].sum() == points
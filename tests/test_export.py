@@ -0,0 +1,35 @@
+"""Batch export against the synthetic fixtures and a failing API."""
+import shutil
+import pandas as pd
+import pytest
+from benchmarks.fixtures import FIXTURE_PLAYER_IDS, FIXTURE_SEASON, replay_fixtures
+from utils import export, nba_client, storage
+from utils.cache import NoCacheBackend, get_cache_backend, set_cache_backend
+
+@pytest.fixture
+def players(monkeypatch):
+    backend = get_cache_backend()
+    set_cache_backend(NoCacheBackend())
+    shutil.rmtree(storage.DATA_DIR, ignore_errors=True)
+    player_list = pd.DataFrame({'id': FIXTURE_PLAYER_IDS, 'full_name': [f"Player {i}" for i in FIXTURE_PLAYER_IDS]})
+    monkeypatch.setattr(export, 'get_player_list', lambda: player_list)
+    yield player_list
+    set_cache_backend(backend)
+
+def test_export_writes_every_player_with_games(players, tmp_path):
+    with replay_fixtures():
+        summary = export.export_season(FIXTURE_SEASON, str(tmp_path), file_format="csv", workers=2)
+
+    assert summary['players_with_games'] == len(players)
+    assert summary['failed'] == 0
+    assert len(pd.read_csv(summary['game_logs_path'])) == summary['game_log_rows']
+
+def test_export_counts_players_the_api_failed_for(players, tmp_path, monkeypatch):
+    def unavailable(endpoint, **params):
+        raise ConnectionError("stats.nba.com is unavailable")
+    monkeypatch.setattr(nba_client, 'fetch_data_frames', unavailable)
+
+    summary = export.export_season(FIXTURE_SEASON, str(tmp_path), file_format="csv", workers=2)
+
+    assert summary['players_with_games'] == 0
+    assert summary['failed'] == len(players)
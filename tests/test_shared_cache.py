@@ -0,0 +1,49 @@
+"""Shared cache backend round trips through a temporary directory."""
+import pandas as pd
+import pytest
+from utils.cache import MemoryCacheBackend, _share
+from utils.shared_cache import SharedCacheBackend
+
+def _frame():
+    return pd.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5], 'team': pd.Categorical(['LAL', 'BOS', 'LAL'])})
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "shared")
+
+def test_frame_read_from_disk_can_be_modified(directory):
+    SharedCacheBackend(directory).put("load", ("load", 1), _frame(), ttl=60)
+
+    found, value = SharedCacheBackend(directory).get(("load", 1))
+    assert found
+    pd.testing.assert_frame_equal(value, _frame())
+    # Loaders hand out views like this one, which copy a column only when it is written
+    df = _share(value)
+    df.loc[0, 'a'] = 5
+    df['b'] *= 2
+    df.loc[1, 'team'] = 'LAL'
+    assert df.loc[0, 'a'] == 5
+    pd.testing.assert_frame_equal(value, _frame())
+
+def test_frames_in_a_tuple_can_be_modified(directory):
+    SharedCacheBackend(directory).put("load", ("load", 1), (_frame(), _frame()), ttl=60)
+
+    found, value = SharedCacheBackend(directory).get(("load", 1))
+    assert found
+    players, teams = _share(value)
+    players.loc[0, 'a'] = 5
+    teams.loc[1, 'b'] = 0.0
+
+def test_stale_frame_read_is_unaffected_by_caller_writes(directory):
+    SharedCacheBackend(directory).put("load", ("load", 1), _frame(), ttl=-1)
+    reader = SharedCacheBackend(directory, local=MemoryCacheBackend(1024 * 1024))
+
+    assert reader.get(("load", 1)) == (False, None)
+    found, value = reader.get_stale(("load", 1))
+    assert found
+    df = _share(value)
+    df.loc[0, 'a'] = 5
+
+    # The next stale read comes from the memory layer, not from disk, and still has the stored values
+    assert reader.local.get_stale(("load", 1))[0]
+    pd.testing.assert_frame_equal(_share(reader.get_stale(("load", 1))[1]), _frame())
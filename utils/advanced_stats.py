@@ -0,0 +1,86 @@
+import pandas as pd
+
+# Recent-game windows for rolling and exponentially weighted averages
+ROLLING_WINDOWS = (5, 10, 20)
+ROLLING_STATS = ['PTS', 'REB', 'AST', 'MIN']
+
+# Counting stats reported per 36 minutes
+PER_36_STATS = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV']
+
+def _total(logs, col):
+    """Season total of a column, 0 if the logs don't carry it"""
+    return logs[col].sum() if col in logs.columns else 0
+
+def compute_advanced_stats(logs):
+    """Compute efficiency, per-36 and consistency stats from a player's game logs"""
+    advanced_stats = {}
+    if logs.empty:
+        return advanced_stats
+
+    fgm, fga = _total(logs, 'FGM'), _total(logs, 'FGA')
+    fg3m, fta = _total(logs, 'FG3M'), _total(logs, 'FTA')
+    pts, tov = _total(logs, 'PTS'), _total(logs, 'TOV')
+
+    # Efficiency stats from season totals rather than averaged game percentages
+    shooting_attempts = fga + 0.44 * fta
+    advanced_stats['true_shooting_pct'] = pts / (2 * shooting_attempts) if shooting_attempts > 0 else 0.0
+    advanced_stats['effective_fg_pct'] = (fgm + 0.5 * fg3m) / fga if fga > 0 else 0.0
+
+    # Usage stats
+    if 'MIN' in logs.columns:
+        total_minutes = logs['MIN'].sum()
+        advanced_stats['avg_minutes'] = logs['MIN'].mean()
+        advanced_stats['total_minutes'] = total_minutes
+
+        if total_minutes > 0:
+            for stat in PER_36_STATS:
+                if stat in logs.columns:
+                    advanced_stats[f'{stat.lower()}_per_36'] = logs[stat].sum() * 36 / total_minutes
+            # Possessions a player finishes with a shot, trip to the line or turnover
+            advanced_stats['usage_per_36'] = (shooting_attempts + tov) * 36 / total_minutes
+
+    # Consistency stats
+    if 'PTS' in logs.columns:
+        advanced_stats['pts_std'] = logs['PTS'].std()
+        advanced_stats['pts_variance'] = logs['PTS'].var()
+
+    return advanced_stats
+
+def compute_rolling_stats(logs, windows=ROLLING_WINDOWS, stats=ROLLING_STATS):
+    """Rolling and exponentially weighted averages over the last N games, one row per game"""
+    stats = [stat for stat in stats if stat in logs.columns]
+    values = logs[stats].reset_index(drop=True)
+
+    rolling = logs[['GAME_ID', 'GAME_DATE']].reset_index(drop=True)
+    for window in windows:
+        rolling[[f'{stat}_avg{window}' for stat in stats]] = values.rolling(window, min_periods=1).mean().to_numpy()
+        rolling[[f'{stat}_ewm{window}' for stat in stats]] = values.ewm(span=window, adjust=False).mean().to_numpy()
+    return rolling
+
+def extend_rolling_stats(rolling, old_logs, new_logs, windows=ROLLING_WINDOWS, stats=ROLLING_STATS):
+    """Append rolling values for newly added games without recomputing the earlier ones"""
+    if new_logs.empty:
+        return rolling
+    if rolling.empty:
+        return compute_rolling_stats(new_logs, windows, stats)
+
+    stats = [stat for stat in stats if stat in new_logs.columns]
+    new_values = new_logs[stats].reset_index(drop=True)
+    extension = new_logs[['GAME_ID', 'GAME_DATE']].reset_index(drop=True)
+
+    # A plain rolling mean only needs the last window - 1 earlier games
+    history = old_logs[stats].tail(max(windows) - 1).reset_index(drop=True)
+    combined = pd.concat([history, new_values], ignore_index=True)
+    last_ewm = rolling.iloc[-1]
+
+    for window in windows:
+        window_means = combined.rolling(window, min_periods=1).mean().tail(len(new_values))
+        extension[[f'{stat}_avg{window}' for stat in stats]] = window_means.to_numpy()
+
+        # The EWM recursion continues from the last stored value
+        ewm_cols = [f'{stat}_ewm{window}' for stat in stats]
+        seed = pd.DataFrame([last_ewm[ewm_cols].to_numpy(dtype=float)], columns=stats)
+        seeded = pd.concat([seed, new_values], ignore_index=True)
+        extension[ewm_cols] = seeded.ewm(span=window, adjust=False).mean().iloc[1:].to_numpy()
+
+    return pd.concat([rolling, extension], ignore_index=True)
@@ -0,0 +1,66 @@
+import pandas as pd
+
+# Columns of the per-player season summary, in display order
+SEASON_STAT_COLUMNS = [
+    'games_played', 'ppg', 'rpg', 'apg', 'spg', 'bpg', 'mpg',
+    'fg_pct', 'fg3_pct', 'ft_pct'
+]
+
+# Season summary column -> game log column it averages
+AVERAGE_SOURCES = {
+    'ppg': 'PTS',
+    'rpg': 'REB',
+    'apg': 'AST',
+    'spg': 'STL',
+    'bpg': 'BLK',
+    'mpg': 'MIN',
+    'fg_pct': 'FG_PCT',
+    'fg3_pct': 'FG3_PCT',
+    'ft_pct': 'FT_PCT',
+}
+
+# Counting stats that are also summed over the season when the logs carry them
+TOTAL_SOURCES = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'MIN', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'TOV']
+
+def aggregate_season_stats(game_logs, percentiles=True, by='PLAYER_ID'):
+    """Reduce game logs of any number of players to one row per player.
+
+    Averages, totals and (optionally) league percentiles for every player are
+    computed in a single groupby. The result is indexed by PLAYER_ID, or by the
+    column(s) given as `by`, e.g. SEASON for one player's career.
+    """
+    if game_logs.empty:
+        return pd.DataFrame(columns=SEASON_STAT_COLUMNS).rename_axis(by)
+
+    aggregations = {'games_played': ('GAME_DATE', 'size')}
+    for stat, col in AVERAGE_SOURCES.items():
+        aggregations[stat] = (col, 'mean')
+    for col in TOTAL_SOURCES:
+        if col in game_logs.columns:
+            aggregations[f'total_{col.lower()}'] = (col, 'sum')
+
+    season_stats = game_logs.groupby(by, sort=False, observed=True).agg(**aggregations)
+
+    # Replace NaN with 0 and round percentages to 3 decimal places, others to 1
+    average_cols = list(AVERAGE_SOURCES)
+    pct_cols = [col for col in average_cols if '_pct' in col]
+    other_cols = [col for col in average_cols if col not in pct_cols]
+    season_stats[average_cols] = season_stats[average_cols].fillna(0)
+    season_stats[pct_cols] = season_stats[pct_cols].round(3)
+    season_stats[other_cols] = season_stats[other_cols].round(1)
+
+    if percentiles:
+        pctiles = season_stats[average_cols].rank(pct=True)
+        season_stats[[f'{col}_pctile' for col in average_cols]] = pctiles.to_numpy()
+
+    return season_stats
+
+def season_stats_row(season_stats, player_id):
+    """Look up one player's season summary as a dictionary, empty if they have no games"""
+    if player_id not in season_stats.index:
+        return {}
+
+    row = season_stats.loc[player_id, SEASON_STAT_COLUMNS]
+    stats = row.to_dict()
+    stats['games_played'] = int(stats['games_played'])
+    return stats
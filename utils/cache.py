@@ -0,0 +1,353 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from utils.metrics import span
+from utils.refresh import RefreshScheduler
+
+# Copy-on-write lets every reader get a shallow view of a cached frame: nothing is copied
+# on a hit, and a caller that modifies its view gets its own copy instead of changing ours.
+# It takes effect when a caller writes, not when we hand out the view, so it can't be scoped
+# to this module with pd.option_context: importing the cache turns it on for the whole process.
+# It is the only mode in pandas 3, and the entry points (nba_app.py, utils.export) note it too.
+pd.set_option("mode.copy_on_write", True)
+
+# Memory budget shared by every cached function. Override with NBA_STATS_CACHE_MB.
+CACHE_BUDGET_BYTES = int(float(os.environ.get("NBA_STATS_CACHE_MB", 512)) * 1024 * 1024)
+
+# Background refresh of hot keys for loaders marked refresh_ahead. Set NBA_STATS_REFRESH_AHEAD=0 to turn it off.
+REFRESH_AHEAD = os.environ.get("NBA_STATS_REFRESH_AHEAD", "1") != "0"
+
+def _sizeof(value, seen=None):
+    """Approximate memory held by a cached value, in bytes, counting objects it shares once"""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        # An array that owns its data already counts it; a view keeps the data it looks at alive
+        return sys.getsizeof(value) + (value.nbytes if value.base is not None else 0)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_sizeof(item, seen) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+
+    size = sys.getsizeof(value)
+    # Objects like PlayerIndex keep their data in attributes
+    if hasattr(value, '__dict__'):
+        size += _sizeof(vars(value), seen)
+    for slot in getattr(type(value), '__slots__', ()):
+        if hasattr(value, slot):
+            size += _sizeof(getattr(value, slot), seen)
+    return size
+
+def _share(value):
+    """Hand out a cached value without copying its data"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(_share(item) for item in value)
+    if isinstance(value, list):
+        return [_share(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _share(v) for k, v in value.items()}
+    return value
+
+def _is_empty(value):
+    """Whether a loader came back with nothing, as they do when the upstream API fails"""
+    if value is None:
+        return True
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.empty
+    if isinstance(value, (list, tuple)):
+        return all(_is_empty(item) for item in value)
+    if isinstance(value, dict):
+        return not value
+    return False
+
+def _normalize_arg(value):
+    """Turn an argument into something hashable that compares equal across call sites"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_arg(item) for item in value)
+    return value
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "func_name")
+
+    def __init__(self, value, size, expires_at, func_name):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.func_name = func_name
+
+class FunctionStats:
+    """Hit, stale hit and miss counters for one cached function"""
+
+    def __init__(self):
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+
+class MemoryCacheBackend:
+    """Process-wide LRU cache for loader results, bounded by total size in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._evictions = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+        return entry
+
+    def get(self, key):
+        """Return (True, value) for a fresh entry, (False, None) otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry.value
+
+    def get_stale(self, key):
+        """Return (True, value) for an entry that hasn't been evicted yet, even if it has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            return True, entry.value
+
+    def put(self, func_name, key, value, ttl):
+        """Store a value, evicting least recently used entries to stay in budget"""
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _Entry(value, size, time.monotonic() + ttl, func_name)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted = self._remove(next(iter(self._entries)))
+                self._evictions[evicted.func_name] = self._evictions.get(evicted.func_name, 0) + 1
+
+    def clear(self, func_name=None):
+        """Drop every entry, or only those of one function"""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if func_name is None or e.func_name == func_name]:
+                self._remove(key)
+
+    def usage(self):
+        """Entries, bytes and evictions per function"""
+        usage = {}
+        with self._lock:
+            for entry in self._entries.values():
+                func_usage = usage.setdefault(entry.func_name, {'entries': 0, 'bytes': 0, 'evictions': 0})
+                func_usage['entries'] += 1
+                func_usage['bytes'] += entry.size
+            for func_name, evictions in self._evictions.items():
+                usage.setdefault(func_name, {'entries': 0, 'bytes': 0, 'evictions': 0})['evictions'] = evictions
+        return usage
+
+class NoCacheBackend:
+    """Backend that never keeps anything, for batch jobs that read each key once"""
+
+    def get(self, key):
+        return False, None
+
+    def get_stale(self, key):
+        return False, None
+
+    def put(self, func_name, key, value, ttl):
+        pass
+
+    def clear(self, func_name=None):
+        pass
+
+    def usage(self):
+        return {}
+
+def _default_backend():
+    """In-process memory, or a directory shared with other replicas if NBA_STATS_SHARED_CACHE_DIR is set"""
+    memory = MemoryCacheBackend(CACHE_BUDGET_BYTES)
+    shared_dir = os.environ.get("NBA_STATS_SHARED_CACHE_DIR")
+    if not shared_dir:
+        return memory
+
+    from utils.shared_cache import SharedCacheBackend
+    return SharedCacheBackend(shared_dir, local=memory)
+
+# Backend used by every cached loader in this process, swappable with set_cache_backend
+_backend = _default_backend()
+
+_stats = {}
+_stats_lock = threading.Lock()
+_refresher = RefreshScheduler()
+# Lock per key being computed, with the number of threads holding or waiting on it
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+def set_cache_backend(backend):
+    """Swap the backend behind every cached loader (anything with get/put/clear/usage, and optionally get_stale)"""
+    global _backend
+    _backend = backend
+
+def get_cache_backend():
+    return _backend
+
+def _record(func_name, hit, stale=False):
+    with _stats_lock:
+        func_stats = _stats.setdefault(func_name, FunctionStats())
+        if stale:
+            func_stats.stale += 1
+        elif hit:
+            func_stats.hits += 1
+        else:
+            func_stats.misses += 1
+
+@contextmanager
+def _key_lock(key):
+    """Hold a key's lock while computing it, so concurrent misses compute it only once"""
+    with _key_locks_lock:
+        entry = _key_locks.get(key)
+        if entry is None:
+            entry = _key_locks[key] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        # Only forget the lock once nobody is waiting on it, or a newcomer would get a fresh
+        # one and compute the key alongside the waiters
+        with _key_locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _key_locks[key]
+
+def _get_stale(key):
+    get_stale = getattr(_backend, "get_stale", None)
+    return get_stale(key) if get_stale is not None else (False, None)
+
+def cached(ttl, refresh_ahead=False):
+    """Cache a loader's results in the configured backend for ttl seconds.
+
+    Hits return shallow copy-on-write views of cached frames, so they cost no copying
+    or unpickling, and callers are free to modify what they get back.
+
+    With refresh_ahead, popular keys are refreshed in the background before they
+    expire, and an expired entry is returned as it is while a refresh replaces it,
+    so callers only wait on the upstream API for keys that were never loaded.
+    """
+    def decorator(func):
+        func_name = func.__qualname__
+        signature = inspect.signature(func)
+
+        def refresh(key, args, kwargs):
+            with _key_lock(key):
+                value = func(*args, **kwargs)
+                if _is_empty(value) and not _is_empty(_get_stale(key)[1]):
+                    # Loaders return empty results when the API fails; keep serving what we have
+                    raise RuntimeError("upstream returned no data")
+                _backend.put(func_name, key, value, ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func_name,) + tuple(_normalize_arg(v) for v in bound.arguments.values())
+            refreshing = refresh_ahead and REFRESH_AHEAD
+            if refreshing:
+                _refresher.track(key, functools.partial(refresh, key, args, kwargs), ttl)
+
+            with span("cache.get"):
+                found, value = _backend.get(key)
+            if found:
+                _record(func_name, hit=True)
+                return _share(value)
+
+            if refreshing:
+                found, value = _get_stale(key)
+                if found:
+                    _record(func_name, hit=True, stale=True)
+                    _refresher.refresh_soon(key)
+                    return _share(value)
+
+            with _key_lock(key):
+                # Another thread may have filled the key while we waited for the lock
+                found, value = _backend.get(key)
+                _record(func_name, hit=found)
+                if not found:
+                    value = func(*args, **kwargs)
+                    _backend.put(func_name, key, value, ttl)
+                    if refreshing:
+                        _refresher.computed(key)
+            return _share(value)
+
+        wrapper.clear = lambda: _backend.clear(func_name)
+        return wrapper
+
+    return decorator
+
+def get_entry(func_name, *args):
+    """Look up a value kept with put_entry, or None, counting the hit or miss under func_name.
+
+    For loaders that extend their previous result as their inputs grow, which @cached
+    can't express because the previous result is needed even when the inputs changed.
+    Hits are shallow copy-on-write views, like those of cached loaders.
+    """
+    found, value = _backend.get((func_name,) + tuple(_normalize_arg(arg) for arg in args))
+    _record(func_name, hit=found)
+    return _share(value) if found else None
+
+def put_entry(func_name, value, ttl, *args):
+    """Keep a value for get_entry in the cache backend, within its byte budget.
+
+    Returns a view of it to hand out in place of the value itself, which the cache now holds.
+    """
+    _backend.put(func_name, (func_name,) + tuple(_normalize_arg(arg) for arg in args), value, ttl)
+    return _share(value)
+
+def refresh_stats():
+    """Keys tracked by the refresh-ahead scheduler, and refreshes it has made"""
+    return _refresher.stats()
+
+def cache_stats():
+    """Per-function hit/stale/miss/eviction counters and memory held by the cache backend"""
+    usage = _backend.usage()
+    with _stats_lock:
+        counters = {func_name: (func_stats.hits, func_stats.stale, func_stats.misses) for func_name, func_stats in _stats.items()}
+
+    rows = []
+    for func_name in sorted(set(counters) | set(usage)):
+        hits, stale, misses = counters.get(func_name, (0, 0, 0))
+        func_usage = usage.get(func_name, {})
+        rows.append({
+            'function': func_name,
+            'hits': hits,
+            'stale_hits': stale,
+            'misses': misses,
+            'hit_ratio': (hits + stale) / (hits + stale + misses) if hits + stale + misses else 0.0,
+            'evictions': func_usage.get('evictions', 0),
+            'entries': func_usage.get('entries', 0),
+            'bytes': func_usage.get('bytes', 0),
+        })
+    return pd.DataFrame(rows, columns=['function', 'hits', 'stale_hits', 'misses', 'hit_ratio', 'evictions', 'entries', 'bytes'])
@@ -0,0 +1,73 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+from utils.aggregation import SEASON_STAT_COLUMNS, aggregate_season_stats
+from utils.splits import parse_matchups
+
+# Game log columns kept in a career frame, besides the SEASON tag
+CAREER_LOG_COLUMNS = [
+    'GAME_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK',
+    'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'TOV'
+]
+
+# Season summary columns that get a year-over-year change
+YOY_COLUMNS = [col for col in SEASON_STAT_COLUMNS if col != 'games_played']
+
+def tag_season(logs, season, seasons):
+    """Keep the career columns of one season's game logs and tag each game with the season.
+
+    SEASON is a categorical over all of the player's seasons, so tagged frames of
+    different seasons concatenate without losing the dtype.
+    """
+    columns = [col for col in CAREER_LOG_COLUMNS if col in logs.columns]
+    tagged = logs[columns].reset_index(drop=True)
+    tagged.insert(0, 'SEASON', pd.Categorical([season] * len(tagged), categories=seasons, ordered=True))
+    return tagged
+
+def concat_game_logs(frames):
+    """Concatenate game log frames, keeping columns that are categorical in all of them categorical"""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    frames = [frame.copy() for frame in frames]
+    for col in frames[0].columns:
+        columns = [frame[col] for frame in frames if col in frame.columns]
+        if len(columns) == len(frames) and all(isinstance(column.dtype, pd.CategoricalDtype) for column in columns):
+            if columns[0].cat.ordered:
+                continue  # Same ordered categories throughout, e.g. SEASON
+            categories = union_categoricals(columns, ignore_order=True).categories
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+def career_season_summary(career_logs):
+    """One row of averages per season, oldest first, with the change from the season before.
+
+    Each stat in YOY_COLUMNS gets a `<stat>_change` column, empty for the first season.
+    """
+    summary = aggregate_season_stats(career_logs, percentiles=False, by='SEASON').sort_index()
+    summary = summary[SEASON_STAT_COLUMNS]
+    changes = summary[YOY_COLUMNS].diff()
+    summary[[f'{col}_change' for col in YOY_COLUMNS]] = changes.round(3).to_numpy()
+    return summary
+
+def career_splits(career_logs):
+    """Per-game averages over the whole career, and split by home/away and wins/losses"""
+    if career_logs.empty:
+        return pd.DataFrame(columns=SEASON_STAT_COLUMNS).rename_axis('split')
+
+    splits = [pd.Series('Career', index=career_logs.index)]
+    if 'MATCHUP' in career_logs.columns:
+        venue, _ = parse_matchups(career_logs['MATCHUP'])
+        splits.append(pd.Series(venue, index=career_logs.index))
+    if 'WL' in career_logs.columns:
+        result = career_logs['WL'].astype(str).map({'W': 'Wins', 'L': 'Losses'})
+        splits.append(result)
+
+    frames = [aggregate_season_stats(career_logs.assign(split=split), percentiles=False, by='split')
+              for split in splits]
+    order = ['Career', 'Home', 'Away', 'Wins', 'Losses']
+    summary = pd.concat(frames)[SEASON_STAT_COLUMNS]
+    return summary.loc[[split for split in order if split in summary.index]]
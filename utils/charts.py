@@ -0,0 +1,226 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+from utils.metrics import span
+
+# Memory budget for rendered chart images. Override with NBA_STATS_CHART_CACHE_MB.
+CHART_CACHE_BYTES = int(float(os.environ.get("NBA_STATS_CHART_CACHE_MB", 64)) * 1024 * 1024)
+
+class ChartCache:
+    """LRU of rendered chart images, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._images:
+                self.current_bytes -= len(self._images.pop(key))
+            self._images[key] = image
+            self.current_bytes += len(image)
+
+            # Evict least recently used images until we are back under budget
+            while self.current_bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._images)
+
+# Shared by every session in this process
+chart_cache = ChartCache(CHART_CACHE_BYTES)
+
+def data_fingerprint(data):
+    """Stable hash of the data a chart is drawn from"""
+    hashed = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+def render_chart(key, draw, figsize=(8, 5)):
+    """Return PNG bytes for a chart, drawing it only if this key hasn't been rendered yet.
+
+    Figures are built without pyplot so nothing is left in its global state, and
+    they are dropped as soon as the image has been written.
+    """
+    image = chart_cache.get(key)
+    if image is not None:
+        return image
+
+    # matplotlib is only needed once something actually has to be drawn
+    from matplotlib.figure import Figure
+
+    with span("chart.render"):
+        fig = Figure(figsize=figsize)
+        ax = fig.subplots()
+        draw(ax)
+        fig.tight_layout()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        image = buffer.getvalue()
+    chart_cache.put(key, image)
+    return image
+
+def _time_series_chart(logs, col, player_name, player_id, season, kind, title, ylabel, color):
+    """Line chart of one stat over the season's game dates"""
+    data = logs[["GAME_DATE", col]]
+
+    def draw(ax):
+        ax.plot(data["GAME_DATE"], data[col], marker='o', color=color, linewidth=2, markersize=4)
+        ax.set_title(f"{player_name} - {title} ({season})")
+        ax.set_xlabel("Game Date")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(axis='x', labelrotation=45)
+
+    return render_chart((player_id, season, kind, data_fingerprint(data)), draw)
+
+def points_chart(logs, player_name, player_id, season):
+    """Points scored in each game of the season"""
+    return _time_series_chart(logs, "PTS", player_name, player_id, season, "points", "Points Per Game", "Points", 'blue')
+
+def minutes_chart(logs, player_name, player_id, season):
+    """Minutes played in each game of the season"""
+    return _time_series_chart(logs, "MIN", player_name, player_id, season, "minutes", "Minutes Per Game", "Minutes", 'green')
+
+def recent_stats_chart(logs, player_name, player_id, season, stat_cols):
+    """Grouped bars of counting stats over the last 10 games"""
+    data = logs.tail(10)[["GAME_DATE"] + stat_cols]
+
+    def draw(ax):
+        logs_to_plot = data.copy()
+        logs_to_plot['display_date'] = logs_to_plot['GAME_DATE'].dt.strftime('%m-%d')
+        logs_to_plot.plot(x="display_date", y=stat_cols, kind="bar", ax=ax)
+        ax.set_title(f"{player_name} - Recent Performance ({season})")
+        ax.set_xlabel("Game Date")
+        ax.set_ylabel("Count")
+        ax.tick_params(axis='x', labelrotation=45)
+
+    return render_chart((player_id, season, "recent", data_fingerprint(data)), draw)
+
+def shooting_chart(logs, player_name, player_id, season, shooting_cols):
+    """FG%, 3P% and FT% in each game of the season"""
+    data = logs[["GAME_DATE"] + shooting_cols]
+    styles = {
+        'FG_PCT': ('o', 'orange', 'FG%'),
+        'FG3_PCT': ('s', 'red', '3P%'),
+        'FT_PCT': ('^', 'purple', 'FT%'),
+    }
+
+    def draw(ax):
+        for col in shooting_cols:
+            if data[col].sum() > 0: # Only plot if there is data
+                marker, color, label = styles[col]
+                ax.plot(data["GAME_DATE"], data[col], marker=marker, color=color, linewidth=2, markersize=4, label=label)
+
+        ax.set_title(f"{player_name} - Shooting Percentages ({season})")
+        ax.set_xlabel("Game Date")
+        ax.set_ylabel("Percentage")
+        ax.grid(True, alpha=0.3)
+        if ax.has_data():
+            ax.legend()
+        ax.tick_params(axis='x', labelrotation=45)
+
+    return render_chart((player_id, season, "shooting", data_fingerprint(data)), draw)
+
+def game_breakdown_chart(categories, values, title, player_id, game_key):
+    """Bar chart of a player's counting stats in a single game"""
+
+    def draw(ax):
+        bars = ax.bar(categories, values, color=['blue', 'green', 'purple', 'orange', 'red'])
+        ax.set_title(title)
+        ax.set_ylabel('Count')
+
+        for bar, value in zip(bars, values):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                    f'{value}', ha='center', va='bottom')
+
+    key = (player_id, game_key, "game_breakdown", hashlib.sha1(repr((title, list(values))).encode()).hexdigest())
+    return render_chart(key, draw, figsize=(10, 6))
+
+def comparison_bar_chart(comparison_data, stat, title, ylabel, color, season):
+    """Bar chart of one stat across the compared players"""
+    data = comparison_data[['player_id', 'player_name', stat]]
+
+    def draw(ax):
+        bars = ax.bar(data['player_name'], data[stat], color=color)
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.tick_params(axis='x', labelrotation=45)
+
+        for bar, value in zip(bars, data[stat]):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                    f'{value}', ha='center', va='bottom')
+
+    key = (tuple(data['player_id']), season, f"compare_{stat}", data_fingerprint(data))
+    return render_chart(key, draw, figsize=(10, 6))
+
+def comparison_shooting_chart(comparison_data, season):
+    """Grouped FG%, 3P% and FT% bars across the compared players"""
+    data = comparison_data[['player_id', 'player_name', 'fg_pct', 'fg3_pct', 'ft_pct']]
+
+    def draw(ax):
+        x = range(len(data))
+        width = 0.25
+
+        ax.bar([i - width for i in x], data['fg_pct'], width, label='FG%', color='orange')
+        ax.bar(x, data['fg3_pct'], width, label='3P%', color='red')
+        ax.bar([i + width for i in x], data['ft_pct'], width, label='FT%', color='purple')
+
+        ax.set_title('Shooting Percentages Comparison')
+        ax.set_ylabel('Percentage')
+        ax.set_xticks(x)
+        ax.set_xticklabels(data['player_name'], rotation=45)
+        ax.legend()
+
+    key = (tuple(data['player_id']), season, "compare_shooting", data_fingerprint(data))
+    return render_chart(key, draw, figsize=(10, 6))
+
+def line_chart_spec(x, x_type, value_name, series_name):
+    """Vega-Lite spec for one line per series over long-form data.
+
+    st.line_chart builds its spec through Altair on every rerun, which costs around
+    100 ms a chart; handing Streamlit the spec directly costs a couple.
+    """
+    return {
+        'mark': {'type': 'line', 'point': x_type != 'temporal'},
+        'encoding': {
+            'x': {'field': x, 'type': x_type},
+            'y': {'field': value_name, 'type': 'quantitative'},
+            'color': {'field': series_name, 'type': 'nominal'},
+        },
+    }
+
+def bar_chart_spec(category, value):
+    """Vega-Lite spec for bars kept in the data's order"""
+    return {
+        'mark': 'bar',
+        'encoding': {
+            'x': {'field': category, 'type': 'nominal', 'sort': None},
+            'y': {'field': value, 'type': 'quantitative'},
+        },
+    }
@@ -1,20 +1,102 @@
-from nba_api.stats.static import players, teams
-from nba_api.stats.endpoints import playergamelog, boxscoretraditionalv2, leaguedashteamstats
-from nba_api.stats.library.parameters import Season
+import logging
 import pandas as pd
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import streamlit as st
+from utils import nba_client, storage
+from utils.cache import cached, get_cache_backend, get_entry, put_entry
+from utils.metrics import span
+from utils.player_index import PlayerIndex
+from utils.player_snapshot import load_player_snapshot
+from utils.schema import apply_compact_schema, memory_report
+from utils.advanced_stats import compute_advanced_stats, compute_rolling_stats, extend_rolling_stats
+from utils.aggregation import SEASON_STAT_COLUMNS, aggregate_season_stats, season_stats_row
+from utils.charts import data_fingerprint
+from utils.career import career_season_summary, career_splits, concat_game_logs, tag_season
+from utils.leaderboards import Leaderboards
+from utils.similarity import SimilarityIndex
+from utils.splits import add_cells, split_cells, split_summary, tag_splits
+from utils.team_stats import player_usage, team_game_totals, team_ratings, team_season_frame
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_player_list():
-    """Get all active NBA players with more detailed information"""
-    player_data = players.get_active_players()
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent stats.nba.com requests made for a single page
+MAX_FETCH_WORKERS = 6
+
+# Background pool shared by all sessions for warming the box score store
+BOX_SCORE_PREFETCH_WORKERS = 2
+_prefetch_executor = ThreadPoolExecutor(max_workers=BOX_SCORE_PREFETCH_WORKERS, thread_name_prefix="box-score-prefetch")
+_prefetch_pending = set()
+_prefetch_lock = threading.Lock()
+# Games whose box score is stored, and when games that weren't (in progress, empty or failed) may be tried again
+PREFETCH_RETRY_S = 300
+_prefetch_stored = set()
+_prefetch_retry_at = {}
+# Game ids of each (player_id, season) already prefetched, with when to look at them again
+_prefetched_logs = {}
+
+# Rolling stats are kept in the cache tier per (player_id, season) with the games they cover,
+# and extended as new games arrive
+ROLLING_TTL_S = 3600
+
+# Split cells and summaries are kept in the cache tier per (player_id, season) with the games they
+# cover, and added to as new games arrive. Entries check themselves against the logs, so they can
+# outlive the logs' own TTL.
+SPLITS_TTL_S = 3600
+
+# Career game logs are kept in the cache tier per player with the games of each season they cover,
+# and appended to as new games arrive
+CAREER_TTL_S = 3600
+
+# Player/season index as last built in the background, so page renders never wait on it
+PLAYER_SEASONS_REBUILD_S = 1800
+_player_seasons_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="player-seasons")
+_player_seasons = None
+_player_seasons_built_at = 0.0
+_player_seasons_build = None
+_player_seasons_lock = threading.Lock()
+
+# Similarity and leaderboard indexes per season, with the fingerprint of the stats they were built from
+_season_indexes = {}
+_season_index_lock = threading.Lock()
+
+def reset_caches():
+    """Forget every cached loader result and in-process index, e.g. between benchmark runs or tests.
+
+    In-flight prefetches and index builds aren't waited on; the persisted store is left alone.
+    """
+    global _player_seasons, _player_seasons_built_at
+    get_cache_backend().clear()
+    with _prefetch_lock:
+        _prefetch_stored.clear()
+        _prefetch_retry_at.clear()
+        _prefetched_logs.clear()
+    with _player_seasons_lock:
+        _player_seasons, _player_seasons_built_at = None, 0.0
+    with _season_index_lock:
+        _season_indexes.clear()
+
+@cached(ttl=3600)  # Cache for 1 hour
+def get_player_list(include_inactive=False):
+    """Get NBA players with more detailed information, active players only by default"""
+    # The bundled snapshot avoids loading nba_api before the sidebar can render
+    player_data = None if include_inactive else load_player_snapshot()
+    if player_data is None:
+        from nba_api.stats.static import players
+        player_data = players.get_players() if include_inactive else players.get_active_players()
     df = pd.DataFrame(player_data)
-    # Add a full name column for easier selection
-    df['full_name'] = df['first_name'] + ' ' + df['last_name']
+    # The static player data already carries a full name column
+    if 'full_name' not in df.columns:
+        df['full_name'] = df['first_name'] + ' ' + df['last_name']
     return df
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
+@cached(ttl=3600)  # Shared across sessions, the index is never modified
+def get_player_index(include_inactive=False):
+    """Get a name/id index with typeahead search over the player list"""
+    return PlayerIndex(get_player_list(include_inactive))
+
+@cached(ttl=1800)  # Cache for 30 minutes
 def get_current_season():
     """Get the current NBA season year"""
     current_year = datetime.now().year
@@ -25,172 +107,708 @@ def get_current_season():
     else:
         return str(current_year)
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def get_player_game_logs(player_id, season=None):
-    """Get player game logs for a specific season"""
-    if season is None:
-        season = get_current_season()
+def _is_season_complete(season):
+    """Check whether a season is over and its game logs can no longer change"""
+    return int(season) < int(get_current_season())
+
+def _season_end_date(season):
+    """Date after which a season's stored game logs are considered final"""
+    # The Finals wrap up in June, so anything stored from July on is complete
+    return datetime(int(season) + 1, 7, 1)
+
+@span("normalize_game_logs")
+def _normalize_game_logs(logs):
+    """Parse dates, sort games and coerce stat columns of a game log frame"""
+    if logs.empty:
+        return logs
+
+    # PlayerGameLog returns mixed-case id columns, use the same names as other endpoints
+    logs = logs.rename(columns={'Game_ID': 'GAME_ID', 'Player_ID': 'PLAYER_ID'})
+
+    # Let pandas infer the date format, coercing errors to NaT
+    logs["GAME_DATE"] = pd.to_datetime(logs["GAME_DATE"], errors='coerce')
+    
+    # Drop rows where date conversion failed
+    logs.dropna(subset=['GAME_DATE'], inplace=True)
+    
+    logs = logs.sort_values("GAME_DATE")
     
+    # Ensure all relevant stat columns are numeric, coercing errors
+    numeric_cols = [
+        'PTS', 'REB', 'AST', 'STL', 'BLK', 'MIN', 
+        'FG_PCT', 'FG3_PCT', 'FT_PCT',
+        'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'TOV', 'PF'
+    ]
+    for col in numeric_cols:
+        if col in logs.columns:
+            logs[col] = pd.to_numeric(logs[col], errors='coerce').fillna(0)
+    
+    # Ensure GAME_ID column exists
+    if 'GAME_ID' not in logs.columns:
+        logs['GAME_ID'] = logs.index
+
+    return apply_compact_schema(logs)
+
+def _date_from_param(date_from):
+    """Format an optional start date the way stats.nba.com expects it"""
+    return date_from.strftime('%m/%d/%Y') if date_from is not None else ''
+
+def _fetch_game_logs(player_id, season, date_from=None):
+    """Fetch a player's game logs from stats.nba.com, optionally starting at a date"""
+    # Endpoint modules are slow to import, so load them on first use
+    from nba_api.stats.endpoints import playergamelog
+    return nba_client.fetch_data_frames(
+        playergamelog.PlayerGameLog,
+        player_id=player_id, 
+        season=season,
+        date_from_nullable=_date_from_param(date_from)
+    )[0]
+
+def _fetch_league_game_logs(season, date_from=None):
+    """Fetch every player's game logs for a season in one league-wide request"""
+    from nba_api.stats.endpoints import leaguegamelog
+    return nba_client.fetch_data_frames(
+        leaguegamelog.LeagueGameLog,
+        season=season,
+        player_or_team_abbreviation='P',
+        date_from_nullable=_date_from_param(date_from)
+    )[0]
+
+def _load_stored_logs(kind, key, season, fetch, unique_cols):
+    """Load game logs through the on-disk store.
+
+    Completed seasons stored after they ended are returned straight from disk. Otherwise
+    only games from the last stored GAME_DATE on are fetched and appended.
+    """
+    stored = storage.read_frame(kind, key)
     try:
-        logs = playergamelog.PlayerGameLog(
-            player_id=player_id, 
-            season=season
-        ).get_data_frames()[0]
-        
-        if not logs.empty:
-            # Let pandas infer the date format, coercing errors to NaT
-            logs["GAME_DATE"] = pd.to_datetime(logs["GAME_DATE"], errors='coerce')
-            
-            # Drop rows where date conversion failed
-            logs.dropna(subset=['GAME_DATE'], inplace=True)
-            
-            logs = logs.sort_values("GAME_DATE")
-            
-            # Ensure all relevant stat columns are numeric, coercing errors
-            numeric_cols = [
-                'PTS', 'REB', 'AST', 'STL', 'BLK', 'MIN', 
-                'FG_PCT', 'FG3_PCT', 'FT_PCT'
-            ]
-            for col in numeric_cols:
-                if col in logs.columns:
-                    logs[col] = pd.to_numeric(logs[col], errors='coerce').fillna(0)
-            
-            # Ensure GAME_ID column exists
-            if 'GAME_ID' not in logs.columns:
-                logs['GAME_ID'] = logs.index
-        
+        if stored is not None:
+            # A completed season stored after it ended will never change
+            if _is_season_complete(season) and storage.stored_at(kind, key) >= _season_end_date(season):
+                return stored
+
+        if stored is None or stored.empty:
+            logs = _normalize_game_logs(fetch(None))
+        else:
+            last_date = stored['GAME_DATE'].max()
+            new_logs = _normalize_game_logs(fetch(last_date))
+
+            logs = stored
+            if not new_logs.empty:
+                logs = pd.concat([stored, new_logs], ignore_index=True)
+                logs = _normalize_game_logs(logs.drop_duplicates(subset=unique_cols, keep='last'))
+
+        storage.write_frame(kind, key, logs)
         return logs
     except Exception as e:
-        print(f"Error fetching data for player {player_id}, season {season}: {e}")
+        logger.error(f"Error fetching {kind} {key}: {e}")
+        # Serve whatever we already have rather than nothing
+        return stored if stored is not None else pd.DataFrame()
+
+@span("loader.get_league_game_logs")
+@cached(ttl=1800, refresh_ahead=True)  # Cache for 30 minutes, hot keys kept warm
+def get_league_game_logs(season=None):
+    """Get every player's game logs for a season, normalized once as a single frame"""
+    if season is None:
+        season = get_current_season()
+
+    return _load_stored_logs(
+        "league_game_logs", str(season), season,
+        lambda date_from: _fetch_league_game_logs(season, date_from),
+        unique_cols=['PLAYER_ID', 'GAME_ID']
+    )
+
+def get_game_log_memory_report(seasons=None):
+    """Bytes per season of league game logs as fetched and with the compact schema.
+
+    Stored and cached logs are already compact, so every season is fetched again
+    to measure the frame the API gives us before it is compacted.
+    """
+    if seasons is None:
+        seasons = get_available_seasons()
+
+    def measure(season):
+        try:
+            raw = _fetch_league_game_logs(season)
+        except Exception as e:
+            logger.error(f"Error fetching league game logs {season} for the memory report: {e}")
+            return None
+        return raw, _normalize_game_logs(raw)
+
+    measured = zip(seasons, _map_concurrently(measure, seasons))
+    return memory_report({season: frames for season, frames in measured if frames is not None and not frames[0].empty})
+
+def _slice_player_logs(league_logs, player_id):
+    """Take one player's games out of a league-wide game log frame"""
+    if league_logs.empty:
         return pd.DataFrame()
+    return league_logs[league_logs['PLAYER_ID'] == player_id].reset_index(drop=True)
+
+@span("loader.get_player_game_logs")
+@cached(ttl=1800, refresh_ahead=True)  # Cache for 30 minutes, hot keys kept warm
+def get_player_game_logs(player_id, season=None, bulk=False):
+    """Get player game logs for a specific season.
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def get_player_season_stats(player_id, season=None):
+    Logs are kept in the on-disk store. Completed seasons are served straight from
+    disk, while the current season only fetches the games after the last stored one.
+    With bulk=True the logs are sliced from the league-wide season frame instead.
+    """
+    if season is None:
+        season = get_current_season()
+    
+    if bulk:
+        return _slice_player_logs(get_league_game_logs(season), player_id)
+
+    return _load_stored_logs(
+        "game_logs", storage.game_log_key(player_id, season), season,
+        lambda date_from: _fetch_game_logs(player_id, season, date_from),
+        unique_cols=['GAME_ID']
+    )
+
+@span("loader.get_season_stats_frame")
+@cached(ttl=1800, refresh_ahead=True)  # Cache for 30 minutes, hot keys kept warm
+def get_season_stats_frame(season=None):
+    """Get averages, totals and percentiles for every player in a season, indexed by player id"""
+    if season is None:
+        season = get_current_season()
+
+    season_stats = aggregate_season_stats(get_league_game_logs(season))
+    # Indexes built from this frame are keyed by its fingerprint, so hash it once here
+    season_stats.attrs['fingerprint'] = data_fingerprint(season_stats) if not season_stats.empty else None
+    return season_stats
+
+@span("loader.get_player_season_stats")
+@cached(ttl=1800, refresh_ahead=True)  # Cache for 30 minutes, hot keys kept warm
+def get_player_season_stats(player_id, season=None, bulk=False):
     """Get player's season averages and totals as a simple dictionary."""
     if season is None:
         season = get_current_season()
     
     try:
+        # The league-wide frame already holds every player's row
+        if bulk:
+            return season_stats_row(get_season_stats_frame(season), player_id)
+
         logs = get_player_game_logs(player_id, season)
         if logs.empty:
             return {}
 
-        # Safely calculate stats
-        stats = {
-            'games_played': len(logs),
-            'ppg': logs['PTS'].mean(),
-            'rpg': logs['REB'].mean(),
-            'apg': logs['AST'].mean(),
-            'spg': logs['STL'].mean(),
-            'bpg': logs['BLK'].mean(),
-            'mpg': logs['MIN'].mean(),
-            'fg_pct': logs['FG_PCT'].mean(),
-            'fg3_pct': logs['FG3_PCT'].mean(),
-            'ft_pct': logs['FT_PCT'].mean(),
-        }
-
-        # Replace NaN with 0 and round the values
-        for key, value in stats.items():
-            if pd.isna(value):
-                stats[key] = 0
-            else:
-                # Round percentages to 3 decimal places, others to 1
-                if '_pct' in key:
-                    stats[key] = round(value, 3)
-                else:
-                    stats[key] = round(value, 1)
-
-        return stats
+        return season_stats_row(aggregate_season_stats(logs, percentiles=False), player_id)
     except Exception as e:
-        print(f"Error calculating season stats for player {player_id}: {e}")
+        logger.error(f"Error calculating season stats for player {player_id}: {e}")
         return {}
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@cached(ttl=3600)  # Cache for 1 hour
 def get_available_seasons():
     """Get list of available seasons (last 5 years)"""
     current_year = int(get_current_season())
     return [str(year) for year in range(current_year - 4, current_year + 1)]
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def get_box_score(game_id):
-    """Get box score data for a specific game"""
+def _season_player_ids(season, stored_index):
+    """Ids of the players with at least one game in a season"""
+    # Completed seasons indexed after they ended can't gain players
+    if (stored_index is not None and _is_season_complete(season)
+            and storage.stored_at("indexes", "player_seasons") >= _season_end_date(season)):
+        player_ids = stored_index.loc[stored_index['SEASON'] == season, 'PLAYER_ID'].tolist()
+        if player_ids:
+            return player_ids
+
+    league_logs = get_league_game_logs(season)
+    if league_logs.empty:
+        return []
+    return league_logs['PLAYER_ID'].unique().tolist()
+
+@span("loader.get_player_season_index")
+@cached(ttl=1800)  # Cache for 30 minutes
+def get_player_season_index():
+    """Map each player id to the seasons they have games in, newest first.
+
+    Built from the league-wide season frames and persisted, so completed seasons
+    are only ever indexed once.
+    """
+    seasons = get_available_seasons()
+    stored_index = storage.read_frame("indexes", "player_seasons")
+
+    season_player_ids = _map_concurrently(lambda season: _season_player_ids(season, stored_index), seasons)
+    index_df = pd.DataFrame(
+        [(int(player_id), season) for season, player_ids in zip(seasons, season_player_ids) for player_id in player_ids],
+        columns=['PLAYER_ID', 'SEASON']
+    )
+    storage.write_frame("indexes", "player_seasons", index_df)
+    return _season_index_from_frame(index_df)
+
+def _season_index_from_frame(index_df):
+    """Player id -> seasons mapping from the persisted (PLAYER_ID, SEASON) rows"""
+    index = {}
+    for player_id, season in zip(index_df['PLAYER_ID'], index_df['SEASON']):
+        index.setdefault(int(player_id), []).append(season)
+    return {player_id: sorted(player_seasons, reverse=True) for player_id, player_seasons in index.items()}
+
+def _build_player_seasons():
+    """Build the player/season index and keep it for page renders"""
+    global _player_seasons, _player_seasons_built_at
+    index = get_player_season_index()
+    with _player_seasons_lock:
+        _player_seasons, _player_seasons_built_at = index, time.monotonic()
+
+def _player_season_index_nowait():
+    """The player/season index without waiting for it to be built.
+
+    Builds run in the background and the last built index is served meanwhile. Before
+    the first build finishes, the persisted copy from an earlier run is used instead,
+    which is empty on a first run.
+    """
+    global _player_seasons_build
+    with _player_seasons_lock:
+        index = _player_seasons
+        outdated = index is None or time.monotonic() - _player_seasons_built_at > PLAYER_SEASONS_REBUILD_S
+        if outdated and (_player_seasons_build is None or _player_seasons_build.done()):
+            _player_seasons_build = _player_seasons_executor.submit(_build_player_seasons)
+
+    if index is not None:
+        return index
+    stored_index = storage.read_frame("indexes", "player_seasons")
+    return _season_index_from_frame(stored_index) if stored_index is not None else {}
+
+def get_player_available_seasons(player_id):
+    """Get the seasons a player has games in, newest first, or [] if not known yet"""
+    return _player_season_index_nowait().get(int(player_id), [])
+
+def finished_game_ids(logs):
+    """Ids of the games in a game log frame that are over, i.e. have a result"""
+    if logs.empty or 'WL' not in logs.columns:
+        return []
+    # A game still being played is listed without a W or L
+    return logs.loc[logs['WL'].astype(str).isin(['W', 'L']), 'GAME_ID'].tolist()
+
+def _has_full_minutes(team_box):
+    """Check whether both teams' box score lines cover at least a full regulation game"""
+    if team_box.empty or 'MIN' not in team_box.columns:
+        return False
+
+    # Team minutes look like "240:00", 48 minutes for 5 players. A game tied after regulation or
+    # in overtime has them too, so this alone doesn't mean the game is over.
+    minutes = pd.to_numeric(team_box['MIN'].astype(str).str.split(':').str[0], errors='coerce')
+    return len(minutes) >= 2 and bool((minutes >= 240).all())
+
+def _read_stored_box_score(game_id):
+    """Read a finished game's box score from the store, or None if not stored"""
+    player_box = storage.read_frame("box_scores", f"{game_id}_players")
+    team_box = storage.read_frame("box_scores", f"{game_id}_teams")
+    if player_box is None or team_box is None:
+        return None
+    return player_box, team_box
+
+def _load_box_score(game_id, final):
+    """Load a box score from the store, fetching it if needed and storing it if the game is `final`"""
+    stored = _read_stored_box_score(game_id)
+    if stored is not None:
+        return stored
+
+    from nba_api.stats.endpoints import boxscoretraditionalv2
+    box_score = nba_client.fetch_data_frames(
+        boxscoretraditionalv2.BoxScoreTraditionalV2,
+        game_id=game_id
+    )
+    
+    # Return both player and team box scores
+    player_box = apply_compact_schema(box_score[0]) if len(box_score) > 0 else pd.DataFrame()
+    team_box = apply_compact_schema(box_score[1]) if len(box_score) > 1 else pd.DataFrame()
+
+    # Finished games never change, so keep them for good. Games in progress are refetched.
+    # The box score can't tell a finished game from one in overtime, so the caller says which it is.
+    if final and _has_full_minutes(team_box):
+        storage.write_frame("box_scores", f"{game_id}_players", player_box)
+        storage.write_frame("box_scores", f"{game_id}_teams", team_box)
+    
+    return player_box, team_box
+
+@span("loader.get_box_score")
+@cached(ttl=300, refresh_ahead=True)  # Finished games come from the store, this bounds how stale a live game gets
+def get_box_score(game_id, final=False):
+    """Get box score data for a specific game.
+
+    Pass final=True for a game known to be over, e.g. one in finished_game_ids(logs),
+    so its box score is stored for good.
+    """
     try:
-        box_score = boxscoretraditionalv2.BoxScoreTraditionalV2(
-            game_id=game_id
-        ).get_data_frames()
-        
-        # Return both player and team box scores
-        player_box = box_score[0] if len(box_score) > 0 else pd.DataFrame()
-        team_box = box_score[1] if len(box_score) > 1 else pd.DataFrame()
-        
-        return player_box, team_box
+        return _load_box_score(game_id, final)
     except Exception as e:
-        print(f"Error fetching box score for game {game_id}: {e}")
+        logger.error(f"Error fetching box score for game {game_id}: {e}")
         return pd.DataFrame(), pd.DataFrame()
 
-def compare_players(player_ids, season=None):
-    """Compare multiple players' season stats."""
+def _prefetch_box_score(game_id):
+    """Store one game's box score unless it is already stored"""
+    stored = False
+    try:
+        stored = storage.stored_at("box_scores", f"{game_id}_teams") is not None
+        if not stored:
+            _load_box_score(game_id, final=True)
+            stored = storage.stored_at("box_scores", f"{game_id}_teams") is not None
+    except Exception as e:
+        logger.error(f"Error prefetching box score for game {game_id}: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetch_pending.discard(game_id)
+            if stored:
+                _prefetch_stored.add(game_id)
+                _prefetch_retry_at.pop(game_id, None)
+            else:
+                # Empty or failed fetches aren't stored; leave them alone for a while
+                _prefetch_retry_at[game_id] = time.monotonic() + PREFETCH_RETRY_S
+
+def prefetch_box_scores(player_id, season, game_ids):
+    """Warm the box score store for a player's finished games in the background.
+
+    `game_ids` must only hold games that are over (see finished_game_ids), since
+    their box scores are stored for good.
+
+    Games already stored, queued or recently tried are skipped, and a (player, season)
+    whose games were all handled isn't looked at again for PREFETCH_RETRY_S.
+    """
+    key = (int(player_id), str(season))
+    game_ids = list(dict.fromkeys(game_ids))
+    now = time.monotonic()
+    with _prefetch_lock:
+        prefetched = _prefetched_logs.get(key)
+        if prefetched is not None and now < prefetched[1] and prefetched[0].issuperset(game_ids):
+            return
+        candidates = [
+            game_id for game_id in game_ids
+            if game_id not in _prefetch_stored and game_id not in _prefetch_pending
+            and _prefetch_retry_at.get(game_id, 0) <= now
+        ]
+
+    # Games stored by an earlier process only need a stat, not a request
+    for game_id in candidates:
+        if storage.stored_at("box_scores", f"{game_id}_teams") is not None:
+            with _prefetch_lock:
+                _prefetch_stored.add(game_id)
+
+    with _prefetch_lock:
+        new_ids = [game_id for game_id in candidates if game_id not in _prefetch_stored and game_id not in _prefetch_pending]
+        _prefetch_pending.update(new_ids)
+        _prefetched_logs[key] = (frozenset(game_ids), now + PREFETCH_RETRY_S)
+
+    for game_id in new_ids:
+        _prefetch_executor.submit(_prefetch_box_score, game_id)
+
+def _map_concurrently(func, items, max_workers=MAX_FETCH_WORKERS):
+    """Call func on every item with a bounded thread pool, returning results in input order"""
+    items = list(items)
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+@span("loader.compare_players")
+def compare_players(player_ids, season=None, bulk=False):
+    """Compare multiple players' season stats.
+
+    Players are fetched concurrently, or with bulk=True all of them are read from the
+    league-wide season frame so no per-player requests are made.
+    """
     if season is None:
         season = get_current_season()
     
-    comparison_data = []
-    
-    for player_id in player_ids:
+    if bulk:
+        # Comparison rows are a lookup into the league-wide season frame
+        season_stats = get_season_stats_frame(season)
+        found_ids = [player_id for player_id in player_ids if player_id in season_stats.index]
+        comparison_data = season_stats.loc[found_ids, SEASON_STAT_COLUMNS].rename_axis('player_id').reset_index()
+        comparison_data.insert(1, 'season', season)
+        return comparison_data
+
+    def fetch_stats(player_id):
         try:
-            stats = get_player_season_stats(player_id, season)
-            if stats:  # Check if the dictionary is not empty
-                player_info = {
-                    'player_id': player_id,
-                    'season': season,
-                    'games_played': stats.get('games_played', 0),
-                    'ppg': stats.get('ppg', 0.0),
-                    'rpg': stats.get('rpg', 0.0),
-                    'apg': stats.get('apg', 0.0),
-                    'spg': stats.get('spg', 0.0),
-                    'bpg': stats.get('bpg', 0.0),
-                    'mpg': stats.get('mpg', 0.0),
-                    'fg_pct': stats.get('fg_pct', 0.0),
-                    'fg3_pct': stats.get('fg3_pct', 0.0),
-                    'ft_pct': stats.get('ft_pct', 0.0)
-                }
-                comparison_data.append(player_info)
+            return get_player_season_stats(player_id, season)
         except Exception as e:
-            print(f"Error processing player {player_id} for comparison: {e}")
+            logger.error(f"Error processing player {player_id} for comparison: {e}")
+            return {}
+
+    comparison_data = []
+    
+    for player_id, stats in zip(player_ids, _map_concurrently(fetch_stats, player_ids)):
+        if stats:  # Check if the dictionary is not empty
+            comparison_data.append({'player_id': player_id, 'season': season, **stats})
     
-    return pd.DataFrame(comparison_data)
+    return pd.DataFrame(comparison_data, columns=['player_id', 'season'] + SEASON_STAT_COLUMNS)
+
+def _season_stats_index(kind, season, build):
+    """Get an index built from a season's stats frame, rebuilding it only when those stats change"""
+    if season is None:
+        season = get_current_season()
+
+    season_stats = get_season_stats_frame(season)
+    fingerprint = season_stats.attrs.get('fingerprint')
+    if fingerprint is None and not season_stats.empty:
+        fingerprint = data_fingerprint(season_stats)
+    key = (kind, str(season))
+    with _season_index_lock:
+        entry = _season_indexes.get(key)
+    if entry is not None and entry[0] == fingerprint:
+        return entry[1]
+
+    index = build(season_stats)
+    with _season_index_lock:
+        _season_indexes[key] = (fingerprint, index)
+    return index
+
+@span("loader.get_similarity_index")
+def get_similarity_index(season=None):
+    """Get the nearest-neighbour index over every player's season averages"""
+    return _season_stats_index("similarity", season, SimilarityIndex)
+
+@span("loader.get_leaderboards")
+def get_leaderboards(season=None):
+    """Get every player of a season sorted by each stat"""
+    return _season_stats_index("leaderboards", season, Leaderboards)
+
+def get_league_leaders(stat, season=None, n=10, min_games=0, min_minutes=0):
+    """Get the top n players in a season stat, among players with enough games and minutes"""
+    return get_leaderboards(season).top(stat, n, min_games, min_minutes)
+
+def get_player_league_ranks(player_id, season=None):
+    """Get a player's league rank in each season stat, among players with enough games to qualify"""
+    try:
+        return get_leaderboards(season).player_ranks(player_id)
+    except Exception as e:
+        logger.error(f"Error ranking player {player_id}: {e}")
+        return {}
+
+def find_similar_players(player_id, season=None, k=5):
+    """Get the k players whose season averages are closest to a player's, with those averages"""
+    if season is None:
+        season = get_current_season()
+
+    try:
+        similar = get_similarity_index(season).nearest(player_id, k)
+        season_stats = get_season_stats_frame(season)
+        return similar.join(season_stats[SEASON_STAT_COLUMNS], on='player_id')
+    except Exception as e:
+        logger.error(f"Error finding players similar to {player_id}: {e}")
+        return pd.DataFrame()
 
+@span("loader.get_player_advanced_stats")
+@cached(ttl=1800)  # Cache for 30 minutes
 def get_player_advanced_stats(player_id, season=None):
     """Get advanced statistics for a player"""
     if season is None:
         season = get_current_season()
     
     try:
-        logs = get_player_game_logs(player_id, season)
-        if not logs.empty:
-            # Calculate advanced stats
-            advanced_stats = {}
-            
-            # Efficiency stats
-            if 'FG_PCT' in logs.columns and 'FG3_PCT' in logs.columns:
-                advanced_stats['true_shooting_pct'] = logs['FG_PCT'].mean()
-                advanced_stats['effective_fg_pct'] = logs['FG_PCT'].mean()
-            
-            # Usage stats
-            if 'MIN' in logs.columns:
-                advanced_stats['avg_minutes'] = logs['MIN'].mean()
-                advanced_stats['total_minutes'] = logs['MIN'].sum()
-            
-            # Consistency stats
-            if 'PTS' in logs.columns:
-                advanced_stats['pts_std'] = logs['PTS'].std()
-                advanced_stats['pts_variance'] = logs['PTS'].var()
-            
-            return advanced_stats
-        return {}
+        return compute_advanced_stats(get_player_game_logs(player_id, season))
     except Exception as e:
-        print(f"Error calculating advanced stats for player {player_id}: {e}")
+        logger.error(f"Error calculating advanced stats for player {player_id}: {e}")
         return {}
 
+def _logs_fingerprint(logs, count=None):
+    """Hash of a game log frame, or of its first `count` games"""
+    return data_fingerprint(logs if count is None else logs.iloc[:count])
+
+def _covers_earlier_games(logs, known_games, known_fingerprint, fingerprint):
+    """Check that games seen before are still the first ones in `logs`, unchanged.
+
+    Comparing a hash of the rows rather than the game ids also catches stats that
+    were corrected after we first saw them. `fingerprint` is the hash of all of `logs`.
+    """
+    if known_games > len(logs):
+        return False
+    if known_games == len(logs):
+        return known_fingerprint == fingerprint
+    return known_fingerprint == _logs_fingerprint(logs, known_games)
+
+@span("loader.get_player_rolling_stats")
+def get_player_rolling_stats(player_id, season=None):
+    """Get rolling and exponentially weighted averages over a player's last 5/10/20 games.
+
+    Computed once per player and season, then only extended when new games show up.
+    """
+    if season is None:
+        season = get_current_season()
+
+    logs = get_player_game_logs(player_id, season)
+    if logs.empty:
+        return pd.DataFrame()
+
+    cached = get_entry("get_player_rolling_stats", int(player_id), str(season))
+
+    try:
+        fingerprint = _logs_fingerprint(logs)
+        known_games, known_fingerprint, rolling = cached if cached is not None else (0, None, None)
+        if rolling is not None and _covers_earlier_games(logs, known_games, known_fingerprint, fingerprint):
+            if known_games == len(logs):
+                return rolling
+            rolling = extend_rolling_stats(rolling, logs.iloc[:known_games], logs.iloc[known_games:])
+        else:
+            rolling = compute_rolling_stats(logs)
+    except Exception as e:
+        logger.error(f"Error calculating rolling stats for player {player_id}: {e}")
+        return pd.DataFrame()
+
+    _, _, rolling = put_entry("get_player_rolling_stats", (len(logs), fingerprint, rolling), ROLLING_TTL_S, int(player_id), str(season))
+    return rolling
+
+@span("loader.get_player_splits")
+def get_player_splits(player_id, season=None):
+    """Get a player's per-game averages split by home/away, result, days of rest and opponent.
+
+    Indexed by (split, group). The underlying sums are kept per player and season,
+    and only new games are added to them when they show up.
+    """
+    if season is None:
+        season = get_current_season()
+
+    logs = get_player_game_logs(player_id, season)
+    if logs.empty:
+        return split_summary(pd.DataFrame())
+
+    cached = get_entry("get_player_splits", int(player_id), str(season))
+
+    try:
+        fingerprint = _logs_fingerprint(logs)
+        known_games, known_fingerprint, cells, summary = cached if cached is not None else (0, None, None, None)
+        if cells is not None and _covers_earlier_games(logs, known_games, known_fingerprint, fingerprint):
+            if known_games == len(logs):
+                return summary
+            previous_date = logs['GAME_DATE'].iloc[known_games - 1]
+            new_games = tag_splits(logs.iloc[known_games:], previous_date)
+            cells = add_cells(cells, split_cells(new_games))
+        else:
+            cells = split_cells(tag_splits(logs))
+        summary = split_summary(cells)
+    except Exception as e:
+        logger.error(f"Error calculating splits for player {player_id}: {e}")
+        return split_summary(pd.DataFrame())
+
+    _, _, _, summary = put_entry("get_player_splits", (len(logs), fingerprint, cells, summary), SPLITS_TTL_S, int(player_id), str(season))
+    return summary
+
+def _extend_career_logs(cached, season_logs, seasons, fingerprints):
+    """Append the latest season's new games to a cached career frame, or None if it has to be rebuilt"""
+    career_logs, known = cached
+    latest = seasons[-1]
+    logs = season_logs[latest]
+
+    # Only the latest season can gain games, only at the end, and no season's earlier games may have changed
+    if list(known) != seasons:
+        return None
+    if any(known[season] != (len(season_logs[season]), fingerprints[season]) for season in seasons[:-1]):
+        return None
+    known_games, known_fingerprint = known[latest]
+    if not _covers_earlier_games(logs, known_games, known_fingerprint, fingerprints[latest]):
+        return None
+
+    if known_games == len(logs):
+        return career_logs
+    return concat_game_logs([career_logs, tag_season(logs.iloc[known_games:], latest, seasons)])
+
+@span("loader.get_player_career_logs")
+def get_player_career_logs(player_id):
+    """Get every season of a player's game logs as one frame, oldest first, tagged with SEASON.
+
+    Seasons are loaded concurrently. The frame is kept per player, and when the current
+    season gains games only those are appended to it.
+    """
+    seasons = sorted(get_player_available_seasons(player_id)) or get_available_seasons()
+    season_logs = dict(zip(seasons, _map_concurrently(lambda season: get_player_game_logs(player_id, season), seasons)))
+
+    cached = get_entry("get_player_career_logs", int(player_id))
+
+    try:
+        fingerprints = {season: _logs_fingerprint(logs) for season, logs in season_logs.items()}
+        career_logs = _extend_career_logs(cached, season_logs, seasons, fingerprints) if cached is not None else None
+        if cached is not None and career_logs is cached[0]:
+            # Nothing new since it was kept
+            return career_logs
+        if career_logs is None:
+            career_logs = concat_game_logs([tag_season(season_logs[season], season, seasons) for season in seasons])
+    except Exception as e:
+        logger.error(f"Error building career logs for player {player_id}: {e}")
+        return pd.DataFrame()
+
+    known = {season: (len(season_logs[season]), fingerprints[season]) for season in seasons}
+    career_logs, _ = put_entry("get_player_career_logs", (career_logs, known), CAREER_TTL_S, int(player_id))
+    return career_logs
+
+def get_player_career(player_id):
+    """Get a player's season-by-season averages with year-over-year changes, and their career splits.
+
+    Returns (summary indexed by SEASON, splits indexed by split name).
+    """
+    career_logs = get_player_career_logs(player_id)
+    return career_season_summary(career_logs), career_splits(career_logs)
+
+@cached(ttl=3600)  # Cache for 1 hour
+def get_team_list():
+    """Get every NBA team's id, name and abbreviation"""
+    from nba_api.stats.static import teams
+    return pd.DataFrame(teams.get_teams())
+
+def _fetch_team_season_stats(season):
+    """Fetch every team's season totals from stats.nba.com in one request"""
+    from nba_api.stats.endpoints import leaguedashteamstats
+    return nba_client.fetch_data_frames(
+        leaguedashteamstats.LeagueDashTeamStats,
+        season=season,
+        per_mode_detailed='Totals'
+    )[0]
+
+@span("loader.get_team_season_stats")
+@cached(ttl=1800)  # Cache for 30 minutes
+def get_team_season_stats(season=None):
+    """Get every team's season totals from one league-wide request, indexed by TEAM_ID"""
+    if season is None:
+        season = get_current_season()
+
+    key = str(season)
+    stored = storage.read_frame("team_season_stats", key)
+    # A completed season stored after it ended will never change
+    if (stored is not None and _is_season_complete(season)
+            and storage.stored_at("team_season_stats", key) >= _season_end_date(season)):
+        return stored.set_index('TEAM_ID')
+
+    try:
+        team_stats = _fetch_team_season_stats(season)
+        storage.write_frame("team_season_stats", key, team_stats)
+    except Exception as e:
+        logger.error(f"Error fetching team stats for {season}: {e}")
+        team_stats = stored if stored is not None else pd.DataFrame(columns=['TEAM_ID'])
+    return team_stats.set_index('TEAM_ID')
+
+@span("loader.get_team_rollups")
+@cached(ttl=1800)  # Cache for 30 minutes
+def get_team_rollups(season=None):
+    """Get team ratings and player usage for a season, computed from the stored league game logs.
+
+    Returns (ratings indexed by TEAM_ID, usage with one row per player and team).
+    """
+    if season is None:
+        season = get_current_season()
+
+    league_logs = get_league_game_logs(season)
+    if league_logs.empty:
+        return team_ratings(pd.DataFrame()), player_usage(league_logs, pd.DataFrame())
+
+    team_games = team_game_totals(league_logs)
+    return team_ratings(team_games), player_usage(league_logs, team_games)
+
+@cached(ttl=1800)  # Cache for 30 minutes
+def get_team_season_frame(season=None):
+    """Get one row per team with its record, pace, ratings and league ranks"""
+    if season is None:
+        season = get_current_season()
+
+    ratings, _ = get_team_rollups(season)
+    return team_season_frame(get_team_season_stats(season), ratings)
+
+def get_team_usage(team_id, season=None):
+    """Get the usage rate and share of team plays of each player on a team, highest first"""
+    _, usage = get_team_rollups(season)
+    team_usage = usage[usage['TEAM_ID'] == int(team_id)]
+    return team_usage.sort_values('usage_share', ascending=False).reset_index(drop=True)
+
 def get_player_headshot_url(player_id):
     """Construct the URL for a player's headshot image."""
     return f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png"
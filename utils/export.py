@@ -0,0 +1,161 @@
+"""Export season stats and game logs for every active player.
+
+Runs without Streamlit, e.g. from a nightly job:
+
+    python -m utils.export --season 2023 --out exports --format parquet --workers 4
+
+Like anything importing utils.cache, this runs with pandas copy-on-write turned on.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.aggregation import aggregate_season_stats, season_stats_row
+from utils.cache import NoCacheBackend, _is_empty, set_cache_backend
+from utils.data_loader import (
+    get_current_season,
+    get_league_game_logs,
+    get_player_game_logs,
+    get_player_list
+)
+
+logger = logging.getLogger(__name__)
+
+class FrameSink:
+    """Append frames to one Parquet or CSV file as they arrive, without keeping them"""
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if df.empty:
+            return
+
+        # Categories differ from chunk to chunk, so write plain values
+        df = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+        if self.file_format == "csv":
+            df.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                table = table.select(self._schema.names).cast(self._schema)
+            self._writer.write_table(table)
+
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def _load_player(player_id, player_name, season, league_logs=None):
+    """Load one player's game logs and season summary"""
+    if league_logs is not None:
+        logs = league_logs.get(player_id, pd.DataFrame())
+    else:
+        logs = get_player_game_logs(player_id, season)
+    if logs.empty:
+        return logs, pd.DataFrame()
+
+    logs = logs.assign(PLAYER_ID=player_id, PLAYER_NAME=player_name)
+    stats = season_stats_row(aggregate_season_stats(logs, percentiles=False), player_id)
+    stats_row = pd.DataFrame([{'player_id': player_id, 'player_name': player_name, 'season': season, **stats}])
+    return logs, stats_row
+
+def export_season(season, out_dir, file_format="parquet", workers=4, bulk=False):
+    """Stream every active player's game logs and season stats for a season to disk.
+
+    Players are loaded on a bounded worker pool and each result is written as soon as
+    it completes, so at most a handful of players are held in memory at a time. Players
+    whose load raised or came back empty are counted as failed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    log_sink = FrameSink(os.path.join(out_dir, f"game_logs_{season}.{file_format}"), file_format)
+    stats_sink = FrameSink(os.path.join(out_dir, f"season_stats_{season}.{file_format}"), file_format)
+    for sink in (log_sink, stats_sink):
+        if os.path.exists(sink.path):
+            os.remove(sink.path)
+
+    players_df = get_player_list()
+
+    # In bulk mode one league-wide request replaces the per-player ones
+    league_logs = None
+    if bulk:
+        season_logs = get_league_game_logs(season)
+        league_logs = dict(tuple(season_logs.groupby('PLAYER_ID'))) if not season_logs.empty else {}
+
+    pending_players = list(zip(players_df['id'], players_df['full_name']))
+    in_flight = set()
+    failed = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending_players or in_flight:
+                # Keep only a small window of players in flight
+                while pending_players and len(in_flight) < workers * 2:
+                    player_id, player_name = pending_players.pop()
+                    in_flight.add(executor.submit(_load_player, int(player_id), player_name, season, league_logs))
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        logs, stats_row = future.result()
+                    except Exception as e:
+                        logger.error(f"Error exporting player: {e}")
+                        failed += 1
+                        continue
+                    # Loaders log upstream errors and come back empty, which looks the same as no games
+                    if _is_empty(logs):
+                        failed += 1
+                        continue
+                    log_sink.write(logs)
+                    stats_sink.write(stats_row)
+    finally:
+        log_sink.close()
+        stats_sink.close()
+
+    return {
+        'players': len(players_df),
+        'players_with_games': stats_sink.rows,
+        'game_log_rows': log_sink.rows,
+        'failed': failed,
+        'game_logs_path': log_sink.path,
+        'season_stats_path': stats_sink.path,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export season stats and game logs for all active NBA players.")
+    parser.add_argument("--season", default=None, help="Season start year, e.g. 2023 (defaults to the current season)")
+    parser.add_argument("--out", default="exports", help="Output directory")
+    parser.add_argument("--format", dest="file_format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--workers", type=int, default=4, help="Players loaded in parallel")
+    parser.add_argument("--bulk", action="store_true", help="Slice players from one league-wide request per season")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # Every key is read once, so an in-memory cache would only hold on to memory
+    set_cache_backend(NoCacheBackend())
+
+    season = args.season or get_current_season()
+    start = time.perf_counter()
+    summary = export_season(season, args.out, args.file_format, args.workers, args.bulk)
+    elapsed = time.perf_counter() - start
+
+    print(f"Exported {summary['players_with_games']} of {summary['players']} players "
+          f"({summary['game_log_rows']} game log rows, {summary['failed']} failed or empty) in {elapsed:.1f}s")
+    print(f"  {summary['game_logs_path']}")
+    print(f"  {summary['season_stats_path']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import math
+import numpy as np
+from utils.aggregation import SEASON_STAT_COLUMNS
+
+# Ranks shown next to a player's stats count players with this share of the most games anyone has played
+QUALIFYING_GAMES_SHARE = 0.25
+
+class Leaderboards:
+    """Every player of a season ordered by each stat, sorted once when built.
+
+    A top-N query or a rank lookup is then a slice or a binary search of the
+    stored order; the games and minutes filters only mask it.
+    """
+
+    def __init__(self, season_stats, stats=SEASON_STAT_COLUMNS):
+        self.season_stats = season_stats
+        self.stats = [stat for stat in stats if stat in season_stats.columns]
+        self.player_ids = season_stats.index.to_numpy()
+        self._positions = {int(player_id): i for i, player_id in enumerate(self.player_ids)}
+
+        self._games = season_stats['games_played'].to_numpy(dtype='float64') if len(season_stats) else np.empty(0)
+        if 'total_min' in season_stats.columns:
+            self._minutes = season_stats['total_min'].to_numpy(dtype='float64')
+        else:
+            self._minutes = season_stats['mpg'].to_numpy(dtype='float64') * self._games if len(season_stats) else np.empty(0)
+
+        # Highest first; a stable sort keeps ties in a fixed order
+        self._values = {}
+        self._order = {}
+        for stat in self.stats:
+            values = season_stats[stat].to_numpy(dtype='float64')
+            self._values[stat] = values
+            self._order[stat] = np.argsort(-values, kind='stable')
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def qualifying_games(self):
+        """Games a player needs for the ranks shown next to their stats"""
+        return math.ceil(QUALIFYING_GAMES_SHARE * self._games.max()) if len(self) else 0
+
+    def _eligible_order(self, stat, min_games, min_minutes):
+        order = self._order[stat]
+        if min_games > 0 or min_minutes > 0:
+            order = order[(self._games[order] >= min_games) & (self._minutes[order] >= min_minutes)]
+        return order
+
+    def top(self, stat, n=10, min_games=0, min_minutes=0):
+        """The n players highest in a stat, among those with enough games and minutes"""
+        order = self._eligible_order(stat, min_games, min_minutes)
+        top = order[:n]
+
+        # Tied players share the better rank
+        sorted_values = -self._values[stat][order]
+        ranks = np.searchsorted(sorted_values, sorted_values[:n], side='left') + 1
+
+        leaders = self.season_stats.iloc[top][SEASON_STAT_COLUMNS].rename_axis('player_id').reset_index()
+        leaders.insert(0, 'rank', ranks)
+        return leaders
+
+    def rank(self, player_id, stat, min_games=0, min_minutes=0):
+        """A player's league rank in a stat and the number of players ranked, or (None, count) if they don't qualify"""
+        order = self._eligible_order(stat, min_games, min_minutes)
+        position = self._positions.get(int(player_id))
+        if position is None or self._games[position] < min_games or self._minutes[position] < min_minutes:
+            return None, len(order)
+
+        sorted_values = -self._values[stat][order]
+        rank = int(np.searchsorted(sorted_values, -self._values[stat][position], side='left')) + 1
+        return rank, len(order)
+
+    def player_ranks(self, player_id):
+        """A player's rank in every stat among players with the qualifying games, empty if they don't qualify"""
+        min_games = self.qualifying_games()
+        ranks = {}
+        for stat in self.stats:
+            rank, _ = self.rank(player_id, stat, min_games=min_games)
+            if rank is not None:
+                ranks[stat] = rank
+        return ranks
@@ -0,0 +1,209 @@
+"""Timing spans, upstream latencies and error counts for the operator panel.
+
+Everything here is process-wide, shared by all sessions, and cheap enough to leave
+on in production. It can be read as frames or as Prometheus text.
+"""
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+import pandas as pd
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a throttled request
+LATENCY_BUCKETS_S = (0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Recent samples kept per histogram for percentiles
+RECENT_SAMPLES = 512
+
+class Histogram:
+    """Bucketed durations, plus a window of recent samples for percentiles"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_S):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        """The q-th percentile (0-100) of the recent samples"""
+        if not self.recent:
+            return 0.0
+        samples = sorted(self.recent)
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+_lock = threading.Lock()
+_spans = {}
+_upstream = {}
+_upstream_failures = {}
+_errors = {}
+
+def observe_span(name, seconds):
+    with _lock:
+        _spans.setdefault(name, Histogram()).observe(seconds)
+
+@contextlib.contextmanager
+def span(name):
+    """Time a block (or, used as a decorator, every call of a function) under a span name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_span(name, time.perf_counter() - start)
+
+def observe_upstream(endpoint, seconds, failed=False):
+    """Record one stats.nba.com round trip"""
+    with _lock:
+        _upstream.setdefault(endpoint, Histogram()).observe(seconds)
+        if failed:
+            _upstream_failures[endpoint] = _upstream_failures.get(endpoint, 0) + 1
+
+class ErrorCounter(logging.Handler):
+    """Count warnings and errors logged by the app, per logger"""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+
+    def emit(self, record):
+        with _lock:
+            key = (record.name, record.levelname)
+            _errors[key] = _errors.get(key, 0) + 1
+
+# The data layer logs through module loggers under utils
+logging.getLogger("utils").addHandler(ErrorCounter())
+
+def _histogram_rows(histograms, label):
+    rows = []
+    for name, histogram in sorted(histograms.items()):
+        rows.append({
+            label: name,
+            'count': histogram.count,
+            'mean_ms': 1000 * histogram.total / histogram.count if histogram.count else 0.0,
+            'p50_ms': 1000 * histogram.percentile(50),
+            'p95_ms': 1000 * histogram.percentile(95),
+            'max_ms': 1000 * histogram.max,
+        })
+    return pd.DataFrame(rows, columns=[label, 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+
+def span_report():
+    """Count and latency percentiles of every span"""
+    with _lock:
+        return _histogram_rows(_spans, 'span')
+
+def upstream_report():
+    """Count, failures and latency percentiles of requests to each stats.nba.com endpoint"""
+    with _lock:
+        report = _histogram_rows(_upstream, 'endpoint')
+        report.insert(2, 'failures', [_upstream_failures.get(endpoint, 0) for endpoint in report['endpoint']])
+    return report
+
+def error_report():
+    """Warnings and errors logged so far, per logger and level"""
+    with _lock:
+        rows = [{'logger': name, 'level': level, 'count': count} for (name, level), count in sorted(_errors.items())]
+    return pd.DataFrame(rows, columns=['logger', 'level', 'count'])
+
+def _labels(**labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+def _prometheus_histogram(lines, metric, histograms, label):
+    lines.append(f"# TYPE {metric} histogram")
+    for name, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.bucket_counts):
+            cumulative += count
+            lines.append(f"{metric}_bucket{{{_labels(**{label: name}, le=bound)}}} {cumulative}")
+        lines.append(f"{metric}_sum{{{_labels(**{label: name})}}} {histogram.total:.6f}")
+        lines.append(f"{metric}_count{{{_labels(**{label: name})}}} {histogram.count}")
+
+def prometheus_text():
+    """All metrics, including cache hit/miss counters, in the Prometheus text format"""
+    from utils.cache import cache_stats, refresh_stats
+    from utils.charts import chart_cache
+
+    lines = []
+    with _lock:
+        _prometheus_histogram(lines, "nba_stats_span_seconds", _spans, "span")
+        _prometheus_histogram(lines, "nba_stats_upstream_request_seconds", _upstream, "endpoint")
+
+        lines.append("# TYPE nba_stats_upstream_failures_total counter")
+        for endpoint, count in sorted(_upstream_failures.items()):
+            lines.append(f"nba_stats_upstream_failures_total{{{_labels(endpoint=endpoint)}}} {count}")
+
+        lines.append("# TYPE nba_stats_log_messages_total counter")
+        for (name, level), count in sorted(_errors.items()):
+            lines.append(f"nba_stats_log_messages_total{{{_labels(logger=name, level=level)}}} {count}")
+
+    stats = cache_stats()
+    for column, metric_type in (('hits', 'counter'), ('stale_hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'),
+                                ('entries', 'gauge'), ('bytes', 'gauge')):
+        metric = f"nba_stats_cache_{column}" + ("_total" if metric_type == 'counter' else "")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for function, value in zip(stats['function'], stats[column]):
+            lines.append(f"{metric}{{{_labels(function=function)}}} {value}")
+
+    refresh = refresh_stats()
+    for name, metric_type in (('refreshes', 'counter'), ('failures', 'counter'), ('hot', 'gauge'), ('tracked', 'gauge')):
+        metric = f"nba_stats_cache_refresh_{name}" + ("_total" if metric_type == 'counter' else "_keys")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        lines.append(f"{metric} {refresh[name]}")
+
+    lines.append("# TYPE nba_stats_chart_cache_hits_total counter")
+    lines.append(f"nba_stats_chart_cache_hits_total {chart_cache.hits}")
+    lines.append("# TYPE nba_stats_chart_cache_misses_total counter")
+    lines.append(f"nba_stats_chart_cache_misses_total {chart_cache.misses}")
+    lines.append("# TYPE nba_stats_chart_cache_bytes gauge")
+    lines.append(f"nba_stats_chart_cache_bytes {chart_cache.current_bytes}")
+    return "\n".join(lines) + "\n"
+
+class RunProfiler:
+    """Profile one script run, with pyinstrument if it is installed and cProfile otherwise"""
+
+    def __init__(self):
+        try:
+            import pyinstrument
+            self._profiler = pyinstrument.Profiler()
+            self.tool = "pyinstrument"
+        except ImportError:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self.tool = "cProfile"
+        self.running = False
+
+    def start(self):
+        try:
+            if self.tool == "pyinstrument":
+                self._profiler.start()
+            else:
+                self._profiler.enable()
+            self.running = True
+        except ValueError as e:
+            # cProfile allows one active profiler per process, so concurrent sessions take turns
+            logging.getLogger(__name__).warning(f"Profiler not started: {e}")
+
+    def stop(self, limit=40):
+        """Stop profiling and return the report as text"""
+        if not self.running:
+            return "Profiler was not running, another session may have been profiling at the same time."
+        self.running = False
+
+        if self.tool == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text()
+
+        import io
+        import pstats
+        self._profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
@@ -0,0 +1,130 @@
+import logging
+import os
+import random
+import threading
+import time
+from utils.metrics import observe_upstream
+from utils.rate_limiter import api_limiter
+
+logger = logging.getLogger(__name__)
+
+# Request settings, each overridable through the environment
+REQUEST_TIMEOUT = float(os.environ.get("NBA_STATS_TIMEOUT", 30))
+MAX_RETRIES = int(os.environ.get("NBA_STATS_MAX_RETRIES", 3))
+BACKOFF_BASE = float(os.environ.get("NBA_STATS_BACKOFF_BASE", 1.0))
+BACKOFF_MAX = float(os.environ.get("NBA_STATS_BACKOFF_MAX", 20.0))
+POOL_SIZE = int(os.environ.get("NBA_STATS_POOL_SIZE", 10))
+# Where requests go instead of stats.nba.com, e.g. a local stand-in for load tests
+BASE_URL = os.environ.get("NBA_STATS_BASE_URL")
+
+# stats.nba.com signals throttling with these statuses, or by letting requests time out
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session_installed = False
+_session_lock = threading.Lock()
+
+def _install_session():
+    """Give nba_api one keep-alive session with a pool large enough for our worker threads.
+
+    Done on the first request rather than at import, since requests and nba_api's HTTP
+    layer are slow to import and many page loads never reach the API.
+    """
+    global _session_installed
+    with _session_lock:
+        if _session_installed:
+            return
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from nba_api.stats.library.http import NBAStatsHTTP
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        NBAStatsHTTP.set_session(session)
+        if BASE_URL:
+            NBAStatsHTTP.base_url = BASE_URL.rstrip("/") + "/{endpoint}"
+        _session_installed = True
+
+class _InFlightCall:
+    """A request that other threads asking for the same thing can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def _coalesce(key, fetch):
+    """Run fetch once for concurrent callers with the same key, sharing its result"""
+    with _in_flight_lock:
+        call = _in_flight.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = _InFlightCall()
+            _in_flight[key] = call
+
+    if not is_leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        # Each caller gets its own frames so nobody can modify another caller's data
+        return [df.copy() for df in call.result]
+
+    try:
+        call.result = fetch()
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        call.done.set()
+
+def _is_retryable(error, status_code):
+    """Check whether a failed request looks like throttling or a transient outage"""
+    import requests
+
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    return status_code in RETRY_STATUSES
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter, so retrying clients spread out"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _fetch_with_retries(endpoint_cls, params):
+    """Request an endpoint, backing off and retrying on throttling errors"""
+    _install_session()
+    for attempt in range(MAX_RETRIES + 1):
+        api_limiter.wait()
+        endpoint = endpoint_cls(**params, timeout=REQUEST_TIMEOUT, get_request=False)
+        start = time.perf_counter()
+        try:
+            endpoint.get_request()
+            observe_upstream(endpoint_cls.__name__, time.perf_counter() - start)
+            return endpoint.get_data_frames()
+        except Exception as e:
+            observe_upstream(endpoint_cls.__name__, time.perf_counter() - start, failed=True)
+            response = endpoint.nba_response
+            status_code = response._status_code if response is not None else None
+            if attempt == MAX_RETRIES or not _is_retryable(e, status_code):
+                raise
+
+            delay = _backoff_delay(attempt)
+            logger.warning(f"Retrying {endpoint_cls.__name__} in {delay:.1f}s after error: {e}")
+            time.sleep(delay)
+
+def fetch_data_frames(endpoint_cls, **params):
+    """Fetch an nba_api endpoint's data frames.
+
+    Concurrent calls for the same endpoint and parameters share one request, all
+    requests go through the global rate limiter, and throttling errors are retried
+    with jittered exponential backoff.
+    """
+    key = (endpoint_cls.__name__, tuple(sorted(params.items())))
+    return _coalesce(key, lambda: _fetch_with_retries(endpoint_cls, params))
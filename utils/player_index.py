@@ -0,0 +1,52 @@
+import bisect
+import difflib
+
+class PlayerIndex:
+    """Name/id lookups and typeahead search over a player list, built once"""
+
+    def __init__(self, players_df):
+        ids = [int(player_id) for player_id in players_df['id']]
+        full_names = players_df['full_name'].tolist()
+
+        # Keep the first id for the few historical players who share a name
+        self.name_to_id = {}
+        for name, player_id in zip(full_names, ids):
+            self.name_to_id.setdefault(name, player_id)
+        self.id_to_name = dict(zip(ids, full_names))
+        self.names = sorted(self.name_to_id)
+
+        # Every word-boundary suffix of a name is a search key, so "james" finds "LeBron James".
+        # Keys are kept sorted so a prefix query is a bisect plus a short forward scan.
+        entries = set()
+        for name in self.names:
+            words = name.lower().split()
+            for i in range(len(words)):
+                entries.add((' '.join(words[i:]), name))
+        entries = sorted(entries)
+        self._keys = [key for key, _ in entries]
+        self._key_names = [name for _, name in entries]
+
+        self._lower_names = {name.lower(): name for name in self.names}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10):
+        """Find players by name prefix, falling back to fuzzy matches when nothing matches"""
+        query = ' '.join(query.lower().split())
+        if not query:
+            return self.names[:limit]
+
+        matches = []
+        i = bisect.bisect_left(self._keys, query)
+        while i < len(self._keys) and self._keys[i].startswith(query) and len(matches) < limit:
+            name = self._key_names[i]
+            if name not in matches:
+                matches.append(name)
+            i += 1
+
+        if not matches:
+            close = difflib.get_close_matches(query, self._lower_names, n=limit, cutoff=0.6)
+            matches = [self._lower_names[lower_name] for lower_name in close]
+
+        return matches[:limit]
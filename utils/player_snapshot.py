@@ -0,0 +1,48 @@
+"""Bundled snapshot of the active player list, so the sidebar can render without nba_api.
+
+Refresh it after roster changes with:
+
+    python -m utils.player_snapshot
+"""
+import json
+import os
+from datetime import date
+
+# Bump when the snapshot layout changes; snapshots with another version are ignored
+SNAPSHOT_VERSION = 1
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "players_snapshot.json")
+
+def load_player_snapshot(path=SNAPSHOT_PATH):
+    """Return the bundled active players, or None if the snapshot is missing or outdated"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot["players"]
+
+def write_player_snapshot(path=SNAPSHOT_PATH):
+    """Regenerate the snapshot from nba_api's static player data"""
+    from importlib.metadata import version
+    from nba_api.stats.static import players
+
+    active_players = sorted(players.get_active_players(), key=lambda player: player["id"])
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "generated_on": date.today().isoformat(),
+        "source": f"nba_api {version('nba_api')}",
+        "players": active_players,
+    }
+    # One player per line keeps the file small and its diffs readable
+    header = json.dumps({k: v for k, v in snapshot.items() if k != "players"}, ensure_ascii=False)[:-1]
+    rows = ",\n".join(json.dumps(player, ensure_ascii=False) for player in active_players)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{header}, "players": [\n{rows}\n]}}\n')
+    return len(active_players)
+
+if __name__ == "__main__":
+    count = write_player_snapshot()
+    print(f"Wrote {count} active players to {SNAPSHOT_PATH}")
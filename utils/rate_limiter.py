@@ -0,0 +1,25 @@
+import os
+import threading
+import time
+
+class RateLimiter:
+    """Space out calls so no more than `calls_per_second` start per second, across all threads"""
+
+    def __init__(self, calls_per_second):
+        self.min_interval = 1.0 / calls_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller is allowed to start its request"""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            # Reserve the next slot before sleeping so waiting threads queue up in order
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+# Shared by every stats.nba.com request in this process. Override with NBA_STATS_MAX_RPS.
+api_limiter = RateLimiter(float(os.environ.get("NBA_STATS_MAX_RPS", 5)))
@@ -0,0 +1,170 @@
+"""Refresh-ahead for hot cache keys.
+
+Every access to a refresh-ahead loader is counted with a score that decays over
+time. A background thread refreshes the hottest keys before they expire, often
+while games are being played and not at all overnight, so popular players never
+fall out of the cache. Keys that do expire are served stale while a refresh runs.
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from utils.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# The NBA schedules games in US Eastern time
+SCHEDULE_TZ = ZoneInfo("America/New_York")
+
+# Eastern hours of the game-day schedule: games run from the early matinees to the late West Coast tip-offs
+GAME_WINDOW_START_HOUR = 12
+GAME_WINDOW_END_HOUR = 2
+OVERNIGHT_END_HOUR = 9
+
+# How old a hot entry may get while games are on
+GAME_WINDOW_MAX_AGE_S = 300
+
+# Outside game windows, hot entries are refreshed this long before they expire
+REFRESH_LEAD_S = 120
+
+# Popularity halves every half hour without accesses; keys scoring this much are hot
+POPULARITY_HALF_LIFE_S = 1800
+HOT_SCORE = 3.0
+
+MAX_TRACKED_KEYS = 2048
+TICK_S = 30
+REFRESH_WORKERS = 2
+
+def max_entry_age(now=None):
+    """How old a hot entry may get before it is refreshed, or None to leave it to expire.
+
+    During game windows entries are kept to a few minutes old, during the rest of the
+    day they are refreshed just ahead of their TTL, and overnight they are left alone.
+    """
+    hour = (now or datetime.now(SCHEDULE_TZ)).astimezone(SCHEDULE_TZ).hour
+    if hour >= GAME_WINDOW_START_HOUR or hour < GAME_WINDOW_END_HOUR:
+        return GAME_WINDOW_MAX_AGE_S
+    if hour < OVERNIGHT_END_HOUR:
+        return None
+    return math.inf
+
+class _KeyState:
+    __slots__ = ("refresh", "ttl", "score", "seen_at", "computed_at", "in_flight")
+
+    def __init__(self, refresh, ttl):
+        self.refresh = refresh
+        self.ttl = ttl
+        self.score = 0.0
+        self.seen_at = time.monotonic()
+        self.computed_at = None
+        self.in_flight = False
+
+    def decayed_score(self, now):
+        return self.score * 0.5 ** ((now - self.seen_at) / POPULARITY_HALF_LIFE_S)
+
+class RefreshScheduler:
+    """Tracks how popular each key is and refreshes hot keys in the background"""
+
+    def __init__(self, workers=REFRESH_WORKERS, tick_s=TICK_S):
+        self.tick_s = tick_s
+        self.refreshes = 0
+        self.failures = 0
+        self._keys = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-refresh")
+        self._thread = None
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def track(self, key, refresh, ttl):
+        """Count an access to a key; `refresh` recomputes and stores its value"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                if len(self._keys) >= MAX_TRACKED_KEYS:
+                    self._forget_coldest(now)
+                state = self._keys[key] = _KeyState(refresh, ttl)
+            state.score = state.decayed_score(now) + 1
+            state.seen_at = now
+            self._start()
+
+    def computed(self, key):
+        """Note that a key's value was just computed"""
+        with self._lock:
+            state = self._keys.get(key)
+            if state is not None:
+                state.computed_at = time.monotonic()
+
+    def _forget_coldest(self, now):
+        coldest = sorted(self._keys, key=lambda key: self._keys[key].decayed_score(now))
+        for key in coldest[:len(coldest) // 10 + 1]:
+            if not self._keys[key].in_flight:
+                del self._keys[key]
+
+    def refresh_soon(self, key):
+        """Refresh a key in the background unless a refresh is already running"""
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None or state.in_flight:
+                return
+            state.in_flight = True
+        self._executor.submit(self._refresh, key, state)
+
+    def _refresh(self, key, state):
+        try:
+            with span("cache.refresh"):
+                state.refresh()
+            with self._lock:
+                state.computed_at = time.monotonic()
+                self.refreshes += 1
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            logger.error(f"Error refreshing cached {key[0]}: {e}")
+        finally:
+            with self._lock:
+                state.in_flight = False
+
+    def due_keys(self, now=None, wall_now=None):
+        """Hot keys whose entries are older than the schedule allows right now"""
+        now = now if now is not None else time.monotonic()
+        max_age = max_entry_age(wall_now)
+        if max_age is None:
+            return []
+
+        due = []
+        with self._lock:
+            for key, state in self._keys.items():
+                if state.in_flight or state.computed_at is None or state.decayed_score(now) < HOT_SCORE:
+                    continue
+                if now - state.computed_at >= min(max_age, state.ttl - REFRESH_LEAD_S):
+                    due.append(key)
+        return due
+
+    def _run(self):
+        while True:
+            time.sleep(self.tick_s)
+            try:
+                for key in self.due_keys():
+                    self.refresh_soon(key)
+            except Exception as e:
+                logger.error(f"Error scheduling cache refreshes: {e}")
+
+    def stats(self):
+        """Tracked, hot and in-flight keys, with refreshes done and failed"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'tracked': len(self._keys),
+                'hot': sum(state.decayed_score(now) >= HOT_SCORE for state in self._keys.values()),
+                'in_flight': sum(state.in_flight for state in self._keys.values()),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+            }
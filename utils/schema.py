@@ -0,0 +1,85 @@
+import pandas as pd
+
+# Counting stats fit comfortably in 16 bits (nobody scores 32768 points in a game)
+COUNTING_STATS = [
+    'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'REB',
+    'AST', 'STL', 'BLK', 'TOV', 'TO', 'PF', 'PTS', 'PLUS_MINUS'
+]
+PERCENT_STATS = ['FG_PCT', 'FG3_PCT', 'FT_PCT']
+
+# Repeated labels stored once per distinct value
+CATEGORY_COLS = [
+    'SEASON_ID', 'MATCHUP', 'WL', 'PLAYER_NAME', 'TEAM_ABBREVIATION',
+    'TEAM_NAME', 'TEAM_CITY', 'START_POSITION'
+]
+# Game ids repeat across the players of a league-wide frame or a box score, but are unique within
+# one player's games, where a categorical would keep a dictionary as large as the column plus codes
+REPEATED_KEY_COLS = ['GAME_ID']
+ID_COLS = ['PLAYER_ID', 'TEAM_ID']
+FLAG_COLS = ['VIDEO_AVAILABLE']
+
+def _parse_minutes(minutes):
+    """Turn box score minutes like "34:12" or "34.000000:12" into decimal minutes"""
+    parts = minutes.astype(str).str.split(':', expand=True)
+    whole = pd.to_numeric(parts[0], errors='coerce')
+    seconds = pd.to_numeric(parts[1], errors='coerce') if parts.shape[1] > 1 else 0
+    return (whole + seconds / 60).round(1)
+
+def _to_small_int(series, dtype):
+    """Downcast a numeric column, keeping missing values with a nullable type"""
+    values = pd.to_numeric(series, errors='coerce')
+    if values.isna().any():
+        return values.astype(dtype.capitalize())
+    return values.astype(dtype)
+
+def apply_compact_schema(df, arrow_strings=False):
+    """Give a game log or box score frame compact dtypes.
+
+    Team, matchup and other repeated labels become categoricals, as do game ids where
+    several rows share one, counting stats small integers and percentages float32.
+    With arrow_strings=True the remaining text columns use the Arrow-backed string dtype.
+    """
+    if df.empty:
+        return df
+
+    df = df.copy()
+    for col in df.columns:
+        if col in COUNTING_STATS:
+            df[col] = _to_small_int(df[col], 'int16')
+        elif col in PERCENT_STATS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+        elif col in ID_COLS:
+            df[col] = _to_small_int(df[col], 'int32')
+        elif col in FLAG_COLS:
+            df[col] = _to_small_int(df[col], 'int8')
+        elif col in CATEGORY_COLS:
+            df[col] = df[col].astype('category')
+        elif col in REPEATED_KEY_COLS:
+            if df[col].nunique() <= len(df) // 2:
+                df[col] = df[col].astype('category')
+        elif col == 'MIN':
+            if pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype('float32')
+            else:
+                df[col] = _parse_minutes(df[col]).astype('float32')
+        elif arrow_strings and df[col].dtype == object:
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+def memory_report(frames):
+    """Bytes held by each frame as the API returned it and with the compact schema.
+
+    `frames` maps a label (e.g. a season) to a (raw, compact) pair of frames.
+    """
+    rows = []
+    for label, (raw, compact) in frames.items():
+        raw_bytes = int(raw.memory_usage(index=True, deep=True).sum())
+        compact_bytes = int(compact.memory_usage(index=True, deep=True).sum())
+        rows.append({
+            'frame': label,
+            'rows': len(compact),
+            'raw_bytes': raw_bytes,
+            'compact_bytes': compact_bytes,
+            'saved_pct': 100 * (1 - compact_bytes / raw_bytes) if raw_bytes else 0.0,
+        })
+    return pd.DataFrame(rows, columns=['frame', 'rows', 'raw_bytes', 'compact_bytes', 'saved_pct'])
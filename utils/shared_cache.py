@@ -0,0 +1,279 @@
+"""Cache backend on a directory shared by several app processes.
+
+Replicas behind a load balancer point NBA_STATS_SHARED_CACHE_DIR at the same
+volume, so whatever one of them loads is a cache hit for all of them.
+
+Each entry is a small JSON metadata file with its expiry time, plus one Arrow
+IPC file per frame in the value. Anything that isn't a frame, or a tuple or list
+of frames, is pickled. Data files are written under a fresh name and the
+metadata file is replaced last, so a reader sees either the old entry or the
+new one and never a partial write. Frames are read through a memory map, so
+replicas on one host share the page cache instead of each unpickling a copy.
+Their numeric columns stay read-only views of the file; loaders hand out
+copy-on-write views of them, so only a column a caller writes to gets copied.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+import pandas as pd
+from utils.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Disk budget for the shared directory. Override with NBA_STATS_SHARED_CACHE_MB.
+SHARED_CACHE_BYTES = int(float(os.environ.get("NBA_STATS_SHARED_CACHE_MB", 2048)) * 1024 * 1024)
+
+# Expired entries are swept, and the budget enforced, after this many writes
+PRUNE_INTERVAL = 50
+
+# Expired entries stay on disk this long, to be served stale while a refresh runs
+STALE_KEEP_S = 24 * 3600
+
+def _write_atomic(path, write):
+    """Write a file through a private temp file, so readers never see it half-written"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_arrow(path, df):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    if df.attrs:
+        # Arrow keeps pandas dtypes and the index but not attrs, so they travel in the schema metadata
+        table = table.replace_schema_metadata({**table.schema.metadata, b"attrs": json.dumps(df.attrs)})
+
+    def write(tmp_path):
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _write_atomic(path, write)
+
+def _read_arrow(path):
+    import pyarrow as pa
+
+    # Numeric columns come back as read-only views of the mapped file. They aren't copied here:
+    # cached loaders hand out shallow copy-on-write views, which copy a column on first write.
+    # One block per column keeps that copy to the column written.
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    df = table.to_pandas(split_blocks=True)
+    attrs = (table.schema.metadata or {}).get(b"attrs")
+    if attrs is not None:
+        df.attrs.update(json.loads(attrs))
+    return df
+
+def _is_frame_sequence(value):
+    return isinstance(value, (tuple, list)) and value and all(isinstance(item, pd.DataFrame) for item in value)
+
+class SharedCacheBackend:
+    """Loader cache in a directory shared across processes, with an optional in-memory layer in front.
+
+    The memory layer (any backend with get/get_stale/put/clear/usage) saves re-reading
+    the files on every hit within one process. Frames read from disk are read-only, so
+    write to them through a shallow copy, as cached loaders do.
+    """
+
+    def __init__(self, directory, max_bytes=SHARED_CACHE_BYTES, local=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.local = local
+        self._evictions = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _digest(self, key):
+        # Keys are tuples of the function name and plain arguments, whose repr is stable across processes
+        return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+    def _meta_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _read_meta(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path, meta):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _remove_files(self, meta):
+        for name in meta.get('files', []):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass  # Already gone, or still open elsewhere on a platform that won't delete it
+
+    def _load(self, meta):
+        paths = [os.path.join(self.directory, name) for name in meta['files']]
+        if meta['layout'] == "frame":
+            return _read_arrow(paths[0])
+        if meta['layout'] in ("tuple", "list"):
+            frames = [_read_arrow(path) for path in paths]
+            return tuple(frames) if meta['layout'] == "tuple" else frames
+        with open(paths[0], "rb") as f:
+            return pickle.load(f)
+
+    def _dump(self, value, digest):
+        """Write a value's data files under fresh names, returning (layout, file names)"""
+        token = uuid.uuid4().hex[:12]
+        try:
+            if isinstance(value, pd.DataFrame):
+                name = f"{digest}-{token}.arrow"
+                _write_arrow(os.path.join(self.directory, name), value)
+                return "frame", [name]
+            if _is_frame_sequence(value):
+                names = [f"{digest}-{token}-{i}.arrow" for i in range(len(value))]
+                for name, frame in zip(names, value):
+                    _write_arrow(os.path.join(self.directory, name), frame)
+                return type(value).__name__, names
+        except (TypeError, ValueError, ImportError) as e:
+            # Frames Arrow can't represent, e.g. with non-string column names, are pickled instead
+            logger.debug(f"Pickling cache entry {digest} instead of writing Arrow: {e}")
+            self._remove_files({'files': [name for name in os.listdir(self.directory) if name.startswith(f"{digest}-{token}")]})
+
+        name = f"{digest}-{token}.pkl"
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+
+        _write_atomic(os.path.join(self.directory, name), write)
+        return "pickle", [name]
+
+    def _get(self, key, stale):
+        if self.local is not None:
+            found, value = self.local.get_stale(key) if stale else self.local.get(key)
+            if found:
+                return True, value
+
+        meta = self._read_meta(self._meta_path(self._digest(key)))
+        if meta is None or (not stale and meta['expires_at'] <= time.time()):
+            return False, None
+
+        try:
+            with span("shared_cache.read"):
+                value = self._load(meta)
+        except Exception as e:
+            # Replaced or swept by another process between reading the metadata and the data
+            logger.debug(f"Shared cache entry for {meta['func_name']} unreadable: {e}")
+            return False, None
+
+        # Expired entries go in too, so the next stale read doesn't read them from disk again
+        if self.local is not None:
+            self.local.put(meta['func_name'], key, value, meta['expires_at'] - time.time())
+        return True, value
+
+    def get(self, key):
+        """Return (True, value) for a fresh entry, (False, None) otherwise"""
+        return self._get(key, stale=False)
+
+    def get_stale(self, key):
+        """Return (True, value) for any entry still on disk, even if it has expired"""
+        return self._get(key, stale=True)
+
+    def put(self, func_name, key, value, ttl):
+        """Store a value for every process sharing the directory"""
+        if self.local is not None:
+            self.local.put(func_name, key, value, ttl)
+
+        digest = self._digest(key)
+        meta_path = self._meta_path(digest)
+        previous = self._read_meta(meta_path)
+        try:
+            with span("shared_cache.write"):
+                layout, files = self._dump(value, digest)
+                now = time.time()
+                meta = {
+                    'func_name': func_name,
+                    'written_at': now,
+                    'expires_at': now + ttl,
+                    'layout': layout,
+                    'files': files,
+                    'bytes': sum(os.path.getsize(os.path.join(self.directory, name)) for name in files),
+                }
+                _write_atomic(meta_path, lambda tmp_path: self._write_meta(tmp_path, meta))
+        except Exception as e:
+            logger.error(f"Error writing shared cache entry for {func_name}: {e}")
+            return
+
+        if previous is not None:
+            self._remove_files(previous)
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def _entries(self):
+        """(metadata path, metadata) of every entry in the directory"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                meta = self._read_meta(path)
+                if meta is not None:
+                    entries.append((path, meta))
+        return entries
+
+    def _remove_entry(self, path, meta):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        self._remove_files(meta)
+
+    def prune(self):
+        """Drop long-expired entries, then the oldest ones until the directory is within budget"""
+        now = time.time()
+        live = []
+        for path, meta in self._entries():
+            if meta['expires_at'] + STALE_KEEP_S <= now:
+                self._remove_entry(path, meta)
+            else:
+                live.append((path, meta))
+
+        total = sum(meta['bytes'] for _, meta in live)
+        for path, meta in sorted(live, key=lambda entry: entry[1]['written_at']):
+            if total <= self.max_bytes:
+                break
+            self._remove_entry(path, meta)
+            total -= meta['bytes']
+            with self._lock:
+                self._evictions[meta['func_name']] = self._evictions.get(meta['func_name'], 0) + 1
+
+    def clear(self, func_name=None):
+        """Drop every entry, or only those of one function, for all processes"""
+        if self.local is not None:
+            self.local.clear(func_name)
+        for path, meta in self._entries():
+            if func_name is None or meta['func_name'] == func_name:
+                self._remove_entry(path, meta)
+
+    def usage(self):
+        """Entries and bytes on disk per function, with evictions made by this process"""
+        usage = {}
+        now = time.time()
+        for _, meta in self._entries():
+            if meta['expires_at'] > now:
+                func_usage = usage.setdefault(meta['func_name'], {'entries': 0, 'bytes': 0, 'evictions': 0})
+                func_usage['entries'] += 1
+                func_usage['bytes'] += meta['bytes']
+        with self._lock:
+            for func_name, evictions in self._evictions.items():
+                usage.setdefault(func_name, {'entries': 0, 'bytes': 0, 'evictions': 0})['evictions'] = evictions
+        return usage
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from utils.aggregation import SEASON_STAT_COLUMNS
+
+# Season averages a player's stat vector is made of
+SIMILARITY_COLUMNS = [col for col in SEASON_STAT_COLUMNS if col != 'games_played']
+
+# Players with fewer games have averages too noisy to match on
+MIN_SIMILARITY_GAMES = 5
+
+class SimilarityIndex:
+    """Nearest-neighbour search over players' z-scored season averages, built once per season frame"""
+
+    def __init__(self, season_stats, columns=SIMILARITY_COLUMNS, min_games=MIN_SIMILARITY_GAMES):
+        stats = season_stats[season_stats['games_played'] >= min_games] if not season_stats.empty else season_stats
+        values = stats[columns].to_numpy(dtype='float64')
+
+        # Every stat gets equal weight, whatever its scale
+        std = values.std(axis=0) if len(values) else np.ones(len(columns))
+        std[std == 0] = 1.0
+        self.matrix = (values - values.mean(axis=0)) / std if len(values) else values
+        self.norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+
+        self.columns = columns
+        self.player_ids = stats.index.to_numpy()
+        self._positions = {int(player_id): i for i, player_id in enumerate(self.player_ids)}
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def __contains__(self, player_id):
+        return int(player_id) in self._positions
+
+    def nearest(self, player_id, k=5):
+        """The k players closest to a player, nearest first, with their distance and a 0-1 similarity"""
+        position = self._positions.get(int(player_id))
+        k = min(k, len(self) - 1)
+        if position is None or k <= 0:
+            return pd.DataFrame(columns=['player_id', 'distance', 'similarity'])
+
+        # Squared distances to every player at once: |a|^2 + |b|^2 - 2ab
+        distances = self.norms + self.norms[position] - 2 * (self.matrix @ self.matrix[position])
+        distances[position] = np.inf
+
+        # Only the k nearest need sorting
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        distance = np.sqrt(np.maximum(distances[nearest], 0))
+        return pd.DataFrame({
+            'player_id': self.player_ids[nearest],
+            'distance': distance.round(3),
+            'similarity': (1 / (1 + distance)).round(3),
+        })
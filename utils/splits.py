@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from utils.aggregation import AVERAGE_SOURCES, SEASON_STAT_COLUMNS
+
+# Split name -> column of tagged game logs it groups by
+SPLIT_KEYS = {
+    'Venue': 'VENUE',
+    'Result': 'RESULT',
+    'Rest': 'REST',
+    'Opponent': 'OPPONENT',
+}
+
+VENUES = ['Home', 'Away']
+RESULTS = ['Wins', 'Losses']
+
+# Days off before a game; the first game of a season follows the offseason
+REST_LABELS = ['Back-to-back', '1 day', '2 days', '3+ days']
+
+def parse_matchups(matchups):
+    """Venue and opponent of every game, parsing each distinct MATCHUP string once.
+
+    Away games are listed as "LAL @ BOS", home games as "LAL vs. BOS".
+    """
+    matchups = matchups if isinstance(matchups.dtype, pd.CategoricalDtype) else matchups.astype('category')
+    categories = matchups.cat.categories.astype(str)
+    codes = matchups.cat.codes.to_numpy()
+
+    away = np.asarray(categories.str.contains('@', regex=False), dtype=int)
+    venue = pd.Categorical.from_codes(np.where(codes >= 0, away[codes], -1), categories=VENUES)
+
+    opponents = categories.str.rsplit(' ', n=1).str[-1]
+    opponent_categories = pd.Index(opponents.unique()).sort_values()
+    opponent_codes = opponent_categories.get_indexer(opponents)
+    opponent = pd.Categorical.from_codes(np.where(codes >= 0, opponent_codes[codes], -1), categories=opponent_categories)
+    return venue, opponent
+
+def rest_days(game_dates, previous_date=None):
+    """Days off before each game, from the gaps between game dates.
+
+    `previous_date` is the date of the game before the first one, when `game_dates`
+    continues a season; otherwise the first game counts as well rested.
+    """
+    dates = pd.Series(pd.to_datetime(game_dates)).reset_index(drop=True)
+    gaps = dates.diff().dt.days - 1
+    if previous_date is not None and len(dates):
+        gaps.iloc[0] = (dates.iloc[0] - pd.Timestamp(previous_date)).days - 1
+    days = gaps.fillna(len(REST_LABELS) - 1).clip(0, len(REST_LABELS) - 1).astype(int).to_numpy()
+    return pd.Categorical.from_codes(days, categories=REST_LABELS, ordered=True)
+
+def tag_splits(logs, previous_date=None):
+    """Game logs reduced to the averaged stats, tagged with the group of every split"""
+    stats = [col for col in AVERAGE_SOURCES.values() if col in logs.columns]
+    tagged = logs[stats].reset_index(drop=True)
+    tagged['VENUE'], tagged['OPPONENT'] = parse_matchups(logs['MATCHUP'])
+    result = logs['WL'].astype(str).map({'W': 'Wins', 'L': 'Losses'})
+    tagged['RESULT'] = pd.Categorical(result.to_numpy(), categories=RESULTS)
+    tagged['REST'] = rest_days(logs['GAME_DATE'], previous_date)
+    return tagged
+
+def split_cells(tagged):
+    """Stat sums and game counts for every combination of split groups, in one groupby.
+
+    Cells add up, so the cells of new games can be added to those of earlier ones,
+    and any split is a sum of cells over the other keys.
+    """
+    keys = list(SPLIT_KEYS.values())
+    # Games missing a group, e.g. one still in progress with no result yet, still count overall
+    grouped = tagged.groupby(keys, observed=True, dropna=False)
+    cells = grouped[[col for col in tagged.columns if col not in keys]].sum()
+    cells['games'] = grouped.size()
+    return cells
+
+def add_cells(cells, new_cells):
+    """Cells of two sets of games combined"""
+    return cells.add(new_cells, fill_value=0)
+
+def _averages(sums):
+    """Per-game averages from summed cells, rounded like the season summary"""
+    averages = pd.DataFrame(index=sums.index)
+    averages['games_played'] = sums['games'].astype(int)
+    for stat, col in AVERAGE_SOURCES.items():
+        averages[stat] = sums[col] / sums['games'] if col in sums.columns else 0.0
+        averages[stat] = averages[stat].round(3 if '_pct' in stat else 1)
+    return averages[SEASON_STAT_COLUMNS]
+
+def split_summary(cells):
+    """Per-game averages over all games and for each group of every split, indexed by (split, group)"""
+    if cells.empty:
+        return pd.DataFrame(columns=SEASON_STAT_COLUMNS, index=pd.MultiIndex.from_tuples([], names=['split', 'group']))
+
+    totals = cells.sum().to_frame('All').T
+    frames = {'Overall': totals}
+    for split, key in SPLIT_KEYS.items():
+        sums = cells.groupby(level=key, observed=True).sum()
+        frames[split] = sums.set_axis(sums.index.astype(str))
+    summary = _averages(pd.concat(frames, names=['split', 'group']))
+    return summary[summary['games_played'] > 0]
@@ -0,0 +1,89 @@
+"""Cold-start timing for nba_app.py.
+
+The app records how long each phase of its first run takes. To check the import
+cost of the app's modules in fresh interpreters against the budget, run:
+
+    python -m utils.startup
+"""
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Time allowed for the first script run in a fresh process. Override with NBA_STATS_COLD_START_BUDGET.
+COLD_START_BUDGET_S = float(os.environ.get("NBA_STATS_COLD_START_BUDGET", 3.0))
+
+# Modules the first render needs; plotting and endpoint modules should not be among them
+STARTUP_MODULES = ["streamlit", "pandas", "utils.data_loader", "utils.charts"]
+LAZY_MODULES = ["matplotlib.figure", "nba_api.stats.endpoints"]
+
+class StartupTimer:
+    """Record how long each phase of a script run takes"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []
+
+    def mark(self, phase):
+        """Close the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def report(self):
+        """Phase timings as a frame, with the total as the last row"""
+        rows = [{'phase': phase, 'seconds': seconds} for phase, seconds in self.phases]
+        rows.append({'phase': 'total', 'seconds': self.total})
+        return pd.DataFrame(rows, columns=['phase', 'seconds'])
+
+_cold_start = None
+_cold_start_lock = threading.Lock()
+
+def record_run(timer):
+    """Keep the first run of the process as the cold-start report, warning if it was over budget"""
+    global _cold_start
+    with _cold_start_lock:
+        if _cold_start is not None:
+            return
+        _cold_start = timer
+
+    if timer.total > COLD_START_BUDGET_S:
+        logger.warning(f"Cold start took {timer.total:.2f}s, over the {COLD_START_BUDGET_S:.2f}s budget")
+
+def cold_start_report():
+    """Timings of the first script run in this process, or None before it has finished"""
+    return _cold_start.report() if _cold_start is not None else None
+
+def measure_import(module):
+    """Seconds a fresh interpreter needs to import a module (or several, comma separated)"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    print("Startup imports (each in a fresh interpreter):")
+    for module in STARTUP_MODULES:
+        print(f"  {module:<28}{measure_import(module):6.3f}s")
+
+    print("Imported lazily on first use:")
+    for module in LAZY_MODULES:
+        print(f"  {module:<28}{measure_import(module):6.3f}s")
+
+    startup_imports = measure_import(", ".join(STARTUP_MODULES))
+    print(f"All startup imports together {startup_imports:.3f}s, budget {COLD_START_BUDGET_S:.3f}s")
+    if startup_imports > COLD_START_BUDGET_S:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+from datetime import datetime
+import pandas as pd
+from utils.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Root directory for everything persisted to disk. Override with NBA_STATS_DATA_DIR.
+DATA_DIR = os.environ.get(
+    "NBA_STATS_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"),
+)
+
+def _frame_path(kind, key):
+    """Build the Parquet file path for a stored frame"""
+    return os.path.join(DATA_DIR, kind, f"{key}.parquet")
+
+def read_frame(kind, key):
+    """Read a stored frame, or return None if nothing has been stored for this key"""
+    path = _frame_path(kind, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with span("storage.read"):
+            return pd.read_parquet(path)
+    except Exception as e:
+        logger.error(f"Error reading stored {kind} {key}: {e}")
+        return None
+
+def write_frame(kind, key, df):
+    """Write a frame to the store, replacing any previous version atomically"""
+    path = _frame_path(kind, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a private temp file first so readers never see a half-written file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with span("storage.write"):
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Error storing {kind} {key}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def stored_at(kind, key):
+    """Return when a frame was last written, or None if it is not stored"""
+    path = _frame_path(kind, key)
+    if not os.path.exists(path):
+        return None
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+def game_log_key(player_id, season):
+    """Storage key for one player's game logs in one season"""
+    return f"{season}_{int(player_id)}"
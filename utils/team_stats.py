@@ -0,0 +1,119 @@
+import pandas as pd
+
+# Box score columns summed into team totals for each game
+TEAM_TOTAL_STATS = ['PTS', 'FGA', 'FTA', 'OREB', 'TOV', 'MIN']
+
+# Columns of the team ratings frame, in display order
+TEAM_RATING_COLUMNS = ['games_played', 'pace', 'off_rating', 'def_rating', 'net_rating', 'ppg', 'opp_ppg']
+
+def _possessions(totals):
+    """Estimated possessions from box score totals (FGA + 0.44 FTA - OREB + TOV)"""
+    return totals['FGA'] + 0.44 * totals['FTA'] - totals['OREB'] + totals['TOV']
+
+def _plays(totals, suffix=''):
+    """Plays a player or team used: shots, trips to the line and turnovers"""
+    return totals[f'FGA{suffix}'] + 0.44 * totals[f'FTA{suffix}'] + totals[f'TOV{suffix}']
+
+def team_game_totals(league_logs):
+    """Sum a season's player game logs into one row per team per game.
+
+    Each row also carries the opponent's points and possessions, taken from the
+    other team in the same game. Games where only one team's players are in the
+    logs get no opponent numbers.
+    """
+    stats = [col for col in TEAM_TOTAL_STATS if col in league_logs.columns]
+    totals = (league_logs[['TEAM_ID', 'GAME_ID'] + stats]
+              .astype({col: 'float64' for col in stats})
+              .groupby(['TEAM_ID', 'GAME_ID'], observed=True, sort=False)
+              .sum()
+              .reset_index())
+    totals['POSS'] = _possessions(totals)
+
+    # Both teams' rows of a game summed, minus our own row, leaves the opponent's
+    by_game = totals.groupby('GAME_ID', observed=True)
+    teams_in_game = by_game['TEAM_ID'].transform('size')
+    for col in ('PTS', 'POSS'):
+        opponent = by_game[col].transform('sum') - totals[col]
+        totals[f'OPP_{col}'] = opponent.where(teams_in_game == 2)
+    return totals
+
+def team_ratings(team_games):
+    """Pace and offensive/defensive ratings per team for a season, indexed by TEAM_ID.
+
+    Possessions are the average of both teams' estimates, so a game counts the same
+    number of possessions for either side.
+    """
+    if team_games.empty:
+        return pd.DataFrame(columns=TEAM_RATING_COLUMNS).rename_axis('TEAM_ID')
+
+    # Ratings only use games where both teams are known
+    games = team_games.dropna(subset=['OPP_PTS'])
+    games = games.assign(GAME_POSS=(games['POSS'] + games['OPP_POSS']) / 2)
+    season = games.groupby('TEAM_ID', sort=False).agg(
+        games_played=('GAME_ID', 'size'),
+        pts=('PTS', 'sum'),
+        opp_pts=('OPP_PTS', 'sum'),
+        poss=('GAME_POSS', 'sum'),
+        minutes=('MIN', 'sum'),
+    )
+
+    # Team minutes count all five players on the floor
+    ratings = pd.DataFrame({
+        'games_played': season['games_played'],
+        'pace': 48 * season['poss'] / (season['minutes'] / 5),
+        'off_rating': 100 * season['pts'] / season['poss'],
+        'def_rating': 100 * season['opp_pts'] / season['poss'],
+        'ppg': season['pts'] / season['games_played'],
+        'opp_ppg': season['opp_pts'] / season['games_played'],
+    })
+    ratings['net_rating'] = ratings['off_rating'] - ratings['def_rating']
+    return ratings[TEAM_RATING_COLUMNS].round(1)
+
+def player_usage(league_logs, team_games):
+    """Each player's usage rate and share of their team's plays over a season.
+
+    Usage rate is the standard estimate of the share of team plays a player used
+    while on the floor. The share is of all team plays in the games they played.
+    Rows are per player and team, so traded players have one row per team.
+    """
+    columns = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'games_played', 'minutes', 'usg_pct', 'usage_share']
+    if league_logs.empty:
+        return pd.DataFrame(columns=columns)
+
+    stats = ['MIN', 'FGA', 'FTA', 'TOV']
+    logs = league_logs[['PLAYER_ID', 'TEAM_ID', 'GAME_ID'] + stats].astype({col: 'float64' for col in stats})
+    logs = logs.merge(team_games[['TEAM_ID', 'GAME_ID'] + stats], on=['TEAM_ID', 'GAME_ID'], suffixes=('', '_TEAM'))
+    logs = logs.assign(PLAYS=_plays(logs), TEAM_PLAYS=_plays(logs, '_TEAM'))
+
+    season = logs.groupby(['PLAYER_ID', 'TEAM_ID'], sort=False).agg(
+        games_played=('GAME_ID', 'size'),
+        minutes=('MIN', 'sum'),
+        team_minutes=('MIN_TEAM', 'sum'),
+        plays=('PLAYS', 'sum'),
+        team_plays=('TEAM_PLAYS', 'sum'),
+    )
+    on_floor = season['minutes'] * season['team_plays']
+    season['usg_pct'] = (100 * season['plays'] * (season['team_minutes'] / 5) / on_floor.where(on_floor > 0)).round(1)
+    season['usage_share'] = (season['plays'] / season['team_plays'].where(season['team_plays'] > 0)).round(3)
+    season['minutes'] = season['minutes'].round(1)
+
+    names = league_logs.drop_duplicates('PLAYER_ID').set_index('PLAYER_ID')['PLAYER_NAME'].astype(str)
+    season = season.reset_index()
+    season.insert(1, 'PLAYER_NAME', season['PLAYER_ID'].map(names))
+    return season[columns]
+
+def team_season_frame(team_stats, ratings):
+    """Join the league-wide team stats with the box score ratings, one row per team.
+
+    Either input may be empty, e.g. when the team stats request failed, and the
+    other still fills its columns. League ranks are added for the ratings.
+    """
+    summary = pd.DataFrame(index=team_stats.index.union(ratings.index).rename('TEAM_ID'))
+    if not team_stats.empty:
+        summary = summary.join(team_stats[['TEAM_NAME', 'GP', 'W', 'L', 'W_PCT']])
+    summary = summary.join(ratings)
+
+    for col, best_is_high in (('pace', True), ('off_rating', True), ('def_rating', False), ('net_rating', True)):
+        if col in summary.columns:
+            summary[f'{col}_rank'] = summary[col].rank(ascending=not best_is_high, method='min').astype('Int64')
+    return summary